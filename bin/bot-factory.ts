@@ -16,14 +16,22 @@ const app = new cdk.App();
 const bots: {
     botName: string,
     processingStackClass: typeof NestedStack,
+    commandLanes?: { [command: string]: string },
+    inlineCommands?: string[],
 }[] = [
     {
         botName: 'Watchdog2',
         processingStackClass: Watchdog2ProcessingStack,
+        commandLanes: {
+            raid2: 'urgent',
+        },
     },
     {
         botName: 'SimpBot',
         processingStackClass: SimpBotProcessingStack,
+        inlineCommands: [
+            'taylor',
+        ],
     },
 ];
 
@@ -31,6 +39,8 @@ bots.forEach(bot => {
     new DiscordBotStack(app, `${bot.botName}Stack`, {
         botName: bot.botName,
         processingStackClass: bot.processingStackClass,
+        commandLanes: bot.commandLanes,
+        inlineCommands: bot.inlineCommands,
         hostedZoneId,
         zoneName,
     });
@@ -36,12 +36,18 @@ import {
     PythonFunction,
 } from '@aws-cdk/aws-lambda-python-alpha';
 import MonitoringStack from './monitoring-stack';
+import convertToPascalCase from './utils/convert-to-pascal-case';
 
 interface DiscordBotStackProps extends StackProps {
     botName: string;
     processingStackClass: typeof NestedStack;
     hostedZoneId: string;
     zoneName: string;
+    // Priority lane of each command, commands without one use the receiver queue
+    commandLanes?: { [command: string]: string };
+    // CPU-only commands the receiver answers inline, see
+    // INLINE_COMMAND_MODULES in src/discord/inline_commands.py
+    inlineCommands?: string[];
 }
 
 export default class DiscordBotStack extends Stack {
@@ -49,6 +55,8 @@ export default class DiscordBotStack extends Stack {
 
     readonly queue: Queue;
 
+    readonly laneQueues: { [lane: string]: Queue } = {};
+
     readonly botSecret: Secret;
 
     constructor(scope: Construct, id: string, props: DiscordBotStackProps) {
@@ -89,6 +97,23 @@ export default class DiscordBotStack extends Stack {
             visibilityTimeout: Duration.seconds(60),
         });
 
+        // One queue per priority lane
+        const commandLanes = props.commandLanes ?? {};
+
+        new Set(Object.values(commandLanes)).forEach((lane) => {
+            const laneName = `${this.botName}${convertToPascalCase(lane)}`;
+
+            this.laneQueues[lane] = new Queue(this, `SQS${laneName}`, {
+                encryptionMasterKey: new Key(this, `SQS${laneName}KMSKey`, {
+                    enableKeyRotation: true,
+                    alias: `SQS${laneName}`,
+                    removalPolicy: RemovalPolicy.DESTROY,
+                }),
+                queueName: `SQS${laneName}`,
+                visibilityTimeout: Duration.seconds(60),
+            });
+        });
+
         /// ////////////////////////////////////////////
         /// ////////////////////////////////////////////
         /// ////////////////////////////////////////////
@@ -113,6 +138,7 @@ export default class DiscordBotStack extends Stack {
         }));
 
         this.queue.grantSendMessages(receiverRole);
+        Object.values(this.laneQueues).forEach((laneQueue) => laneQueue.grantSendMessages(receiverRole));
         this.botSecret.grantRead(receiverRole);
 
         const lambdaReceiver = new PythonFunction(this, `LambdaReceiver${props.botName}`, {
@@ -125,6 +151,11 @@ export default class DiscordBotStack extends Stack {
             environment: {
                 BOT_SECRET_NAME: this.botSecret.secretName,
                 SQS_QUEUE_URL: this.queue.queueUrl,
+                COMMAND_LANES: JSON.stringify(commandLanes),
+                INLINE_COMMANDS: (props.inlineCommands ?? []).join(','),
+                LANE_QUEUE_URLS: this.toJsonString(Object.fromEntries(
+                    Object.entries(this.laneQueues).map(([lane, laneQueue]) => [lane, laneQueue.queueUrl]),
+                )),
             },
             entry: './src/',
             index: 'discord/discord_receiver.py',
@@ -141,6 +172,7 @@ export default class DiscordBotStack extends Stack {
             botName: this.botName,
             receiverQueue: this.queue,
             botSecretName: `bot/${this.botName}`,
+            laneQueues: this.laneQueues,
         });
 
         /// ////////////////////////////////////////////
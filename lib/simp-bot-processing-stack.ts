@@ -1,5 +1,5 @@
 import {
-    NestedStack, RemovalPolicy,
+    Duration, NestedStack, RemovalPolicy,
 } from 'aws-cdk-lib';
 import {
     Construct,
@@ -13,11 +13,19 @@ import {
 import {
     PythonFunction,
 } from '@aws-cdk/aws-lambda-python-alpha';
+import {
+    Runtime,
+} from 'aws-cdk-lib/aws-lambda';
+import {
+    Trigger,
+} from 'aws-cdk-lib/triggers';
 import createProcessingLambdaRole from './utils/create-processing-lambda-role';
 import getBotSecret from './utils/get-bot-secret';
 import createProcessingLambda from './utils/create-processing-lambda';
 import createCommandUpdateLambda from './utils/create-command-update-lambda';
+import createIdempotencyTable from './utils/create-idempotency-table';
 import ProcessingStackProps from './utils/processing-stack-props';
+import convertToSnakeCase from './utils/convert-to-snake-case';
 
 export default class SimpBotProcessingStack extends NestedStack {
     processingLambda: PythonFunction;
@@ -31,6 +39,12 @@ export default class SimpBotProcessingStack extends NestedStack {
         /// ////////////////////////////////////////////
         // DDB table to store points
 
+        const pointsTableKey = new Key(this, 'PointsTableKMSKey', {
+            enableKeyRotation: true,
+            alias: 'PointsTableKMSKey',
+            removalPolicy: RemovalPolicy.DESTROY,
+        });
+
         const pointsTable = new Table(this, 'PointsTable', {
             partitionKey: {
                 name: 'transaction_id',
@@ -38,13 +52,22 @@ export default class SimpBotProcessingStack extends NestedStack {
             },
             tableName: 'points',
             removalPolicy: RemovalPolicy.DESTROY,
-            encryptionKey: new Key(this, 'PointsTableKMSKey', {
-                enableKeyRotation: true,
-                alias: 'PointsTableKMSKey',
-                removalPolicy: RemovalPolicy.DESTROY,
-            }),
+            encryptionKey: pointsTableKey,
+        });
+
+        // Running balance of each user, kept up to date by add_points
+        const pointBalancesTable = new Table(this, 'PointBalancesTable', {
+            partitionKey: {
+                name: 'discord_user',
+                type: AttributeType.STRING,
+            },
+            tableName: 'point_balances',
+            removalPolicy: RemovalPolicy.DESTROY,
+            encryptionKey: pointsTableKey,
         });
 
+        const idempotencyTable = createIdempotencyTable(this, props.botName);
+
         /// ////////////////////////////////////////////
         /// ////////////////////////////////////////////
         /// ////////////////////////////////////////////
@@ -57,6 +80,8 @@ export default class SimpBotProcessingStack extends NestedStack {
         // Permissions
         botSecret.grantRead(processingRole);
         pointsTable.grantReadWriteData(processingRole);
+        pointBalancesTable.grantReadWriteData(processingRole);
+        idempotencyTable.grantReadWriteData(processingRole);
 
         // The actual Lambda
         this.processingLambda = createProcessingLambda(
@@ -64,7 +89,11 @@ export default class SimpBotProcessingStack extends NestedStack {
             props.botName,
             botSecret,
             processingRole,
-            props.receiverQueue
+            props.receiverQueue,
+            props.laneQueues,
+            {
+                IDEMPOTENCY_TABLE_NAME: idempotencyTable.tableName,
+            },
         );
 
         /// ////////////////////////////////////////////
@@ -74,5 +103,34 @@ export default class SimpBotProcessingStack extends NestedStack {
         // Command updates lambda
 
         createCommandUpdateLambda(this, props.botName, botSecret, processingRole);
+
+        /// ////////////////////////////////////////////
+        /// ////////////////////////////////////////////
+        /// ////////////////////////////////////////////
+        /// ////////////////////////////////////////////
+        // Point balances rebuild lambda
+
+        const rebuildPointBalancesLambda = new PythonFunction(this, `RebuildPointBalances${props.botName}`, {
+            functionName: `RebuildPointBalances${props.botName}`,
+            runtime: Runtime.PYTHON_3_13,
+            handler: `${convertToSnakeCase(props.botName)}_rebuild_point_balances`,
+            memorySize: 256,
+            timeout: Duration.minutes(10),
+            role: processingRole,
+            entry: './src/',
+            index: `processing_lambdas/${convertToSnakeCase(props.botName)}.py`,
+        });
+
+        // Backfills the balances from the ledger on the deploy that creates
+        // the trigger, later runs are invoked by hand
+        new Trigger(this, `RebuildPointBalancesTrigger${props.botName}`, {
+            handler: rebuildPointBalancesLambda,
+            timeout: Duration.minutes(10),
+            executeOnHandlerChange: false,
+            executeAfter: [
+                pointsTable,
+                pointBalancesTable,
+            ],
+        });
     }
 }
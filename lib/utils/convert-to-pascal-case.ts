@@ -0,0 +1,7 @@
+export default function convertToPascalCase(string: string) {
+    return string.replace(/\W+|_+/g, ' ')
+        .split(' ')
+        .filter((word) => word.length > 0)
+        .map((word) => word.charAt(0).toUpperCase() + word.slice(1))
+        .join('');
+}
@@ -0,0 +1,32 @@
+import {
+    RemovalPolicy,
+} from 'aws-cdk-lib';
+import {
+    Construct,
+} from 'constructs';
+import {
+    AttributeType, Table,
+} from 'aws-cdk-lib/aws-dynamodb';
+import {
+    Key,
+} from 'aws-cdk-lib/aws-kms';
+import convertToSnakeCase from './convert-to-snake-case';
+
+export default function createIdempotencyTable(scope: Construct, botName: string) {
+    // Interactions already processed by a bot, so SQS
+    // redeliveries don't run their commands twice
+    return new Table(scope, 'IdempotencyTable', {
+        partitionKey: {
+            name: 'interaction_id',
+            type: AttributeType.STRING,
+        },
+        tableName: `${convertToSnakeCase(botName)}_idempotency`,
+        timeToLiveAttribute: 'expires_at',
+        removalPolicy: RemovalPolicy.DESTROY,
+        encryptionKey: new Key(scope, 'IdempotencyTableKMSKey', {
+            enableKeyRotation: true,
+            alias: `IdempotencyTableKMSKey${botName}`,
+            removalPolicy: RemovalPolicy.DESTROY,
+        }),
+    });
+}
@@ -23,31 +23,47 @@ import {
     SqsEventSource,
 } from 'aws-cdk-lib/aws-lambda-event-sources';
 import convertToSnakeCase from './convert-to-snake-case';
+import convertToPascalCase from './convert-to-pascal-case';
 
 export default function createProcessingLambda(
     scope: Construct,
     botName: string,
     botSecret: ISecret,
     processingRole: Role,
-    receiverQueue: Queue
+    receiverQueue: Queue,
+    laneQueues: { [lane: string]: Queue } = {},
+    environment: { [name: string]: string } = {},
 ) {
-    const processingLambda = new PythonFunction(scope, `LambdaProcessing${botName}`, {
-        functionName: `LambdaProcessing${botName}`,
-        runtime: Runtime.PYTHON_3_13,
-        handler: convertToSnakeCase(botName),
-        memorySize: 128,
-        timeout: Duration.seconds(5),
-        role: processingRole,
-        environment: {
-            BOT_SECRET_NAME: botSecret.secretName,
-            SQS_QUEUE_URL: receiverQueue.queueUrl,
-        },
-        entry: './src/',
-        index: `processing_lambdas/${convertToSnakeCase(botName)}.py`,
-    });
+    const createFunction = (functionName: string, queue: Queue) => {
+        const processingFunction = new PythonFunction(scope, functionName, {
+            functionName,
+            runtime: Runtime.PYTHON_3_13,
+            handler: convertToSnakeCase(botName),
+            memorySize: 128,
+            timeout: Duration.seconds(5),
+            role: processingRole,
+            environment: {
+                BOT_SECRET_NAME: botSecret.secretName,
+                SQS_QUEUE_URL: queue.queueUrl,
+                ...environment,
+            },
+            entry: './src/',
+            index: `processing_lambdas/${convertToSnakeCase(botName)}.py`,
+        });
+
+        const eventSource = new SqsEventSource(queue, {
+            reportBatchItemFailures: true,
+        });
+        processingFunction.addEventSource(eventSource);
 
-    const eventSource = new SqsEventSource(receiverQueue);
-    processingLambda.addEventSource(eventSource);
+        return processingFunction;
+    };
+
+    // Every priority lane gets its own function, so a backlog in one
+    // lane doesn't delay the others
+    Object.entries(laneQueues).forEach(([lane, queue]) => {
+        createFunction(`LambdaProcessing${botName}${convertToPascalCase(lane)}`, queue);
+    });
 
-    return processingLambda;
+    return createFunction(`LambdaProcessing${botName}`, receiverQueue);
 }
@@ -10,4 +10,5 @@ export default interface ProcessingStackProps extends NestedStackProps {
     botName: string;
     receiverQueue: Queue;
     botSecretName: string;
-}
\ No newline at end of file
+    laneQueues?: { [lane: string]: Queue };
+}
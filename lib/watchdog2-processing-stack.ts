@@ -25,10 +25,15 @@ import {
 import {
     Secret,
 } from 'aws-cdk-lib/aws-secretsmanager';
+import {
+    Queue,
+} from 'aws-cdk-lib/aws-sqs';
 import {
     CfnApp, CfnSMSChannel, CfnVoiceChannel,
 } from 'aws-cdk-lib/aws-pinpoint';
 import convertToSnakeCase from './utils/convert-to-snake-case';
+import convertToPascalCase from './utils/convert-to-pascal-case';
+import createIdempotencyTable from './utils/create-idempotency-table';
 import ProcessingStackProps from './utils/processing-stack-props';
 
 
@@ -79,6 +84,28 @@ export default class Watchdog2ProcessingStack extends NestedStack {
             }),
         });
 
+        /// ////////////////////////////////////////////
+        /// ////////////////////////////////////////////
+        /// ////////////////////////////////////////////
+        /// ////////////////////////////////////////////
+        // DDB table to collapse repeated raid alerts
+
+        const raidAlertsTable = new Table(this, 'RaidAlertsTable', {
+            partitionKey: {
+                name: 'discord_user',
+                type: AttributeType.STRING,
+            },
+            tableName: 'raid_alerts',
+            timeToLiveAttribute: 'expires_at',
+            removalPolicy: RemovalPolicy.DESTROY,
+            encryptionKey: new Key(this, 'RaidAlertsTableKMSKey', {
+                enableKeyRotation: true,
+                alias: 'RaidAlertsTableKMSKey',
+            }),
+        });
+
+        const idempotencyTable = createIdempotencyTable(this, props.botName);
+
         /// ////////////////////////////////////////////
         /// ////////////////////////////////////////////
         /// ////////////////////////////////////////////
@@ -107,6 +134,8 @@ export default class Watchdog2ProcessingStack extends NestedStack {
 
         // DDB permission for the function
         this.contactInfoTable.grantReadWriteData(processingRole);
+        raidAlertsTable.grantReadWriteData(processingRole);
+        idempotencyTable.grantReadWriteData(processingRole);
 
         // Grant permissions to the secret, the
         // secret is not passed to the stack
@@ -115,26 +144,43 @@ export default class Watchdog2ProcessingStack extends NestedStack {
         botSecret.grantRead(processingRole);
 
         // The actual Lambda
-        this.processingLambda = new PythonFunction(this, `LambdaProcessing${props.botName}`, {
-            functionName: `LambdaProcessing${props.botName}`,
-            runtime: Runtime.PYTHON_3_11,
-            handler: convertToSnakeCase(props.botName),
-            memorySize: 128,
-            timeout: Duration.seconds(5),
-            role: processingRole,
-            environment: {
-                BOT_SECRET_NAME: botSecret.secretName,
-                SQS_QUEUE_URL: props.receiverQueue.queueUrl,
-                CONTACT_INFO_TABLE_NAME: this.contactInfoTable.tableName,
-                PINPOINT_APP_ID: pinpointApp.ref,
-                ORIGINATION_NUMBER: '+18664799447',
-            },
-            entry: './src/',
-            index: 'processing_lambdas/watchdog_2.py',
+        const createProcessingFunction = (functionName: string, queue: Queue) => {
+            const processingFunction = new PythonFunction(this, functionName, {
+                functionName,
+                runtime: Runtime.PYTHON_3_11,
+                handler: convertToSnakeCase(props.botName),
+                memorySize: 128,
+                timeout: Duration.seconds(5),
+                role: processingRole,
+                environment: {
+                    BOT_SECRET_NAME: botSecret.secretName,
+                    SQS_QUEUE_URL: queue.queueUrl,
+                    CONTACT_INFO_TABLE_NAME: this.contactInfoTable.tableName,
+                    PINPOINT_APP_ID: pinpointApp.ref,
+                    ORIGINATION_NUMBER: '+18664799447',
+                    RAID_ALERTS_TABLE_NAME: raidAlertsTable.tableName,
+                    RAID_ALERT_WINDOW_SECONDS: '300',
+                    IDEMPOTENCY_TABLE_NAME: idempotencyTable.tableName,
+                },
+                entry: './src/',
+                index: 'processing_lambdas/watchdog_2.py',
+            });
+
+            const eventSource = new SqsEventSource(queue, {
+                reportBatchItemFailures: true,
+            });
+            processingFunction.addEventSource(eventSource);
+
+            return processingFunction;
+        };
+
+        // Every priority lane gets its own function, so raid alerts
+        // don't wait behind the rest of the commands
+        Object.entries(props.laneQueues ?? {}).forEach(([lane, queue]) => {
+            createProcessingFunction(`LambdaProcessing${props.botName}${convertToPascalCase(lane)}`, queue);
         });
 
-        const eventSource = new SqsEventSource(props.receiverQueue);
-        this.processingLambda.addEventSource(eventSource);
+        this.processingLambda = createProcessingFunction(`LambdaProcessing${props.botName}`, props.receiverQueue);
 
         /// ////////////////////////////////////////////
         /// ////////////////////////////////////////////
@@ -0,0 +1,7 @@
+#!/usr/bin/env bash
+
+set -ex
+
+echo "Running benchmarks..."
+PYTHONPATH=./src python3 -m pytest -q -m benchmark test_python/
+PYTHONPATH=./src python3 -m test_python.benchmarks --check "$@"
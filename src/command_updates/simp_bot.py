@@ -1,8 +1,10 @@
 """Update the commands for SimpBot."""
 
 from utils.run_command_updates import run_command_updates
+from utils.tracing import tracer
 
 
+@tracer.handler("simp_bot_commands")
 def simp_bot_commands(_: dict, __: dict) -> None:
     """
     Update the commands for SimpBot.
@@ -14,7 +16,7 @@ def simp_bot_commands(_: dict, __: dict) -> None:
         {
             "name": "taylor",
             "type": 1,
-            "description": "Sends a random Taylor Swift song quote.",
+            "description": "Sends a random Taylor Swift song.",
         },
         {
             "name": "point_balance",
@@ -36,6 +38,7 @@ def simp_bot_commands(_: dict, __: dict) -> None:
                     "name": "points",
                     "type": 4,
                     "required": True,
+                    "min_value": 1,
                     "description": "Amount of points to add.",
                 },
             ],
@@ -55,6 +58,7 @@ def simp_bot_commands(_: dict, __: dict) -> None:
                     "name": "points",
                     "type": 4,
                     "required": True,
+                    "min_value": 1,
                     "description": "Amount of points to remove.",
                 },
             ],
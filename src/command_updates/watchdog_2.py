@@ -2,11 +2,11 @@
 
 import os
 
-import requests
-
-from utils.secrets_manager_client import SecretsManagerClient
+from utils.client_registry import client_registry
+from utils.tracing import tracer
 
 
+@tracer.handler("watchdog2_commands")
 def watchdog2_commands(_: dict, __: dict) -> None:
     """
     Update the commands for Watchdog2.
@@ -14,13 +14,13 @@ def watchdog2_commands(_: dict, __: dict) -> None:
     :param _: AWS event from SQS.
     :param __: AWS context.
     """
-    sm_client = SecretsManagerClient()
     bot_secret_name = os.environ.get("BOT_SECRET_NAME")
-    secret = sm_client.get_secret(bot_secret_name)
+    secret = client_registry.get_secret(bot_secret_name)
 
     url = f"https://discord.com/api/v10/applications/{secret['ApplicationId']}/commands"
 
     headers = {"Authorization": f"Bot {secret['Token']}"}
+    session = client_registry.get_http_session()
 
     # This is an example CHAT_INPUT or Slash Command, with a type of 1
     update_json = {
@@ -37,7 +37,7 @@ def watchdog2_commands(_: dict, __: dict) -> None:
         ],
     }
 
-    r = requests.post(url, headers=headers, json=update_json)
+    r = session.post(url, headers=headers, json=update_json)
     r.raise_for_status()
 
     registered_users_json = {
@@ -46,7 +46,7 @@ def watchdog2_commands(_: dict, __: dict) -> None:
         "description": "Lists all the users registered in Watchdog.",
     }
 
-    r = requests.post(url, headers=headers, json=registered_users_json)
+    r = session.post(url, headers=headers, json=registered_users_json)
     r.raise_for_status()
 
     raid_json = {
@@ -60,8 +60,17 @@ def watchdog2_commands(_: dict, __: dict) -> None:
                 "required": True,
                 "description": "User getting raided.",
             },
+        ]
+        + [
+            {
+                "name": f"user{i}",
+                "type": 6,
+                "required": False,
+                "description": "Another user getting raided.",
+            }
+            for i in range(2, 6)
         ],
     }
 
-    r = requests.post(url, headers=headers, json=raid_json)
+    r = session.post(url, headers=headers, json=raid_json)
     r.raise_for_status()
@@ -0,0 +1,321 @@
+"""Dispatch Discord commands to their handlers."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Self
+
+from utils.tracing import tracer
+
+if TYPE_CHECKING:
+    from discord.discord_client import DiscordClient
+    from utils.idempotency import IdempotencyStore
+
+# Discord application command option types
+# https://discord.com/developers/docs/interactions/application-commands#application-command-object-application-command-option-type
+OPTION_PARSERS: dict[int, Callable[[Any], Any]] = {
+    3: str,
+    4: int,
+    5: bool,
+    6: str,
+    7: str,
+    8: str,
+    9: str,
+    10: float,
+}
+
+CommandHandler = Callable[["CommandContext", "DiscordClient"], str]
+
+
+class CommandContext:
+    """A Discord command parsed from an SQS record."""
+
+    def __init__(
+        self: Self,
+        command: str,
+        options: dict[str, Any],
+        command_issuer: str,
+        channel_id: str,
+        resolved_users: dict | None = None,
+        resolved_members: dict | None = None,
+        command_issuer_id: str | None = None,
+        batch_items: dict | None = None,
+        application_id: str | None = None,
+        interaction_token: str | None = None,
+        interaction_id: str | None = None,
+    ) -> None:
+        """
+        Create the context.
+
+        :param command: Name of the command.
+        :param options: Values of the options by name.
+        :param command_issuer: User that sent the command.
+        :param channel_id: Channel the command was sent from.
+        :param resolved_users: Users resolved by Discord in the interaction.
+        :param resolved_members: Guild members resolved by Discord in the
+            interaction, ie: their nicknames and roles.
+        :param command_issuer_id: ID of the user that sent the command.
+        :param batch_items: Items loaded once for the whole SQS batch.
+        :param application_id: ID of the application of the bot.
+        :param interaction_token: Token to reply to the interaction with.
+        :param interaction_id: ID of the interaction, the same on redeliveries.
+        """
+        self.command = command
+        self.options = options
+        self.command_issuer = command_issuer
+        self.channel_id = channel_id
+        self.resolved_users = resolved_users or {}
+        self.resolved_members = resolved_members or {}
+        self.command_issuer_id = command_issuer_id
+        self.batch_items = batch_items or {}
+        self.application_id = application_id
+        self.interaction_token = interaction_token
+        self.interaction_id = interaction_id
+
+    @staticmethod
+    def parse_options(options: list[dict] | None) -> dict[str, Any]:
+        """
+        Parse the options of a command into typed values by name.
+
+        :param options: Options as sent by Discord.
+        :return: Values of the options by name.
+        """
+        parsed = {}
+
+        for option in options or []:
+            parser = OPTION_PARSERS.get(option.get("type"))  # type: ignore
+            value = option.get("value")
+            parsed[option["name"]] = (
+                parser(value) if parser and value is not None else value
+            )
+
+        return parsed
+
+    @classmethod
+    def from_attributes(
+        cls: type[Self],
+        attributes: dict,
+        batch_items: dict | None = None,
+    ) -> Self:
+        """
+        Parse the command in the attributes of a Discord event.
+
+        :param attributes: Attributes from DiscordClient.get_event_attributes.
+        :param batch_items: Items loaded once for the whole SQS batch.
+        :return: The parsed command.
+        """
+        return cls(
+            command=attributes["command"],
+            options=cls.parse_options(attributes.get("options")),
+            command_issuer=attributes["command_issuer"],
+            channel_id=attributes["channel_id"],
+            resolved_users=attributes.get("resolved_users"),
+            resolved_members=attributes.get("resolved_members"),
+            command_issuer_id=attributes.get("command_issuer_id"),
+            batch_items=batch_items,
+            application_id=attributes.get("application_id"),
+            interaction_token=attributes.get("interaction_token"),
+            interaction_id=attributes.get("interaction_id"),
+        )
+
+    @classmethod
+    def from_record(
+        cls: type[Self],
+        record: dict,
+        batch_items: dict | None = None,
+    ) -> Self:
+        """
+        Parse the command in an SQS record sent by the receiver.
+
+        :param record: SQS record with the Discord event attributes.
+        :param batch_items: Items loaded once for the whole SQS batch.
+        :return: The parsed command.
+        """
+        return cls.from_attributes(json.loads(record["body"]), batch_items)
+
+
+class CommandRouter:
+    """
+    Dispatch Discord commands to the handlers registered for them.
+
+    Handlers return the content of the reply, which replaces the deferred
+    response of the interaction. If a handler raises, the error is sent
+    instead. Calls, errors and time spent are counted per command.
+    """
+
+    def __init__(self: Self) -> None:
+        """Create the router."""
+        self._handlers: dict[str, CommandHandler] = {}
+        self._lock = threading.Lock()
+        self._metrics: dict[str, dict] = {}
+
+    def command(self: Self, name: str) -> Callable[[CommandHandler], CommandHandler]:
+        """
+        Register the handler of a command.
+
+        :param name: Name of the command.
+        :return: Decorator that registers the handler.
+        """
+
+        def register(handler: CommandHandler) -> CommandHandler:
+            """
+            Register the handler.
+
+            :param handler: Handler of the command.
+            :return: The same handler.
+            """
+            self._handlers[name] = handler
+            self._metrics[name] = {"calls": 0, "errors": 0, "total_seconds": 0.0}
+            return handler
+
+        return register
+
+    @property
+    def commands(self: Self) -> list[str]:
+        """
+        Names of the registered commands.
+
+        :return: List with the names of the commands.
+        """
+        return list(self._handlers)
+
+    def metrics(self: Self) -> dict:
+        """
+        Get the counters of every command.
+
+        :return: Calls, errors and total seconds by command.
+        """
+        with self._lock:
+            return {name: dict(metrics) for name, metrics in self._metrics.items()}
+
+    def run(
+        self: Self,
+        context: CommandContext,
+        discord_client: DiscordClient,
+    ) -> str | None:
+        """
+        Run the handler of a command and return its reply.
+
+        Errors of the handler are counted and raised to the caller.
+
+        :param context: The parsed command.
+        :param discord_client: Discord client of the bot.
+        :return: Reply of the handler, None if no handler is registered.
+        """
+        handler = self._handlers.get(context.command)
+
+        if handler is None:
+            logging.info(f"No handler for command {context.command}...")
+            return None
+
+        start = time.perf_counter()
+        failed = True
+
+        try:
+            content = handler(context, discord_client)
+            failed = False
+
+            return content
+
+        finally:
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                metrics = self._metrics[context.command]
+                metrics["calls"] += 1
+                metrics["errors"] += int(failed)
+                metrics["total_seconds"] += elapsed
+
+            tracer.record(context.command, elapsed, failed, kind="Command")
+
+            logging.info(f"Command {context.command} ran in {elapsed:.3f}s...")
+
+    def dispatch(
+        self: Self,
+        context: CommandContext,
+        discord_client: DiscordClient,
+        idempotency_store: IdempotencyStore | None = None,
+    ) -> bool:
+        """
+        Run the handler of a command and send its reply.
+
+        With an idempotency store the interaction is marked completed, with its
+        reply, as soon as the handler returns. SQS redeliveries of a completed
+        interaction only send the reply again, so the side effects of the
+        handler are never applied twice.
+
+        :param context: The parsed command.
+        :param discord_client: Discord client of the bot.
+        :param idempotency_store: Store the interaction is claimed in.
+        :raises RuntimeError: If the interaction is running somewhere else, so
+            the record is retried once that claim completes or expires.
+        :return: False if no handler is registered for the command.
+        """
+        if context.command not in self._handlers:
+            logging.info(f"No handler for command {context.command}...")
+            return False
+
+        interaction_id = context.interaction_id or ""
+        store = idempotency_store if interaction_id else None
+
+        if store is not None:
+            # The statuses are only loaded with the idempotency store
+            from utils.idempotency import COMPLETED, IN_PROGRESS
+
+            status, reply = store.claim(interaction_id)
+
+            if status == IN_PROGRESS:
+                raise RuntimeError(f"Interaction {interaction_id} is already running")
+
+            if status == COMPLETED:
+                logging.info(
+                    f"Interaction {interaction_id} already ran, replying again...",
+                )
+                self.reply(context, discord_client, {"content": reply})
+                return True
+
+        try:
+            content = self.run(context, discord_client)
+
+        except Exception as e:
+            content = str(e)
+
+        if store is not None:
+            store.complete(interaction_id, content)
+
+        self.reply(context, discord_client, {"content": content})
+
+        return True
+
+    @staticmethod
+    def reply(
+        context: CommandContext,
+        discord_client: DiscordClient,
+        content: dict,
+    ) -> None:
+        """
+        Send the reply of a command.
+
+        The reply edits the deferred response of the interaction. Commands
+        queued without a token, or whose token expired, reply to the channel.
+
+        :param context: The parsed command.
+        :param discord_client: Discord client of the bot.
+        :param content: Content to send.
+        """
+        if context.application_id and context.interaction_token:
+            try:
+                discord_client.edit_original_response(
+                    content,
+                    context.application_id,
+                    context.interaction_token,
+                )
+                return
+
+            except Exception as e:
+                logging.info(f"Unable to edit the response, sending it instead: {e}")
+
+        discord_client.send_message_to_channel(content, context.channel_id)
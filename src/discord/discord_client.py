@@ -1,27 +1,116 @@
 """Client for discord operations."""
 
+from __future__ import annotations
+
 import json
-from typing import Self
+import logging
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Self
+
+from discord.rate_limiter import DiscordRateLimiter, RateLimitedError
+from discord.user_cache import UserCache
+from utils.tracing import tracer
+
+# requests, nacl and boto3 are imported when first needed, so the receiver
+# can answer pings and reject junk without loading them
+if TYPE_CHECKING:
+    import requests
+    from nacl.signing import VerifyKey
+
+try:
+    import orjson
+
+    def _dumps(data: dict) -> str:
+        """
+        Serialize a response body with orjson.
+
+        :param data: Body of the response.
+        :return: The body as JSON.
+        """
+        return orjson.dumps(data).decode()
+
+except ImportError:
+
+    def _dumps(data: dict) -> str:
+        """
+        Serialize a response body with the standard library.
+
+        :param data: Body of the response.
+        :return: The body as JSON.
+        """
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+SIGNATURE_HEX_LENGTH = 128
+MAX_TIMESTAMP_SKEW_SECONDS = 300
+RECENT_SIGNATURES_SIZE = 1024
+MAX_RATE_LIMIT_RETRIES = 2
+
 
-import requests
-from nacl.signing import VerifyKey
+@lru_cache(maxsize=8)
+def _get_verify_key(public_key: str) -> VerifyKey:
+    """
+    Parse a Discord public key once and reuse it for every request.
 
-from utils.secrets_manager_client import SecretsManagerClient
+    :param public_key: Hex encoded Ed25519 public key of the bot.
+    :return: Key used to verify the request signatures.
+    """
+    from nacl.signing import VerifyKey
 
+    return VerifyKey(bytes.fromhex(public_key))
 
+
+@tracer.client(
+    "verify_event_signature",
+    "get_user",
+    "send_message_to_channel",
+    "edit_original_response",
+    "send_followup_message",
+)
 class DiscordClient:
     """Client for discord operations."""
 
-    def __init__(self: Self, secret_name: str) -> None:
+    def __init__(
+        self: Self,
+        secret_name: str,
+        secret: dict | None = None,
+        secret_refresher: Callable[[], dict] | None = None,
+        session: requests.Session | None = None,
+        session_factory: Callable[[], requests.Session] | None = None,
+        rate_limiter: DiscordRateLimiter | None = None,
+        user_cache: UserCache | None = None,
+    ) -> None:
         """
         Client for discord operations.
 
         :param secret_name: Name of the secret there the API token is.
+        :param secret: Already retrieved contents of the secret, if any.
+        :param secret_refresher: Returns a fresh secret when Discord rejects the token.
+        :param session: HTTP session to reuse connections to Discord.
+        :param session_factory: Creates the HTTP session the first time it is
+            needed, if no session is given.
+        :param rate_limiter: Tracks the Discord rate limits of the bot.
+        :param user_cache: Cache in front of get_user.
         """
-        secrets_manager_client = SecretsManagerClient()
         self._api_url = "https://discord.com/api"
-        self._secret = secrets_manager_client.get_secret(secret_name)
-        self._headers = {"Authorization": f'Bot {self._secret["Token"]}'}
+        self._session_value = session
+        self._session_factory = session_factory
+        self.rate_limiter = (
+            rate_limiter if rate_limiter is not None else DiscordRateLimiter()
+        )
+        self.user_cache = user_cache if user_cache is not None else UserCache()
+        self._secret_refresher = secret_refresher
+
+        if secret is None:
+            from utils.secrets_manager_client import SecretsManagerClient
+
+            secret = SecretsManagerClient().get_secret(secret_name)
+
+        self.set_secret(secret)
+        self.max_timestamp_skew_seconds = MAX_TIMESTAMP_SKEW_SECONDS
+        self._recent_signatures: OrderedDict[str, None] = OrderedDict()
         self.response_types = {
             "PONG": 1,
             "ACK_NO_SOURCE": 2,
@@ -29,6 +118,114 @@ class DiscordClient:
             "CHANNEL_MESSAGE_WITH_SOURCE": 4,
             "ACK_WITH_SOURCE": 5,
         }
+        # Bodies that never change are only serialized once
+        self._pong_body = _dumps({"type": self.response_types["PONG"]})
+        self._deferred_body = _dumps({"type": self.response_types["ACK_WITH_SOURCE"]})
+
+    @property
+    def _session(self: Self) -> requests.Session:
+        """
+        HTTP session used to call Discord, created on first use.
+
+        :return: A requests session.
+        """
+        if self._session_value is None:
+            if self._session_factory is None:
+                from utils.http_session import create_http_session
+
+                self._session_factory = create_http_session
+
+            self._session_value = self._session_factory()
+
+        return self._session_value
+
+    @property
+    def secret(self: Self) -> dict:
+        """
+        Contents of the bot secret in use.
+
+        :return: Dictionary with the contents of the secret.
+        """
+        return self._secret
+
+    def set_secret(self: Self, secret: dict) -> None:
+        """
+        Start using a new version of the bot secret.
+
+        :param secret: Dictionary with the contents of the secret.
+        """
+        self._secret = secret
+        self._headers = {"Authorization": f'Bot {self._secret["Token"]}'}
+
+    def record_metrics(self: Self) -> None:
+        """Record the counters of the rate limiter and the user cache in the tracer."""
+        tracer.counters(
+            "DiscordRateLimiter",
+            self.rate_limiter.metrics(),
+            gauges=("buckets",),
+        )
+        tracer.counters("UserCache", self.user_cache.metrics(), gauges=("size",))
+
+    def _with_auth_retry(
+        self: Self,
+        send: Callable[[], requests.Response],
+    ) -> requests.Response:
+        """
+        Send a request and retry it once with a fresh secret if Discord answers 401.
+
+        :param send: Sends the request using the current headers.
+        :return: Response from Discord.
+        """
+        response = send()
+
+        if response.status_code == 401 and self._secret_refresher is not None:
+            logging.info("Discord rejected the token, refreshing the secret...")
+            self.set_secret(self._secret_refresher())
+            response = send()
+
+        return response
+
+    def _send(
+        self: Self,
+        route: str,
+        major_param: str,
+        send: Callable[[], requests.Response],
+    ) -> requests.Response:
+        """
+        Send a request to Discord while respecting its rate limits.
+
+        :param route: Route template, ie: POST /channels/{channel_id}/messages.
+        :param major_param: Value of the major parameter of the route.
+        :param send: Sends the request using the current headers.
+        :raises RateLimitedError: If Discord keeps rate limiting the request.
+        :return: Response from Discord.
+        """
+        retry_after = 0.0
+
+        for _ in range(MAX_RATE_LIMIT_RETRIES + 1):
+            self.rate_limiter.acquire(route, major_param)
+            response = self._with_auth_retry(send)
+            retry_after = self.rate_limiter.update(route, response, major_param)
+
+            if response.status_code != 429:
+                return response
+
+        raise RateLimitedError(route, retry_after)
+
+    @staticmethod
+    def _response(status_code: int, body: str) -> dict:
+        """
+        Wrap a serialized body in a Lambda proxy response.
+
+        :param status_code: HTTP status code of the response.
+        :param body: Body of the response as JSON.
+        :return: A dictionary with the response.
+        """
+        return {
+            "isBase64Encoded": False,
+            "statusCode": status_code,
+            "body": body,
+        }
 
     def get_success_response(
         self: Self,
@@ -42,30 +239,31 @@ class DiscordClient:
         :param ping: If true, send a pong response.
         :return: A dictionary with the response.
         """
-        if not ping:
-            return {
-                "isBase64Encoded": False,
-                "statusCode": 200,
-                "body": json.dumps(
-                    {
-                        "type": self.response_types["CHANNEL_MESSAGE_WITH_SOURCE"],
-                        "data": {
-                            "content": content,
-                        },
-                    },
-                ),
-            }
+        if ping:
+            return self._response(200, self._pong_body)
 
-        else:
-            return {
-                "isBase64Encoded": False,
-                "statusCode": 200,
-                "body": json.dumps(
-                    {
-                        "type": self.response_types["PONG"],
+        return self._response(
+            200,
+            _dumps(
+                {
+                    "type": self.response_types["CHANNEL_MESSAGE_WITH_SOURCE"],
+                    "data": {
+                        "content": content,
                     },
-                ),
-            }
+                },
+            ),
+        )
+
+    def get_deferred_response(self: Self) -> dict:
+        """
+        Get a response that tells Discord the reply will come later.
+
+        Discord shows a loading state until the original response is edited
+        through the interaction webhook.
+
+        :return: A dictionary with the response.
+        """
+        return self._response(200, self._deferred_body)
 
     def get_unauthorized_response(self: Self, content: str) -> dict:
         """
@@ -74,10 +272,9 @@ class DiscordClient:
         :param content: Content to send.
         :return: A dictionary with the response.
         """
-        return {
-            "isBase64Encoded": False,
-            "statusCode": 401,
-            "body": json.dumps(
+        return self._response(
+            401,
+            _dumps(
                 {
                     "type": self.response_types["MESSAGE_NO_SOURCE"],
                     "data": {
@@ -85,7 +282,7 @@ class DiscordClient:
                     },
                 },
             ),
-        }
+        )
 
     def get_error_response(self: Self, content: str) -> dict:
         """
@@ -94,10 +291,9 @@ class DiscordClient:
         :param content: Content to send.
         :return: A dictionary with the response.
         """
-        return {
-            "isBase64Encoded": False,
-            "statusCode": 500,
-            "body": json.dumps(
+        return self._response(
+            500,
+            _dumps(
                 {
                     "type": self.response_types["MESSAGE_NO_SOURCE"],
                     "data": {
@@ -105,7 +301,37 @@ class DiscordClient:
                     },
                 },
             ),
-        }
+        )
+
+    def pre_validate_event(self: Self, event: dict) -> tuple[str, str, bytes]:
+        """
+        Run the cheap checks on an event before verifying its signature.
+
+        :param event: AWS event generated by Discord.
+        :raises ValueError: If the event can't possibly carry a valid signature.
+        :return: Raw body, timestamp and signature of the event.
+        """
+        headers = event.get("headers") or {}
+        raw_body = event.get("body")
+        auth_sig = headers.get("x-signature-ed25519")
+        auth_ts = headers.get("x-signature-timestamp")
+
+        if raw_body is None or auth_sig is None or auth_ts is None:
+            raise ValueError("Missing body or signature headers.")
+
+        if len(auth_sig) != SIGNATURE_HEX_LENGTH:
+            raise ValueError("Malformed signature.")
+
+        if not auth_ts.isdigit():
+            raise ValueError("Malformed timestamp.")
+
+        if abs(time.time() - int(auth_ts)) > self.max_timestamp_skew_seconds:
+            raise ValueError("Stale timestamp.")
+
+        if auth_sig.lower() in self._recent_signatures:
+            raise ValueError("Replayed signature.")
+
+        return raw_body, auth_ts, bytes.fromhex(auth_sig)
 
     def verify_event_signature(self: Self, event: dict) -> bool:
         """
@@ -114,15 +340,79 @@ class DiscordClient:
         :param event: AWS event generated by Discord.
         :return: True if the signature is valid.
         """
-        public_key = self._secret["PublicKey"]
+        raw_body, auth_ts, signature = self.pre_validate_event(event)
 
-        raw_body = event.get("body")
-        auth_sig = event["headers"].get("x-signature-ed25519")
-        auth_ts = event["headers"].get("x-signature-timestamp")
+        verify_key = _get_verify_key(self._secret["PublicKey"])
+
+        verify_key.verify(f"{auth_ts}{raw_body}".encode(), signature)
+
+        self._recent_signatures[signature.hex()] = None
 
-        verify_key = VerifyKey(bytes.fromhex(public_key))
+        if len(self._recent_signatures) > RECENT_SIGNATURES_SIZE:
+            self._recent_signatures.popitem(last=False)
 
-        verify_key.verify(f"{auth_ts}{raw_body}".encode(), bytes.fromhex(auth_sig))
+        return True
+
+    def edit_original_response(
+        self: Self,
+        content: dict,
+        application_id: str,
+        interaction_token: str,
+    ) -> bool:
+        """
+        Replace the original response of an interaction.
+
+        Interaction webhooks are authorized by the token in the URL, so they
+        don't need channel permissions and have their own rate limits.
+
+        :param content: Content to send.
+        :param application_id: ID of the application of the bot.
+        :param interaction_token: Token of the interaction.
+        :raises Exception: If the response was not edited successfully.
+        :return: True if the response was edited successfully.
+        """
+        url = f"{self._api_url}/webhooks/{application_id}/{interaction_token}/messages/@original"
+
+        response = self._send(
+            "PATCH /webhooks/{application_id}/{interaction_token}/messages/@original",
+            interaction_token,
+            lambda: self._session.patch(url, json=content),
+        )
+
+        if response.status_code != 200:
+            raise Exception(
+                f"Failed to edit the original response: {str(response.content)}",
+            )
+
+        return True
+
+    def send_followup_message(
+        self: Self,
+        content: dict,
+        application_id: str,
+        interaction_token: str,
+    ) -> bool:
+        """
+        Send a follow-up message to an interaction.
+
+        :param content: Content to send.
+        :param application_id: ID of the application of the bot.
+        :param interaction_token: Token of the interaction.
+        :raises Exception: If the message was not sent successfully.
+        :return: True if the message was sent successfully.
+        """
+        url = f"{self._api_url}/webhooks/{application_id}/{interaction_token}"
+
+        response = self._send(
+            "POST /webhooks/{application_id}/{interaction_token}",
+            interaction_token,
+            lambda: self._session.post(url, json=content),
+        )
+
+        if response.status_code != 200:
+            raise Exception(
+                f"Failed to send the follow-up message: {str(response.content)}",
+            )
 
         return True
 
@@ -134,15 +424,29 @@ class DiscordClient:
         :raises RuntimeError: If the user could not be retrieved.
         :return: Username and discriminator of the user.
         """
+        cached_user = self.user_cache.get(user_id)
+
+        if cached_user is not None:
+            return cached_user
+
         url = f"{self._api_url}/users/{user_id}"
 
-        response = requests.get(url, headers=self._headers)
+        response = self._send(
+            "GET /users/{user_id}",
+            "",
+            lambda: self._session.get(url, headers=self._headers),
+        )
 
         if response.status_code == 200:
             response_content = json.loads(response.content)
-            return f'{response_content["username"]}#{response_content["discriminator"]}'
+            user = f'{response_content["username"]}#{response_content["discriminator"]}'
+            self.user_cache.set(user_id, user)
+            return user
 
         else:
+            if response.status_code == 404:
+                self.user_cache.set_unknown(user_id)
+
             raise RuntimeError(
                 f"""Unable to get user {user_id} -> {str(json.loads(response.content))}""",
             )
@@ -168,6 +472,7 @@ class DiscordClient:
         user_id = discord_event["member"]["user"]["id"]
         command_issuer = f"{user_name}#{discriminator}"
         channel_id = discord_event["channel_id"]
+        resolved = discord_event["data"].get("resolved") or {}
 
         return {
             "discord_event": discord_event,
@@ -176,6 +481,14 @@ class DiscordClient:
             "command_issuer": command_issuer,
             "command_issuer_id": user_id,
             "channel_id": channel_id,
+            "application_id": discord_event.get("application_id"),
+            "interaction_token": discord_event.get("token"),
+            "interaction_id": discord_event.get("id"),
+            "resolved_users": {
+                resolved_id: f'{resolved_user["username"]}#{resolved_user["discriminator"]}'
+                for resolved_id, resolved_user in resolved.get("users", {}).items()
+            },
+            "resolved_members": resolved.get("members", {}),
         }
 
     def send_message_to_channel(self: Self, content: dict, channel_id: str) -> bool:
@@ -189,7 +502,11 @@ class DiscordClient:
         """
         url = f"{self._api_url}/channels/{channel_id}/messages"
 
-        response = requests.post(url, headers=self._headers, json=content)
+        response = self._send(
+            "POST /channels/{channel_id}/messages",
+            channel_id,
+            lambda: self._session.post(url, headers=self._headers, json=content),
+        )
 
         if response.status_code != 200:
             raise Exception(
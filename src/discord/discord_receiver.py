@@ -2,11 +2,41 @@
 
 import json
 import os
+from functools import lru_cache
 
-from discord.discord_client import DiscordClient
-from utils.sqs_client import SqsClient
+from discord.inline_commands import run_inline
+from utils.client_registry import client_registry
+from utils.tracing import tracer
 
 
+@lru_cache(maxsize=8)
+def _parse_mapping(raw_mapping: str | None) -> dict[str, str]:
+    """
+    Parse a JSON mapping from an environment variable.
+
+    :param raw_mapping: JSON object, or None if the variable is not set.
+    :return: The parsed mapping, empty if it is not set.
+    """
+    return json.loads(raw_mapping) if raw_mapping else {}
+
+
+def get_queue_url(command: str | None) -> str | None:
+    """
+    Get the queue a command must be sent to.
+
+    COMMAND_LANES maps commands to priority lanes and LANE_QUEUE_URLS maps
+    lanes to queues. Commands without a lane go to SQS_QUEUE_URL.
+
+    :param command: Name of the command.
+    :return: URL of the queue.
+    """
+    lane = _parse_mapping(os.environ.get("COMMAND_LANES")).get(command or "")
+    lane_queue_urls = _parse_mapping(os.environ.get("LANE_QUEUE_URLS"))
+
+    return lane_queue_urls.get(lane or "") or os.environ.get("SQS_QUEUE_URL")
+
+
+@tracer.handler("discord_receiver")
 def discord_receiver(event: dict, _: dict) -> dict:
     """
     Receive an event sent to a discord bot.
@@ -15,9 +45,9 @@ def discord_receiver(event: dict, _: dict) -> dict:
     :param _: AWS Lambda context.
     :return: Response to be sent to Discord.
     """
-    discord_client = DiscordClient(os.environ.get("BOT_SECRET_NAME"))
-    sqs_client = SqsClient()
-    sqs_queue_url = os.environ.get("SQS_QUEUE_URL")
+    discord_client = client_registry.get_discord_client(
+        os.environ.get("BOT_SECRET_NAME"),
+    )
 
     try:
         discord_client.verify_event_signature(event)
@@ -32,6 +62,14 @@ def discord_receiver(event: dict, _: dict) -> dict:
     if is_ping:
         return discord_client.get_success_response(None, ping=is_ping)
 
+    content = run_inline(discord_event_attributes, discord_client)
+
+    if content is not None:
+        return discord_client.get_success_response(content)
+
+    sqs_queue_url = get_queue_url(discord_event_attributes.get("command"))
+    sqs_client = client_registry.get_sqs_client()
     sqs_client.send_sqs_message(sqs_queue_url, json.dumps(discord_event_attributes))
 
-    return discord_client.get_success_response("Working on it...")
+    # The processing lambda edits this response once the command ran
+    return discord_client.get_deferred_response()
@@ -0,0 +1,97 @@
+"""Run cheap commands inside the receiver instead of through the queue."""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import TYPE_CHECKING
+
+from discord.command_router import CommandContext
+
+if TYPE_CHECKING:
+    from discord.discord_client import DiscordClient
+
+# Discord drops interactions not answered within 3 seconds
+INLINE_BUDGET_SECONDS = 1.0
+
+# Commands that can run inline, by the module of the router that handles
+# them. Only CPU-only commands belong here: the receiver role can't reach
+# the tables of the bots, and a command that runs out of budget is sent to
+# the queue and runs a second time.
+INLINE_COMMAND_MODULES = {
+    "taylor": "processing_lambdas.simp_bot",
+}
+
+_executor = ThreadPoolExecutor(max_workers=2)
+
+
+def get_inline_commands() -> set[str]:
+    """
+    Get the commands enabled to run inline.
+
+    INLINE_COMMANDS is a comma separated list of the enabled commands.
+
+    :return: Names of the enabled commands.
+    """
+    enabled = os.environ.get("INLINE_COMMANDS", "")
+
+    return {
+        command.strip()
+        for command in enabled.split(",")
+        if command.strip() in INLINE_COMMAND_MODULES
+    }
+
+
+def _run(context: CommandContext, discord_client: DiscordClient) -> str | None:
+    """
+    Import the router of a command and run it.
+
+    :param context: The parsed command.
+    :param discord_client: Discord client of the bot.
+    :return: Reply of the command, None if the router doesn't handle it.
+    """
+    module = importlib.import_module(INLINE_COMMAND_MODULES[context.command])
+
+    return module.router.run(context, discord_client)
+
+
+def run_inline(
+    attributes: dict,
+    discord_client: DiscordClient,
+    budget_seconds: float | None = None,
+) -> str | None:
+    """
+    Run a command inline if it is enabled and finishes within the budget.
+
+    :param attributes: Attributes from DiscordClient.get_event_attributes.
+    :param discord_client: Discord client of the bot.
+    :param budget_seconds: Seconds the command can take, INLINE_BUDGET_SECONDS
+        or the env var of the same name if None.
+    :return: Reply of the command, None if it must go through the queue.
+    """
+    command = attributes.get("command")
+
+    if command not in get_inline_commands():
+        return None
+
+    if budget_seconds is None:
+        budget_seconds = float(
+            os.environ.get("INLINE_BUDGET_SECONDS", INLINE_BUDGET_SECONDS),
+        )
+
+    try:
+        context = CommandContext.from_attributes(attributes)
+        future = _executor.submit(_run, context, discord_client)
+
+        return future.result(timeout=budget_seconds)
+
+    except FutureTimeoutError:
+        logging.info(f"Command {command} ran out of budget, queueing it...")
+
+    except Exception as e:
+        logging.info(f"Command {command} failed inline, queueing it: {e}")
+
+    return None
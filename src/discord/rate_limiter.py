@@ -0,0 +1,252 @@
+"""Rate limit tracking for the Discord REST API."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Self
+
+if TYPE_CHECKING:
+    import requests
+
+DEFAULT_MAX_WAIT_SECONDS = 2.0
+
+
+class RateLimitedError(RuntimeError):
+    """Raised when a request can't be sent within the allowed wait."""
+
+    def __init__(self: Self, route: str, retry_after: float) -> None:
+        """
+        Create the error.
+
+        :param route: Route that is rate limited.
+        :param retry_after: Seconds until the route can be used again.
+        """
+        super().__init__(
+            f"Discord rate limit hit on {route}, retry after {retry_after:.2f}s",
+        )
+        self.route = route
+        self.retry_after = retry_after
+
+
+class _Bucket:
+    """State of a single Discord rate limit bucket."""
+
+    def __init__(
+        self: Self,
+        limit: int,
+        remaining: int,
+        reset_at: float,
+        window: float,
+    ) -> None:
+        """
+        Create the bucket.
+
+        :param limit: Requests allowed per window.
+        :param remaining: Requests left in the current window.
+        :param reset_at: Clock value when the window resets.
+        :param window: Length of the window in seconds.
+        """
+        self.limit = limit
+        self.remaining = remaining
+        self.reset_at = reset_at
+        self.window = window
+
+
+class DiscordRateLimiter:
+    """
+    Pace requests to Discord using the rate limit headers it sends back.
+
+    Routes are mapped to the bucket reported in X-RateLimit-Bucket, and
+    buckets are tracked per major parameter (ie, the channel ID). The state
+    lives as long as the client, so it carries over warm invocations.
+    Buckets whose window has reset are dropped, a reset bucket is the same as
+    an unknown one, so interaction tokens used as major parameters don't pile
+    up in warm containers.
+    """
+
+    def __init__(
+        self: Self,
+        max_wait_seconds: float = DEFAULT_MAX_WAIT_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Create the rate limiter.
+
+        :param max_wait_seconds: Longest a request may wait before failing.
+        :param clock: Monotonic clock in seconds.
+        :param sleep: Function used to wait.
+        """
+        self.max_wait_seconds = max_wait_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._route_buckets: dict[str, str] = {}
+        self._buckets: dict[str, _Bucket] = {}
+        self._global_reset_at = 0.0
+        self.wait_seconds_total = 0.0
+        self.waits = 0
+        self.rate_limited_responses = 0
+
+    def metrics(self: Self) -> dict:
+        """
+        Get the counters of the rate limiter.
+
+        :return: Time spent waiting, number of waits, number of 429s and
+            number of buckets tracked.
+        """
+        return {
+            "wait_seconds_total": self.wait_seconds_total,
+            "waits": self.waits,
+            "rate_limited_responses": self.rate_limited_responses,
+            "buckets": len(self._buckets),
+        }
+
+    def _bucket_key(self: Self, route: str, major_param: str) -> str:
+        """
+        Get the key of the bucket a route belongs to.
+
+        Routes whose bucket is not known yet are tracked on their own.
+
+        :param route: Route template, ie: POST /channels/{channel_id}/messages.
+        :param major_param: Value of the major parameter of the route.
+        :return: The bucket key.
+        """
+        return f"{self._route_buckets.get(route, route)}:{major_param}"
+
+    def acquire(self: Self, route: str, major_param: str = "") -> float:
+        """
+        Wait until a request to a route can be sent.
+
+        :param route: Route template, ie: POST /channels/{channel_id}/messages.
+        :param major_param: Value of the major parameter of the route.
+        :raises RateLimitedError: If the wait would exceed max_wait_seconds.
+        :return: Seconds spent waiting.
+        """
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                now = self._clock()
+                wait = self._global_reset_at - now
+                bucket = self._buckets.get(self._bucket_key(route, major_param))
+
+                if bucket is not None:
+                    if now >= bucket.reset_at:
+                        bucket.remaining = bucket.limit
+                        bucket.reset_at = now + bucket.window
+
+                    if bucket.remaining <= 0:
+                        wait = max(wait, bucket.reset_at - now)
+
+                if wait <= 0:
+                    if bucket is not None:
+                        bucket.remaining -= 1
+
+                    if waited:
+                        self.wait_seconds_total += waited
+                        self.waits += 1
+
+                    return waited
+
+            if waited + wait > self.max_wait_seconds:
+                raise RateLimitedError(route, wait)
+
+            logging.info(
+                f"Waiting {wait:.2f}s for the Discord rate limit on {route}...",
+            )
+            self._sleep(wait)
+            waited += wait
+
+    def update(
+        self: Self,
+        route: str,
+        response: requests.Response,
+        major_param: str = "",
+    ) -> float:
+        """
+        Update the state of a bucket from the headers of a response.
+
+        :param route: Route template, ie: POST /channels/{channel_id}/messages.
+        :param response: Response sent by Discord.
+        :param major_param: Value of the major parameter of the route.
+        :return: Seconds to wait before retrying, 0 if the request was not rate limited.
+        """
+        headers = response.headers
+        bucket_id = headers.get("X-RateLimit-Bucket")
+        limit = headers.get("X-RateLimit-Limit")
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+
+        with self._lock:
+            now = self._clock()
+            self._evict_reset_buckets(now)
+
+            if isinstance(bucket_id, str):
+                self._route_buckets[route] = bucket_id
+
+            bucket_key = self._bucket_key(route, major_param)
+
+            if isinstance(remaining, str) and isinstance(reset_after, str):
+                self._buckets[bucket_key] = _Bucket(
+                    int(limit) if isinstance(limit, str) else int(remaining) + 1,
+                    int(remaining),
+                    now + float(reset_after),
+                    float(reset_after),
+                )
+
+            if response.status_code != 429:
+                return 0.0
+
+            self.rate_limited_responses += 1
+            retry_after = self._get_retry_after(response)
+            is_global = (
+                headers.get("X-RateLimit-Global") == "true"
+                or headers.get("X-RateLimit-Scope") == "global"
+            )
+
+            if is_global:
+                self._global_reset_at = max(self._global_reset_at, now + retry_after)
+
+            else:
+                bucket = self._buckets.setdefault(
+                    bucket_key,
+                    _Bucket(1, 0, 0.0, retry_after),
+                )
+                bucket.remaining = 0
+                bucket.reset_at = now + retry_after
+
+            logging.info(f"Discord rate limited {route} for {retry_after:.2f}s...")
+
+            return retry_after
+
+    def _evict_reset_buckets(self: Self, now: float) -> None:
+        """
+        Drop the buckets whose window has reset, must hold the lock.
+
+        :param now: Current clock value.
+        """
+        expired = [
+            key for key, bucket in self._buckets.items() if now >= bucket.reset_at
+        ]
+
+        for key in expired:
+            del self._buckets[key]
+
+    @staticmethod
+    def _get_retry_after(response: requests.Response) -> float:
+        """
+        Get how long to wait after a 429 response.
+
+        :param response: The 429 response sent by Discord.
+        :return: Seconds to wait.
+        """
+        try:
+            return float(response.json()["retry_after"])
+
+        except (ValueError, KeyError, TypeError):
+            retry_after = response.headers.get("Retry-After")
+
+            return float(retry_after) if isinstance(retry_after, str) else 1.0
@@ -0,0 +1,154 @@
+"""Cache of Discord user names."""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import TYPE_CHECKING, Self
+
+from utils.ddb_codec import from_item, to_item
+from utils.ttl_cache import TtlLruCache
+
+if TYPE_CHECKING:
+    from utils.ddb_client import DdbClient
+
+USER_TTL_SECONDS = 3600
+UNKNOWN_USER_TTL_SECONDS = 300
+_UNKNOWN_USER = object()
+
+
+class UserCache:
+    """
+    Cache of Discord user names.
+
+    The first tier lives in memory for the lifetime of the container. An
+    optional DDB table can be used as a second tier shared by every container,
+    so the names survive cold starts. IDs Discord does not know are cached too,
+    for a shorter time and only in memory.
+    """
+
+    def __init__(
+        self: Self,
+        max_size: int = 1024,
+        ttl_seconds: float = USER_TTL_SECONDS,
+        unknown_ttl_seconds: float = UNKNOWN_USER_TTL_SECONDS,
+        ddb_client: DdbClient | None = None,
+        table_name: str | None = None,
+    ) -> None:
+        """
+        Create the cache.
+
+        :param max_size: Maximum number of users kept in memory.
+        :param ttl_seconds: Seconds a user name is valid.
+        :param unknown_ttl_seconds: Seconds an unknown user ID is remembered.
+        :param ddb_client: DDB client for the shared tier.
+        :param table_name: DDB table of the shared tier, None to disable it.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.unknown_ttl_seconds = unknown_ttl_seconds
+        self._memory = TtlLruCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self._ddb_client = ddb_client
+        self._table_name = table_name
+        self.shared_hits = 0
+
+    def get(self: Self, user_id: str) -> str | None:
+        """
+        Get the name of a user from the cache.
+
+        :param user_id: ID of the user.
+        :raises RuntimeError: If the user is cached as unknown.
+        :return: Username and discriminator of the user, None if not cached.
+        """
+        cached = self._memory.get(user_id)
+
+        if cached is _UNKNOWN_USER:
+            raise RuntimeError(f"Unable to get user {user_id} -> Unknown User")
+
+        if cached is not None:
+            return cached
+
+        user_name = self._get_shared(user_id)
+
+        if user_name is not None:
+            self.shared_hits += 1
+            self._memory.set(user_id, user_name)
+
+        return user_name
+
+    def set(self: Self, user_id: str, user_name: str) -> None:
+        """
+        Cache the name of a user.
+
+        :param user_id: ID of the user.
+        :param user_name: Username and discriminator of the user.
+        """
+        self._memory.set(user_id, user_name)
+        self._set_shared(user_id, user_name)
+
+    def set_unknown(self: Self, user_id: str) -> None:
+        """
+        Remember that Discord does not know a user ID.
+
+        :param user_id: ID of the user.
+        """
+        self._memory.set(user_id, _UNKNOWN_USER, self.unknown_ttl_seconds)
+
+    def metrics(self: Self) -> dict:
+        """
+        Get the counters of the cache.
+
+        :return: Memory hits, misses and size, plus hits in the shared tier.
+        """
+        return {**self._memory.metrics(), "shared_hits": self.shared_hits}
+
+    def _get_shared(self: Self, user_id: str) -> str | None:
+        """
+        Get the name of a user from the shared tier.
+
+        :param user_id: ID of the user.
+        :return: Username and discriminator of the user, None if not found.
+        """
+        if self._ddb_client is None or not self._table_name:
+            return None
+
+        try:
+            item = self._ddb_client.get_item(self._table_name, "user_id", user_id)
+
+        except Exception as e:
+            logging.info(f"Shared user cache unavailable: {e}")
+            return None
+
+        if item is None:
+            return None
+
+        cached = from_item(item)
+
+        if cached["expires_at"] <= time.time():
+            return None
+
+        return cached["user_name"]
+
+    def _set_shared(self: Self, user_id: str, user_name: str) -> None:
+        """
+        Store the name of a user in the shared tier.
+
+        :param user_id: ID of the user.
+        :param user_name: Username and discriminator of the user.
+        """
+        if self._ddb_client is None or not self._table_name:
+            return
+
+        try:
+            self._ddb_client.put_item(
+                self._table_name,
+                to_item(
+                    {
+                        "user_id": user_id,
+                        "user_name": user_name,
+                        "expires_at": int(time.time() + self.ttl_seconds),
+                    },
+                ),
+            )
+
+        except Exception as e:
+            logging.info(f"Shared user cache unavailable: {e}")
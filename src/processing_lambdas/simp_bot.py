@@ -3,93 +3,197 @@
 import json
 import os
 
+from discord.command_router import CommandContext, CommandRouter
 from discord.discord_client import DiscordClient
+from utils.client_registry import client_registry
+from utils.idempotency import IdempotencyStore
+from utils.process_records import process_records
+from utils.resolve_user import resolve_user
 from utils.simp_bot.add_points import add_points
 from utils.simp_bot.get_point_balance import get_point_balance
-from utils.sqs_client import SqsClient
+from utils.simp_bot.rebuild_point_balances import rebuild_point_balances
+from utils.simp_bot.taylor import random_song
+from utils.tracing import tracer
 
+router = CommandRouter()
 
-def simp_bot(event: dict, _: dict) -> None:
+
+def _min_interval_seconds() -> float:
+    """
+    Get the seconds that must pass between two transactions of the same user.
+
+    :return: POINTS_MIN_INTERVAL_SECONDS, 0 if the limit is disabled.
+    """
+    return float(os.environ.get("POINTS_MIN_INTERVAL_SECONDS", 0))
+
+
+def _points(context: CommandContext) -> int:
+    """
+    Get the points of a transaction command.
+
+    :param context: The parsed add_points or remove_points command.
+    :raises ValueError: If the points are not positive, remove_points is the
+        only way to take points away.
+    :return: The points, always positive.
+    """
+    points = context.options["points"]
+
+    if points <= 0:
+        raise ValueError("Points must be a positive number.")
+
+    return points
+
+
+@router.command("add_points")
+def _add_points(context: CommandContext, discord_client: DiscordClient) -> str:
+    """
+    Add points to a user.
+
+    :param context: The parsed command.
+    :param discord_client: Discord client of the bot.
+    :return: Reply to send to the channel.
+    """
+    points = _points(context)
+    discord_user = resolve_user(
+        discord_client,
+        context.options["user"],
+        context.resolved_users,
+    )
+    add_points(
+        discord_user,
+        points,
+        context.command_issuer,
+        transaction_id=context.interaction_id,
+        min_interval_seconds=_min_interval_seconds(),
+    )
+
+    return "Transaction completed :eggplant:"
+
+
+@router.command("remove_points")
+def _remove_points(context: CommandContext, discord_client: DiscordClient) -> str:
+    """
+    Remove points from a user.
+
+    Balances can't go below zero unless ALLOW_NEGATIVE_BALANCES is true.
+
+    :param context: The parsed command.
+    :param discord_client: Discord client of the bot.
+    :return: Reply to send to the channel.
+    """
+    points = _points(context)
+    discord_user = resolve_user(
+        discord_client,
+        context.options["user"],
+        context.resolved_users,
+    )
+    add_points(
+        discord_user,
+        points * -1,
+        context.command_issuer,
+        transaction_id=context.interaction_id,
+        non_negative=os.environ.get("ALLOW_NEGATIVE_BALANCES") != "true",
+        min_interval_seconds=_min_interval_seconds(),
+    )
+
+    return "Transaction completed :eggplant:"
+
+
+@router.command("point_balance")
+def _point_balance(_: CommandContext, __: DiscordClient) -> str:
+    """
+    Get the point balance of all users.
+
+    :param _: The parsed command.
+    :param __: Discord client of the bot.
+    :return: Reply to send to the channel.
+    """
+    data = get_point_balance()
+
+    return f"```\n{json.dumps(data, indent=4)}\n```"
+
+
+@router.command("taylor")
+def _taylor(_: CommandContext, __: DiscordClient) -> str:
+    """
+    Send a random Taylor Swift song.
+
+    :param _: The parsed command.
+    :param __: Discord client of the bot.
+    :return: Reply to send to the channel.
+    """
+    return random_song()
+
+
+def _process_record(
+    record: dict,
+    discord_client: DiscordClient,
+    idempotency_store: IdempotencyStore,
+) -> None:
+    """
+    Process a single SQS record sent to SimpBot.
+
+    :param record: SQS record with the Discord event attributes.
+    :param discord_client: Discord client of the bot.
+    :param idempotency_store: Store that skips redelivered interactions.
+    """
+    router.dispatch(
+        CommandContext.from_record(record),
+        discord_client,
+        idempotency_store,
+    )
+
+
+def _ordering_key(record: dict) -> str:
+    """
+    Get the key the records of SimpBot are ordered by.
+
+    Replies in a channel keep the order the commands were sent in.
+
+    :param record: SQS record with the Discord event attributes.
+    :return: The ordering key.
+    """
+    return json.loads(record["body"])["channel_id"]
+
+
+@tracer.handler("simp_bot")
+def simp_bot(event: dict, _: dict) -> dict:
     """
     Handle a request to SimpBot.
 
+    Records are processed concurrently, successful records are deleted by
+    the SQS event source and only the failed ones are reported back so they
+    can be retried. Redelivered interactions that already ran are skipped.
+
     :param event: AWS event from SQS.
     :param _: AWS context.
+    :return: The records that failed, in the SQS partial batch response format.
+    """
+    discord_client = client_registry.get_discord_client(
+        os.environ.get("BOT_SECRET_NAME"),
+    )
+    idempotency_store = client_registry.get_idempotency_store()
+
+    failures = process_records(
+        event["Records"],
+        lambda record: _process_record(record, discord_client, idempotency_store),
+        ordering_key=_ordering_key,
+    )
+    discord_client.record_metrics()
+
+    return failures
+
+
+@tracer.handler("simp_bot_rebuild_point_balances")
+def simp_bot_rebuild_point_balances(_: dict, __: dict) -> dict:
+    """
+    Rebuild the point balances of SimpBot from the ledger.
+
+    Runs on the deploy that creates the balances table to backfill it, and
+    can be invoked again to fix balances that drifted.
+
+    :param _: Not used.
+    :param __: Not used.
+    :return: The balances that were corrected.
     """
-    discord_client = DiscordClient(os.environ.get("BOT_SECRET_NAME"))
-    sqs_queue_url = os.environ.get("SQS_QUEUE_URL")
-    sqs_client = SqsClient()
-
-    messages = [message for message in event["Records"]]
-
-    for message in messages:
-        body = json.loads(message["body"])
-        command = body["command"]
-        options = body["options"]
-        command_issuer = body["command_issuer"]
-        channel_id = body["channel_id"]
-
-        if command == "add_points":
-            try:
-                discord_user = discord_client.get_user(
-                    [i for i in options if i["name"] == "user"][0]["value"],
-                )
-                points = [i for i in options if i["name"] == "points"][0]["value"]
-                add_points(discord_user, points, command_issuer)
-
-                discord_client.send_message_to_channel(
-                    {
-                        "content": "Transaction completed :eggplant:",
-                    },
-                    channel_id,
-                )
-
-            except Exception as e:
-                discord_client.send_message_to_channel(
-                    {
-                        "content": str(e),
-                    },
-                    channel_id,
-                )
-
-        elif command == "remove_points":
-            try:
-                discord_user = discord_client.get_user(
-                    [i for i in options if i["name"] == "user"][0]["value"],
-                )
-                points = [i for i in options if i["name"] == "points"][0]["value"] * -1
-                add_points(discord_user, points, command_issuer)
-
-                discord_client.send_message_to_channel(
-                    {
-                        "content": "Transaction completed :eggplant:",
-                    },
-                    channel_id,
-                )
-
-            except Exception as e:
-                discord_client.send_message_to_channel(
-                    {
-                        "content": str(e),
-                    },
-                    channel_id,
-                )
-
-        elif command == "point_balance":
-            try:
-                data = get_point_balance()
-
-                discord_client.send_message_to_channel(
-                    {"content": f"```\n{json.dumps(data, indent=4)}\n```"},
-                    channel_id,
-                )
-
-            except Exception as e:
-                discord_client.send_message_to_channel(
-                    {
-                        "content": str(e),
-                    },
-                    channel_id,
-                )
-
-        sqs_client.delete_sqs_message(sqs_queue_url, message["receiptHandle"])
+    return {"corrected": rebuild_point_balances()}
@@ -1,114 +1,297 @@
 """Handler for the Watchdog2 bot."""
 
 import json
+import logging
 import os
 
+from discord.command_router import CommandContext, CommandRouter
 from discord.discord_client import DiscordClient
-from utils.ddb_client import DdbClient
-from utils.sqs_client import SqsClient
+from utils.client_registry import client_registry
+from utils.ddb_codec import from_item
+from utils.idempotency import IdempotencyStore
+from utils.process_records import process_records
+from utils.resolve_user import resolve_user
+from utils.tracing import tracer
 from utils.watchdog_2.get_registered_users import get_registered_users
-from utils.watchdog_2.raid_alert import raid_alert
+from utils.watchdog_2.raid_alert import raid_alert_many
 from utils.watchdog_2.update_contact_info import update_contact_info
 
+router = CommandRouter()
 
-def watchdog2(event: dict, _: dict) -> None:
+# raid2 takes one required user and up to four more optional ones
+RAID_USER_OPTIONS = ["user", "user2", "user3", "user4", "user5"]
+
+
+def _ordering_key(record: dict) -> str:
+    """
+    Get the key Watchdog2 records must be processed in order by.
+
+    Contact info updates of the same user must keep their order, everything
+    else is independent and can run in parallel.
+
+    :param record: SQS record with the Discord event attributes.
+    :return: The ordering key of the record.
+    """
+    body = json.loads(record["body"])
+
+    if body["command"] == "update2":
+        return f"update2:{body['command_issuer']}"
+
+    return record["messageId"]
+
+
+def _raid_targets(context: CommandContext) -> list[str]:
+    """
+    Get the IDs of the users a raid2 command targets.
+
+    :param context: The parsed raid2 command.
+    :return: IDs of the targeted users, without duplicates.
+    """
+    return list(
+        dict.fromkeys(
+            context.options[name]
+            for name in RAID_USER_OPTIONS
+            if context.options.get(name)
+        ),
+    )
+
+
+def _prefetch_contact_info(records: list[dict]) -> dict[str, dict]:
+    """
+    Load the contact info of the raid2 targets of a batch in one call.
+
+    Only targets resolved in the interaction are known up front, the rest are
+    looked up one by one when their command runs.
+
+    :param records: SQS records of the batch.
+    :return: Contact info items by Discord user.
+    """
+    discord_users = []
+
+    for record in records:
+        try:
+            context = CommandContext.from_record(record)
+
+        except Exception:
+            continue
+
+        if context.command == "raid2":
+            discord_users.extend(
+                context.resolved_users[user_id]
+                for user_id in _raid_targets(context)
+                if user_id in context.resolved_users
+            )
+
+    if not discord_users:
+        return {}
+
+    try:
+        return client_registry.get_ddb_client().batch_get(
+            os.environ.get("CONTACT_INFO_TABLE_NAME"),  # type: ignore
+            "discord_user",
+            discord_users,
+            projection=["phone_number"],
+        )
+
+    except Exception as e:
+        logging.info(f"Unable to prefetch contact info: {e}")
+        return {}
+
+
+@router.command("update2")
+def _update2(context: CommandContext, _: DiscordClient) -> str:
+    """
+    Add or update the phone number of the user that sent the command.
+
+    :param context: The parsed command.
+    :param _: Discord client of the bot.
+    :return: Reply to send to the channel.
+    """
+    try:
+        update_contact_info(
+            context.command_issuer,
+            context.options["number"],
+            os.environ.get("CONTACT_INFO_TABLE_NAME"),
+        )
+
+    except ValueError:
+        return """
+                    [ValueError]: Use this format for your number +12223334455,
+                    see this: https://en.wikipedia.org/wiki/E.164
+                    """
+
+    return "Info updated!"
+
+
+@router.command("raid2")
+def _raid2(context: CommandContext, discord_client: DiscordClient) -> str:
+    """
+    Send a raid alert to one or more users.
+
+    :param context: The parsed command.
+    :param discord_client: Discord client of the bot.
+    :raises ValueError: If a targeted user is not registered in Watchdog.
+    :raises Exception: If the alerts could not be sent, after releasing the
+        alert windows.
+    :return: Reply to send to the channel.
+    """
+    discord_users = [
+        resolve_user(discord_client, user_id, context.resolved_users)
+        for user_id in _raid_targets(context)
+    ]
+    contact_info = {
+        discord_user: context.batch_items[discord_user]
+        for discord_user in discord_users
+        if discord_user in context.batch_items
+    }
+    missing = [user for user in discord_users if user not in contact_info]
+    table_name = os.environ.get("CONTACT_INFO_TABLE_NAME")
+
+    if len(missing) == 1:
+        ddb_item = client_registry.get_ddb_client().get_item(
+            table_name,  # type: ignore
+            "discord_user",
+            missing[0],
+        )
+
+        if ddb_item is not None:
+            contact_info[missing[0]] = ddb_item
+
+    elif missing:
+        contact_info.update(
+            client_registry.get_ddb_client().batch_get(
+                table_name,  # type: ignore
+                "discord_user",
+                missing,
+                projection=["phone_number"],
+            ),
+        )
+
+    unregistered = [user for user in discord_users if user not in contact_info]
+
+    if unregistered:
+        raise ValueError(f"Not registered in Watchdog: {', '.join(unregistered)}")
+
+    # Reports of a user already alerted in the window are only counted
+    dedup = client_registry.get_raid_alert_dedup()
+    reports = {
+        discord_user: dedup.report(discord_user, context.command_issuer)
+        for discord_user in discord_users
+    }
+    to_alert = [discord_user for discord_user, (opened, _) in reports.items() if opened]
+    replies = [
+        f"{discord_user} was already alerted, {reporters} people reported this raid."
+        for discord_user, (opened, reporters) in reports.items()
+        if not opened
+    ]
+
+    if not to_alert:
+        return "\n".join(replies)
+
+    try:
+        phone_numbers = {
+            discord_user: from_item(contact_info[discord_user])["phone_number"]
+            for discord_user in to_alert
+        }
+        results = raid_alert_many(
+            os.environ.get("PINPOINT_APP_ID"),  # type: ignore
+            os.environ.get("ORIGINATION_NUMBER"),  # type: ignore
+            list(phone_numbers.values()),
+        )
+        failed = [
+            discord_user
+            for discord_user, phone_number in phone_numbers.items()
+            if results[phone_number]["sms"]["delivery_status"] != "SUCCESSFUL"
+            and results[phone_number]["voice"]["delivery_status"] != "SUCCESSFUL"
+        ]
+
+    except Exception:
+        # Nobody was paged, the next report must not be collapsed
+        for discord_user in to_alert:
+            dedup.release(discord_user)
+
+        raise
+
+    # Let the next report try again
+    for discord_user in failed:
+        dedup.release(discord_user)
+
+    if failed:
+        replies.insert(0, f"Unable to contact: {', '.join(failed)}")
+
+    elif len(to_alert) == 1:
+        replies.insert(0, "User has been contacted!")
+
+    else:
+        replies.insert(0, f"{len(to_alert)} users have been contacted!")
+
+    return "\n".join(replies)
+
+
+@router.command("registered_users2")
+def _registered_users2(_: CommandContext, __: DiscordClient) -> str:
+    """
+    List the users registered in Watchdog.
+
+    :param _: The parsed command.
+    :param __: Discord client of the bot.
+    :return: Reply to send to the channel.
+    """
+    users = get_registered_users(os.environ.get("CONTACT_INFO_TABLE_NAME"))
+
+    return "\n".join([user for user in users])
+
+
+def _process_record(
+    record: dict,
+    discord_client: DiscordClient,
+    contact_info: dict[str, dict],
+    idempotency_store: IdempotencyStore,
+) -> None:
+    """
+    Process a single SQS record sent to Watchdog2.
+
+    :param record: SQS record with the Discord event attributes.
+    :param discord_client: Discord client of the bot.
+    :param contact_info: Contact info prefetched for the batch.
+    :param idempotency_store: Store that skips redelivered interactions.
+    """
+    router.dispatch(
+        CommandContext.from_record(record, contact_info),
+        discord_client,
+        idempotency_store,
+    )
+
+
+@tracer.handler("watchdog2")
+def watchdog2(event: dict, _: dict) -> dict:
     """
     Handle a request to Watchdog2.
 
+    Records are processed concurrently, successful records are deleted by
+    the SQS event source and only the failed ones are reported back so they
+    can be retried. Redelivered interactions that already ran are skipped.
+
     :param event: AWS event from SQS.
     :param _: AWS context.
+    :return: The records that failed, in the SQS partial batch response format.
     """
-    origination_number = os.environ.get("ORIGINATION_NUMBER")
-    discord_client = DiscordClient(os.environ.get("BOT_SECRET_NAME"))
-    sqs_queue_url = os.environ.get("SQS_QUEUE_URL")
-    contact_info_table_name = os.environ.get("CONTACT_INFO_TABLE_NAME")
-    pinpoint_app_id = os.environ.get("PINPOINT_APP_ID")
-    sqs_client = SqsClient()
-    ddb_client = DdbClient()
-
-    messages = [message for message in event["Records"]]
-
-    for message in messages:
-        body = json.loads(message["body"])
-        command = body["command"]
-        options = body["options"]
-        command_issuer = body["command_issuer"]
-        channel_id = body["channel_id"]
-
-        if command == "update2":
-            try:
-                update_contact_info(
-                    command_issuer,
-                    options[0]["value"],
-                    contact_info_table_name,
-                )
-                discord_client.send_message_to_channel(
-                    {
-                        "content": "Info updated!",
-                    },
-                    channel_id,
-                )
-
-            except ValueError:
-                discord_client.send_message_to_channel(
-                    {
-                        "content": """
-                    [ValueError]: Use this format for your number +12223334455,
-                    see this: https://en.wikipedia.org/wiki/E.164
-                    """,
-                    },
-                    channel_id,
-                )
-
-            except Exception as e:
-                discord_client.send_message_to_channel(
-                    {
-                        "content": str(e),
-                    },
-                    channel_id,
-                )
-
-        elif command == "raid2":
-            try:
-                discord_user = discord_client.get_user(options[0]["value"])
-                ddb_item = ddb_client.get_item(
-                    contact_info_table_name,
-                    "discord_user",
-                    discord_user,
-                )
-                phone_number = ddb_item["phone_number"]["S"]  # type: ignore
-                raid_alert(pinpoint_app_id, origination_number, phone_number)
-                discord_client.send_message_to_channel(
-                    {
-                        "content": "User has been contacted!",
-                    },
-                    channel_id,
-                )
-
-            except Exception as e:
-                discord_client.send_message_to_channel(
-                    {
-                        "content": str(e),
-                    },
-                    channel_id,
-                )
-
-        elif command == "registered_users2":
-            try:
-                users = get_registered_users(contact_info_table_name)
-                discord_client.send_message_to_channel(
-                    {
-                        "content": "\n".join([user for user in users]),
-                    },
-                    channel_id,
-                )
-
-            except Exception as e:
-                discord_client.send_message_to_channel(
-                    {
-                        "content": str(e),
-                    },
-                    channel_id,
-                )
-
-        sqs_client.delete_sqs_message(sqs_queue_url, message["receiptHandle"])
+    discord_client = client_registry.get_discord_client(
+        os.environ.get("BOT_SECRET_NAME"),
+    )
+    contact_info = _prefetch_contact_info(event["Records"])
+    idempotency_store = client_registry.get_idempotency_store()
+
+    failures = process_records(
+        event["Records"],
+        lambda record: _process_record(
+            record,
+            discord_client,
+            contact_info,
+            idempotency_store,
+        ),
+        ordering_key=_ordering_key,
+    )
+    discord_client.record_metrics()
+
+    return failures
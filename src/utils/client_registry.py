@@ -0,0 +1,253 @@
+"""Per-container registry of clients and bot secrets."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Self
+
+# Clients are imported by their getters, so a Lambda only loads boto3,
+# requests and the rest of the machinery for the clients it uses
+if TYPE_CHECKING:
+    import requests
+
+    from discord.discord_client import DiscordClient
+    from utils.ddb_client import DdbClient
+    from utils.idempotency import IdempotencyStore
+    from utils.pinpoint_client import PinpointClient
+    from utils.secrets_manager_client import SecretsManagerClient
+    from utils.sqs_client import SqsClient
+    from utils.watchdog_2.raid_alert_dedup import RaidAlertDedup
+
+DEFAULT_SECRET_TTL_SECONDS = 300
+
+
+class ClientRegistry:
+    """
+    Per-container registry of clients and bot secrets.
+
+    Lambda keeps module level objects alive between invocations of a warm
+    container, so the clients are built once and the secrets are only
+    fetched again once their TTL expires or Discord rejects the token.
+    """
+
+    def __init__(
+        self: Self,
+        secret_ttl_seconds: int = DEFAULT_SECRET_TTL_SECONDS,
+    ) -> None:
+        """
+        Create the registry.
+
+        :param secret_ttl_seconds: Seconds a secret is reused before fetching it again.
+        """
+        self.secret_ttl_seconds = secret_ttl_seconds
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self: Self) -> None:
+        """Drop every cached client and secret."""
+        with self._lock:
+            self._secrets_manager_client: SecretsManagerClient | None = None
+            self._sqs_client: SqsClient | None = None
+            self._ddb_client: DdbClient | None = None
+            self._pinpoint_client: PinpointClient | None = None
+            self._http_session: requests.Session | None = None
+            self._secrets: dict[str, tuple[dict, float]] = {}
+            self._discord_clients: dict[str, DiscordClient] = {}
+            self._raid_alert_dedup: RaidAlertDedup | None = None
+            self._idempotency_store: IdempotencyStore | None = None
+
+    def get_secrets_manager_client(self: Self) -> SecretsManagerClient:
+        """
+        Get the shared Secrets Manager client.
+
+        :return: A Secrets Manager client.
+        """
+        with self._lock:
+            if self._secrets_manager_client is None:
+                from utils.secrets_manager_client import SecretsManagerClient
+
+                self._secrets_manager_client = SecretsManagerClient()
+
+            return self._secrets_manager_client
+
+    def get_sqs_client(self: Self) -> SqsClient:
+        """
+        Get the shared SQS client.
+
+        :return: An SQS client.
+        """
+        with self._lock:
+            if self._sqs_client is None:
+                from utils.sqs_client import SqsClient
+
+                self._sqs_client = SqsClient()
+
+            return self._sqs_client
+
+    def get_ddb_client(self: Self) -> DdbClient:
+        """
+        Get the shared DDB client.
+
+        :return: A DDB client.
+        """
+        with self._lock:
+            if self._ddb_client is None:
+                from utils.ddb_client import DdbClient
+
+                self._ddb_client = DdbClient()
+
+            return self._ddb_client
+
+    def get_pinpoint_client(self: Self) -> PinpointClient:
+        """
+        Get the shared Pinpoint client.
+
+        :return: A Pinpoint client.
+        """
+        with self._lock:
+            if self._pinpoint_client is None:
+                from utils.pinpoint_client import PinpointClient
+
+                self._pinpoint_client = PinpointClient()
+
+            return self._pinpoint_client
+
+    def get_http_session(self: Self) -> requests.Session:
+        """
+        Get the shared keep-alive HTTP session.
+
+        :return: A requests session.
+        """
+        with self._lock:
+            if self._http_session is None:
+                from utils.http_session import create_http_session
+
+                self._http_session = create_http_session()
+
+            return self._http_session
+
+    def get_raid_alert_dedup(self: Self) -> RaidAlertDedup:
+        """
+        Get the shared raid alert dedup store.
+
+        The window is shared through DDB when RAID_ALERTS_TABLE_NAME is set.
+
+        :return: A raid alert dedup store.
+        """
+        with self._lock:
+            if self._raid_alert_dedup is None:
+                from utils.watchdog_2.raid_alert_dedup import (
+                    RAID_ALERT_WINDOW_SECONDS,
+                    RaidAlertDedup,
+                )
+
+                table_name = os.environ.get("RAID_ALERTS_TABLE_NAME")
+                self._raid_alert_dedup = RaidAlertDedup(
+                    window_seconds=float(
+                        os.environ.get(
+                            "RAID_ALERT_WINDOW_SECONDS",
+                            RAID_ALERT_WINDOW_SECONDS,
+                        ),
+                    ),
+                    ddb_client=self.get_ddb_client() if table_name else None,
+                    table_name=table_name,
+                )
+
+            return self._raid_alert_dedup
+
+    def get_idempotency_store(self: Self) -> IdempotencyStore:
+        """
+        Get the store that makes redelivered interactions only run once.
+
+        The claims are shared through DDB when IDEMPOTENCY_TABLE_NAME is set.
+
+        :return: An idempotency store.
+        """
+        with self._lock:
+            if self._idempotency_store is None:
+                from utils.idempotency import IDEMPOTENCY_TTL_SECONDS, IdempotencyStore
+
+                table_name = os.environ.get("IDEMPOTENCY_TABLE_NAME")
+                self._idempotency_store = IdempotencyStore(
+                    ttl_seconds=float(
+                        os.environ.get(
+                            "IDEMPOTENCY_TTL_SECONDS",
+                            IDEMPOTENCY_TTL_SECONDS,
+                        ),
+                    ),
+                    ddb_client=self.get_ddb_client() if table_name else None,
+                    table_name=table_name,
+                )
+
+            return self._idempotency_store
+
+    def get_secret(self: Self, secret_name: str, force_refresh: bool = False) -> dict:
+        """
+        Get a secret, fetching it from Secrets Manager only when needed.
+
+        :param secret_name: Name of the secret to retrieve.
+        :param force_refresh: If true, ignore the cached value.
+        :return: Dictionary with the contents of the secret.
+        """
+        with self._lock:
+            cached = self._secrets.get(secret_name)
+
+            if (
+                cached is not None
+                and not force_refresh
+                and time.monotonic() - cached[1] < self.secret_ttl_seconds
+            ):
+                return cached[0]
+
+            logging.info(f"Refreshing cached secret {secret_name}...")
+            secret = self.get_secrets_manager_client().get_secret(secret_name)
+            self._secrets[secret_name] = (secret, time.monotonic())
+
+            return secret
+
+    def get_discord_client(self: Self, secret_name: str) -> DiscordClient:
+        """
+        Get the shared Discord client for a bot.
+
+        The client asks the registry for a fresh secret when Discord
+        answers with a 401.
+
+        :param secret_name: Name of the secret with the bot credentials.
+        :return: A Discord client.
+        """
+        with self._lock:
+            secret = self.get_secret(secret_name)
+            discord_client = self._discord_clients.get(secret_name)
+
+            if discord_client is None:
+                from discord.discord_client import DiscordClient
+                from discord.user_cache import UserCache
+
+                user_cache_table_name = os.environ.get("USER_CACHE_TABLE_NAME")
+                discord_client = DiscordClient(
+                    secret_name,
+                    secret=secret,
+                    secret_refresher=lambda: self.get_secret(
+                        secret_name,
+                        force_refresh=True,
+                    ),
+                    session_factory=self.get_http_session,
+                    user_cache=UserCache(
+                        ddb_client=(
+                            self.get_ddb_client() if user_cache_table_name else None
+                        ),
+                        table_name=user_cache_table_name,
+                    ),
+                )
+                self._discord_clients[secret_name] = discord_client
+
+            elif discord_client.secret is not secret:
+                discord_client.set_secret(secret)
+
+            return discord_client
+
+
+client_registry = ClientRegistry()
@@ -1,11 +1,26 @@
 """Client for DDB operations."""
 
 import logging
-from typing import Self
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, Self
 
 import boto3
+from botocore.exceptions import ClientError
 
+from utils.tracing import tracer
 
+BATCH_GET_SIZE = 100
+BATCH_WRITE_SIZE = 25
+BATCH_MAX_RETRIES = 5
+BATCH_BACKOFF_SECONDS = 0.05
+_SEGMENT_DONE = object()
+
+
+@tracer.client()
 class DdbClient:
     """Client for DDB operations."""
 
@@ -55,23 +70,381 @@ class DdbClient:
 
         logging.info("Item upserted...")
 
-    def scan(self: Self, table_name: str, limit: int = 1000) -> list[dict]:
+    def update_item(
+        self: Self,
+        table_name: str,
+        key: dict,
+        update_expression: str,
+        expression_attribute_names: dict | None = None,
+        expression_attribute_values: dict | None = None,
+        condition_expression: str | None = None,
+    ) -> dict | None:
+        """
+        Update an item, optionally only if a condition holds.
+
+        :param table_name: Name of the table to update.
+        :param key: Key of the item.
+        :param update_expression: Update expression.
+        :param expression_attribute_names: Placeholders of the attribute names.
+        :param expression_attribute_values: Placeholders of the attribute values.
+        :param condition_expression: Condition the item must meet.
+        :raises ClientError: If the update fails for any other reason.
+        :return: The item after the update, None if the condition failed.
+        """
+        logging.info(f"Updating item in {table_name}...")
+
+        params: dict[str, Any] = {
+            "TableName": table_name,
+            "Key": key,
+            "UpdateExpression": update_expression,
+            "ReturnValues": "ALL_NEW",
+        }
+
+        if expression_attribute_names:
+            params["ExpressionAttributeNames"] = expression_attribute_names
+
+        if expression_attribute_values:
+            params["ExpressionAttributeValues"] = expression_attribute_values
+
+        if condition_expression:
+            params["ConditionExpression"] = condition_expression
+
+        try:
+            response = self.ddb.update_item(**params)
+
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                logging.info("Condition failed, item not updated...")
+                return None
+
+            raise
+
+        return response.get("Attributes", {})
+
+    def transact_write(
+        self: Self,
+        items: list[dict],
+    ) -> list[dict] | None:
+        """
+        Write several items in a single all or nothing transaction.
+
+        :param items: Operations of the transaction, in the TransactItems format.
+        :raises ClientError: If the transaction fails for any reason but a condition.
+        :return: Cancellation reasons by item if a condition failed, None if
+            the transaction was written.
+        """
+        logging.info(f"Writing a transaction of {len(items)} items...")
+
+        try:
+            self.ddb.transact_write_items(TransactItems=items)
+
+        except ClientError as e:
+            reasons = e.response.get("CancellationReasons", [])
+
+            if e.response["Error"]["Code"] == "TransactionCanceledException" and any(
+                reason.get("Code") == "ConditionalCheckFailed" for reason in reasons
+            ):
+                logging.info("Condition failed, transaction cancelled...")
+                return [dict(reason) for reason in reasons]
+
+            raise
+
+        logging.info("Transaction written...")
+
+        return None
+
+    def batch_get(
+        self: Self,
+        table_name: str,
+        key_name: str,
+        key_values: list[str],
+        key_data_type: str = "S",
+        projection: list[str] | None = None,
+        consistent_read: bool = False,
+    ) -> dict[str, dict]:
+        """
+        Get several items of a table by their PK values.
+
+        :param table_name: Name of the table to read from.
+        :param key_name: Name of the PK column.
+        :param key_values: Values to search for, duplicates are read once.
+        :param key_data_type: Data type of the PK.
+        :param projection: Attributes to read, all of them if None.
+        :param consistent_read: Whether to use strongly consistent reads.
+        :raises RuntimeError: If some keys are still unprocessed after the retries.
+        :return: Items found by PK value, missing values are left out.
+        """
+        unique_values = list(dict.fromkeys(key_values))
+        logging.info(f"Getting {len(unique_values)} items from {table_name}...")
+
+        keys_and_attributes: dict[str, Any] = {"ConsistentRead": consistent_read}
+
+        if projection:
+            names = {f"#p{i}": name for i, name in enumerate([key_name, *projection])}
+            keys_and_attributes["ProjectionExpression"] = ", ".join(names)
+            keys_and_attributes["ExpressionAttributeNames"] = names
+
+        items: dict[str, dict] = {}
+
+        for start in range(0, len(unique_values), BATCH_GET_SIZE):
+            end = start + BATCH_GET_SIZE
+            pending = {
+                table_name: {
+                    **keys_and_attributes,
+                    "Keys": [
+                        {key_name: {key_data_type: value}}
+                        for value in unique_values[start:end]
+                    ],
+                },
+            }
+
+            for attempt in range(BATCH_MAX_RETRIES + 1):
+                if attempt:
+                    _backoff(attempt)
+
+                response = self.ddb.batch_get_item(RequestItems=pending)
+
+                for item in response.get("Responses", {}).get(table_name, []):
+                    items[item[key_name][key_data_type]] = item
+
+                pending = response.get("UnprocessedKeys") or {}
+
+                if not pending:
+                    break
+
+            else:
+                raise RuntimeError(
+                    f"{len(pending[table_name]['Keys'])} keys of {table_name} were not processed",
+                )
+
+        logging.info(f"Found {len(items)} items!")
+
+        return items
+
+    def batch_write(
+        self: Self,
+        table_name: str,
+        items: list[dict] | None = None,
+        delete_keys: list[dict] | None = None,
+    ) -> int:
+        """
+        Upsert and delete several items of a table.
+
+        :param table_name: Name of the table to write to.
+        :param items: Items to upsert.
+        :param delete_keys: Keys of the items to delete.
+        :raises RuntimeError: If some items are still unprocessed after the retries.
+        :return: Number of requests written.
+        """
+        requests = [{"PutRequest": {"Item": item}} for item in items or []] + [
+            {"DeleteRequest": {"Key": key}} for key in delete_keys or []
+        ]
+        logging.info(f"Writing {len(requests)} items to {table_name}...")
+
+        for start in range(0, len(requests), BATCH_WRITE_SIZE):
+            end = start + BATCH_WRITE_SIZE
+            pending = {table_name: requests[start:end]}
+
+            for attempt in range(BATCH_MAX_RETRIES + 1):
+                if attempt:
+                    _backoff(attempt)
+
+                response = self.ddb.batch_write_item(RequestItems=pending)
+                pending = response.get("UnprocessedItems") or {}
+
+                if not pending:
+                    break
+
+            else:
+                raise RuntimeError(
+                    f"{len(pending[table_name])} items of {table_name} were not processed",
+                )
+
+        logging.info("Items written...")
+
+        return len(requests)
+
+    def scan(
+        self: Self,
+        table_name: str,
+        limit: int = 1000,
+        projection: list[str] | None = None,
+        consistent_read: bool = False,
+        total_segments: int = 1,
+    ) -> list[dict]:
         """
         Get all the items of a table.
 
         :param table_name: Name of the table to scan.
-        :param limit: Limit of items to scan.
+        :param limit: Maximum number of items read per page.
+        :param projection: Attributes to read, all of them if None.
+        :param consistent_read: Whether to use strongly consistent reads.
+        :param total_segments: Number of segments scanned in parallel.
         :return: List of items in the table.
         """
         logging.info(f"Scanning {table_name}...")
 
-        response = self.ddb.scan(TableName=table_name, Limit=limit)
-        data = response.get("Items")
-
-        while "LastEvaluatedKey" in response:
-            response = self.ddb.scan(ExclusiveStartKey=response["LastEvaluatedKey"])
-            data.extend(response["Items"])
+        data = list(
+            self.scan_iter(
+                table_name,
+                limit=limit,
+                projection=projection,
+                consistent_read=consistent_read,
+                total_segments=total_segments,
+            ),
+        )
 
         logging.info(f"There are {len(data)} items in the table!")
 
         return data
+
+    def scan_iter(
+        self: Self,
+        table_name: str,
+        limit: int = 1000,
+        projection: list[str] | None = None,
+        consistent_read: bool = False,
+        total_segments: int = 1,
+    ) -> Iterator[dict]:
+        """
+        Yield the items of a table page by page.
+
+        With more than one segment, every segment is scanned in its own thread
+        and the items are yielded as the pages arrive, in no particular order.
+
+        :param table_name: Name of the table to scan.
+        :param limit: Maximum number of items read per page.
+        :param projection: Attributes to read, all of them if None.
+        :param consistent_read: Whether to use strongly consistent reads.
+        :param total_segments: Number of segments scanned in parallel.
+        :yield: Items of the table.
+        """
+        params: dict[str, Any] = {
+            "TableName": table_name,
+            "Limit": limit,
+            "ConsistentRead": consistent_read,
+        }
+
+        if projection:
+            names = {f"#p{i}": name for i, name in enumerate(projection)}
+            params["ProjectionExpression"] = ", ".join(names)
+            params["ExpressionAttributeNames"] = names
+
+        if total_segments <= 1:
+            pages = self._scan_pages(params)
+
+        else:
+            pages = self._parallel_scan(params, total_segments)
+
+        for page in pages:
+            yield from page
+
+    def _scan_pages(
+        self: Self,
+        params: dict,
+        stop: threading.Event | None = None,
+    ) -> Iterator[list[dict]]:
+        """
+        Yield the pages of a scan, following the pagination.
+
+        :param params: Parameters of the scan request.
+        :param stop: Stops the scan before the next page when set.
+        :yield: Items of each page.
+        """
+        response = self.ddb.scan(**params)
+        yield response.get("Items", [])
+
+        while "LastEvaluatedKey" in response:
+            if stop is not None and stop.is_set():
+                return
+
+            response = self.ddb.scan(
+                **params,
+                ExclusiveStartKey=response["LastEvaluatedKey"],
+            )
+            yield response.get("Items", [])
+
+    def _parallel_scan(
+        self: Self,
+        params: dict,
+        total_segments: int,
+    ) -> Iterator[list[dict]]:
+        """
+        Yield the pages of a scan split in segments that run in parallel.
+
+        Pages are handed over through a bounded queue, so a slow consumer
+        doesn't make the segments buffer the whole table.
+
+        :param params: Parameters of the scan request.
+        :param total_segments: Number of segments.
+        :raises RuntimeError: If a segment fails, chained to its error.
+        :yield: Items of each page.
+        """
+        pages: queue.Queue = queue.Queue(maxsize=total_segments * 2)
+        stop = threading.Event()
+
+        def put(page: Any) -> None:
+            """
+            Put a page in the queue, giving up if the scan was stopped.
+
+            :param page: Page, exception or end-of-segment marker.
+            """
+            while not stop.is_set():
+                try:
+                    pages.put(page, timeout=0.1)
+                    return
+
+                except queue.Full:
+                    continue
+
+        def scan_segment(segment: int) -> None:
+            """
+            Scan a segment and put its pages in the queue.
+
+            :param segment: Number of the segment.
+            """
+            try:
+                for page in self._scan_pages(
+                    {**params, "Segment": segment, "TotalSegments": total_segments},
+                    stop,
+                ):
+                    put(page)
+
+            except Exception as e:
+                put(e)
+
+            put(_SEGMENT_DONE)
+
+        with ThreadPoolExecutor(max_workers=total_segments) as pool:
+            for segment in range(total_segments):
+                pool.submit(scan_segment, segment)
+
+            pending = total_segments
+
+            try:
+                while pending:
+                    page = pages.get()
+
+                    if page is _SEGMENT_DONE:
+                        pending -= 1
+
+                    elif isinstance(page, Exception):
+                        raise RuntimeError(f"Scan of segment failed: {page}") from page
+
+                    else:
+                        yield page
+
+            finally:
+                stop.set()
+
+
+def _backoff(attempt: int) -> None:
+    """
+    Sleep before retrying unprocessed batch requests.
+
+    Uses exponential backoff with full jitter, so concurrent lambdas that were
+    throttled together don't retry together.
+
+    :param attempt: Number of the retry, starting at 1.
+    """
+    time.sleep(random.uniform(0, BATCH_BACKOFF_SECONDS * 2**attempt))
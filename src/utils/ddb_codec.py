@@ -0,0 +1,143 @@
+"""Convert between Python values and DDB attribute values."""
+
+import math
+from decimal import Decimal
+from typing import Any, Callable
+
+
+def _serialize_number(value: int | float | Decimal) -> dict:
+    """
+    Serialize a number.
+
+    :param value: Number to serialize.
+    :raises ValueError: If the number is NaN or infinite.
+    :return: The attribute value.
+    """
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValueError(f"DDB does not support the number {value}")
+
+    return {"N": str(value)}
+
+
+def _serialize_set(value: set | frozenset) -> dict:
+    """
+    Serialize a set of strings, numbers or bytes.
+
+    :param value: Set to serialize.
+    :raises ValueError: If the set is empty or its type is not supported.
+    :return: The attribute value.
+    """
+    if not value:
+        raise ValueError("DDB does not support empty sets")
+
+    sample = next(iter(value))
+
+    if isinstance(sample, str):
+        return {"SS": list(value)}
+
+    if isinstance(sample, (bytes, bytearray)):
+        return {"BS": [bytes(element) for element in value]}
+
+    if isinstance(sample, (int, float, Decimal)) and not isinstance(sample, bool):
+        return {"NS": [_serialize_number(element)["N"] for element in value]}
+
+    raise ValueError(f"DDB does not support sets of {type(sample).__name__}")
+
+
+def _deserialize_number(value: str) -> int | Decimal:
+    """
+    Deserialize a number.
+
+    :param value: Number as sent by DDB.
+    :return: An int if the number is integral, a Decimal otherwise.
+    """
+    if "." in value or "e" in value or "E" in value:
+        return Decimal(value)
+
+    return int(value)
+
+
+# Serializers are looked up by exact type first, subclasses are resolved
+# through their MRO once and then cached in the same table.
+_SERIALIZERS: dict[type, Callable[[Any], dict]] = {
+    type(None): lambda _: {"NULL": True},
+    bool: lambda value: {"BOOL": value},
+    str: lambda value: {"S": value},
+    int: _serialize_number,
+    float: _serialize_number,
+    Decimal: _serialize_number,
+    bytes: lambda value: {"B": value},
+    bytearray: lambda value: {"B": bytes(value)},
+    dict: lambda value: {"M": to_item(value)},
+    list: lambda value: {"L": [to_attribute_value(v) for v in value]},
+    tuple: lambda value: {"L": [to_attribute_value(v) for v in value]},
+    set: _serialize_set,
+    frozenset: _serialize_set,
+}
+
+_DESERIALIZERS: dict[str, Callable[[Any], Any]] = {
+    "NULL": lambda _: None,
+    "BOOL": lambda value: value,
+    "S": lambda value: value,
+    "N": _deserialize_number,
+    "B": lambda value: value,
+    "M": lambda value: from_item(value),
+    "L": lambda value: [from_attribute_value(v) for v in value],
+    "SS": set,
+    "NS": lambda value: {_deserialize_number(v) for v in value},
+    "BS": set,
+}
+
+
+def to_attribute_value(value: Any) -> dict:
+    """
+    Serialize a Python value into a DDB attribute value.
+
+    :param value: Value to serialize.
+    :raises ValueError: If the type is not supported.
+    :return: The attribute value.
+    """
+    serializer = _SERIALIZERS.get(type(value))
+
+    if serializer is None:
+        for parent in type(value).__mro__[1:]:
+            if parent in _SERIALIZERS:
+                serializer = _SERIALIZERS[type(value)] = _SERIALIZERS[parent]
+                break
+
+        else:
+            raise ValueError(f"DDB does not support {type(value).__name__}")
+
+    return serializer(value)
+
+
+def from_attribute_value(attribute_value: dict) -> Any:
+    """
+    Deserialize a DDB attribute value into a Python value.
+
+    :param attribute_value: Attribute value as sent by DDB.
+    :return: The Python value.
+    """
+    ((data_type, value),) = attribute_value.items()
+
+    return _DESERIALIZERS[data_type](value)
+
+
+def to_item(data: dict) -> dict:
+    """
+    Serialize a dictionary into a DDB item.
+
+    :param data: Dictionary with Python values.
+    :return: The DDB item.
+    """
+    return {key: to_attribute_value(value) for key, value in data.items()}
+
+
+def from_item(item: dict) -> dict:
+    """
+    Deserialize a DDB item into a dictionary.
+
+    :param item: DDB item.
+    :return: Dictionary with Python values.
+    """
+    return {key: from_attribute_value(value) for key, value in item.items()}
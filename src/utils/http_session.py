@@ -0,0 +1,99 @@
+"""Pooled HTTP session for the Discord REST API."""
+
+from typing import Any, Mapping, Self
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# A call that hangs must fail its record, not the whole invocation, so a
+# call and its retry fit inside the 5s timeout of the processing Lambdas
+CONNECT_TIMEOUT_SECONDS = 1.0
+READ_TIMEOUT_SECONDS = 2.0
+MAX_RETRIES = 1
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 10
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTP adapter that applies a default timeout to every request."""
+
+    def __init__(
+        self: Self,
+        *args: Any,
+        timeout: tuple[float, float] = (CONNECT_TIMEOUT_SECONDS, READ_TIMEOUT_SECONDS),
+        **kwargs: Any,
+    ) -> None:
+        """
+        Create the adapter.
+
+        :param args: Positional arguments for HTTPAdapter.
+        :param timeout: Default connect and read timeouts in seconds.
+        :param kwargs: Keyword arguments for HTTPAdapter.
+        """
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(
+        self: Self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: float | tuple[float, float] | tuple[float, None] | None = None,
+        verify: bool | str = True,
+        cert: bytes | str | tuple[bytes | str, bytes | str] | None = None,
+        proxies: Mapping[str, str] | None = None,
+    ) -> requests.Response:
+        """
+        Send a request, using the default timeout if none was given.
+
+        :param request: Request to send.
+        :param stream: Whether to stream the response content.
+        :param timeout: Timeout for this request, the default one if None.
+        :param verify: Whether or how to verify the TLS certificate.
+        :param cert: Client certificate to use.
+        :param proxies: Proxies to use.
+        :return: Response to the request.
+        """
+        return super().send(
+            request,
+            stream=stream,
+            timeout=self.timeout if timeout is None else timeout,
+            verify=verify,
+            cert=cert,
+            proxies=proxies,
+        )
+
+
+def create_http_session() -> requests.Session:
+    """
+    Create a keep-alive session with a connection pool, timeouts and retries.
+
+    Connection errors are retried once for every method because the request
+    never reached Discord. 5xx answers are only retried for idempotent
+    methods so a POST is never sent twice. Read timeouts are not retried, the
+    request may already be applied and a second wait would not fit in the
+    Lambda timeout.
+
+    :return: A requests session.
+    """
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=0,
+        status=MAX_RETRIES,
+        backoff_factor=0.1,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}),
+        raise_on_status=False,
+    )
+    adapter = TimeoutHTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
@@ -0,0 +1,177 @@
+"""Make sure redelivered Discord interactions only run once."""
+
+import logging
+import threading
+import time
+from typing import Self
+
+from utils.ddb_client import DdbClient
+from utils.ddb_codec import from_item, to_attribute_value
+from utils.ttl_cache import TtlLruCache
+
+# Completed interactions are remembered for a day, far longer than SQS
+# takes to redeliver a record
+IDEMPOTENCY_TTL_SECONDS = 24 * 3600
+
+# Claims of interactions still running expire after the visibility timeout
+# of the queues, so a record whose container died is run again
+IDEMPOTENCY_LEASE_SECONDS = 60
+
+CLAIMED = "CLAIMED"
+IN_PROGRESS = "IN_PROGRESS"
+COMPLETED = "COMPLETED"
+
+
+class IdempotencyStore:
+    """
+    Make sure redelivered Discord interactions only run once.
+
+    An interaction is claimed before its command runs and marked completed,
+    with its reply, as soon as the command returns. Claims expire after a
+    lease, so interactions whose container died are run again, and completed
+    interactions are remembered until the TTL.
+
+    With a DDB table the claims are shared by every container, they are made
+    with a conditional write and expire through the table TTL. Completed
+    interactions are also kept in memory, so redeliveries to the same
+    container don't call DDB. Without a table, or if DDB fails, the claims
+    live in memory.
+    """
+
+    def __init__(
+        self: Self,
+        ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS,
+        lease_seconds: float = IDEMPOTENCY_LEASE_SECONDS,
+        ddb_client: DdbClient | None = None,
+        table_name: str | None = None,
+    ) -> None:
+        """
+        Create the store.
+
+        :param ttl_seconds: Seconds completed interactions are remembered for.
+        :param lease_seconds: Seconds a claim lasts before it can be taken again.
+        :param ddb_client: DDB client for the shared store.
+        :param table_name: DDB table of the shared store, None to disable it.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self._ddb_client = ddb_client
+        self._table_name = table_name
+        self._lock = threading.Lock()
+        self._memory = TtlLruCache(ttl_seconds=ttl_seconds)
+
+    def claim(self: Self, interaction_id: str) -> tuple[str, str | None]:
+        """
+        Claim an interaction before running its command.
+
+        :param interaction_id: ID of the Discord interaction.
+        :return: CLAIMED if the command should run, COMPLETED if it already
+            ran or IN_PROGRESS if another claim on it is still running, and
+            the reply of the command if it already ran.
+        """
+        entry = self._memory.get(interaction_id)
+
+        if entry is not None and entry[0] == COMPLETED:
+            return entry
+
+        if self._ddb_client is not None and self._table_name:
+            try:
+                return self._claim_shared(
+                    self._ddb_client,
+                    self._table_name,
+                    interaction_id,
+                )
+
+            except Exception as e:
+                logging.info(f"Shared idempotency store unavailable: {e}")
+
+        with self._lock:
+            entry = self._memory.get(interaction_id)
+
+            if entry is not None:
+                return entry
+
+            self._memory.set(interaction_id, (IN_PROGRESS, None), self.lease_seconds)
+
+            return CLAIMED, None
+
+    def complete(self: Self, interaction_id: str, reply: str | None) -> None:
+        """
+        Mark a claimed interaction as completed, so it is not run again.
+
+        :param interaction_id: ID of the Discord interaction.
+        :param reply: Reply of the command, sent again on redeliveries.
+        """
+        self._memory.set(interaction_id, (COMPLETED, reply))
+
+        if self._ddb_client is None or not self._table_name:
+            return
+
+        values = {
+            ":status": to_attribute_value(COMPLETED),
+            ":expires_at": to_attribute_value(
+                int(time.time()) + int(self.ttl_seconds),
+            ),
+        }
+        names = {"#status": "status"}
+        update_expression = "SET #status = :status, expires_at = :expires_at"
+
+        if reply is not None:
+            names["#reply"] = "reply"
+            values[":reply"] = to_attribute_value(reply)
+            update_expression += ", #reply = :reply"
+
+        try:
+            self._ddb_client.update_item(
+                self._table_name,
+                {"interaction_id": to_attribute_value(interaction_id)},
+                update_expression,
+                expression_attribute_names=names,
+                expression_attribute_values=values,
+            )
+
+        except Exception as e:
+            logging.info(f"Shared idempotency store unavailable: {e}")
+
+    def _claim_shared(
+        self: Self,
+        ddb_client: DdbClient,
+        table_name: str,
+        interaction_id: str,
+    ) -> tuple[str, str | None]:
+        """
+        Claim an interaction in the shared store.
+
+        :param ddb_client: DDB client for the shared store.
+        :param table_name: DDB table of the shared store.
+        :param interaction_id: ID of the Discord interaction.
+        :return: Status of the claim and reply of the command, same as claim.
+        """
+        now = int(time.time())
+
+        # TTL deletes are lazy, so expired claims are checked explicitly
+        claimed = ddb_client.update_item(
+            table_name,
+            {"interaction_id": to_attribute_value(interaction_id)},
+            "SET #status = :status, expires_at = :expires_at",
+            expression_attribute_names={"#status": "status"},
+            expression_attribute_values={
+                ":status": to_attribute_value(IN_PROGRESS),
+                ":expires_at": to_attribute_value(now + int(self.lease_seconds)),
+                ":now": to_attribute_value(now),
+            },
+            condition_expression="attribute_not_exists(interaction_id) OR expires_at <= :now",
+        )
+
+        if claimed is not None:
+            return CLAIMED, None
+
+        item = from_item(
+            ddb_client.get_item(table_name, "interaction_id", interaction_id) or {},
+        )
+        entry = (item.get("status", IN_PROGRESS), item.get("reply"))
+
+        if entry[0] == COMPLETED:
+            self._memory.set(interaction_id, entry)
+
+        return entry
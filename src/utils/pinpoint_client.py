@@ -1,11 +1,18 @@
 """Client for Pinpoint operations."""
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Self
 
 import boto3
 
+from utils.tracing import tracer
 
+SMS_ADDRESSES_PER_REQUEST = 100
+VOICE_MAX_WORKERS = 10
+
+
+@tracer.client()
 class PinpointClient:
     """Client for Pinpoint operations."""
 
@@ -31,30 +38,72 @@ class PinpointClient:
         :param message: Message to send.
         :return: True.
         """
-        logging.info(f"Sending SMS message to {destination_number}...")
-
-        r = self.pinpoint.send_messages(
-            ApplicationId=pinpoint_app_id,
-            MessageRequest={
-                "Addresses": {
-                    destination_number: {
-                        "ChannelType": "SMS",
+        self.send_sms_messages(
+            pinpoint_app_id,
+            origination_number,
+            [destination_number],
+            message,
+        )
+
+        return True
+
+    def send_sms_messages(
+        self: Self,
+        pinpoint_app_id: str,
+        origination_number: str,
+        destination_numbers: list[str],
+        message: str,
+    ) -> dict[str, dict]:
+        """
+        Send the same SMS message to several numbers with Pinpoint.
+
+        The numbers are sent as the addresses of a single request, in chunks of
+        the Pinpoint limit.
+
+        :param pinpoint_app_id: Pinpoint application ID.
+        :param origination_number: Number where the message will be sent from.
+        :param destination_numbers: Numbers to send the message to.
+        :param message: Message to send.
+        :return: Delivery status, status code and status message by number.
+        """
+        destination_numbers = list(dict.fromkeys(destination_numbers))
+        logging.info(f"Sending SMS message to {len(destination_numbers)} numbers...")
+        results = {}
+
+        for start in range(0, len(destination_numbers), SMS_ADDRESSES_PER_REQUEST):
+            end = start + SMS_ADDRESSES_PER_REQUEST
+            r = self.pinpoint.send_messages(
+                ApplicationId=pinpoint_app_id,
+                MessageRequest={
+                    "Addresses": {
+                        destination_number: {
+                            "ChannelType": "SMS",
+                        }
+                        for destination_number in destination_numbers[start:end]
                     },
-                },
-                "MessageConfiguration": {
-                    "SMSMessage": {
-                        "Body": message,
-                        "MessageType": "TRANSACTIONAL",
-                        "OriginationNumber": origination_number,
+                    "MessageConfiguration": {
+                        "SMSMessage": {
+                            "Body": message,
+                            "MessageType": "TRANSACTIONAL",
+                            "OriginationNumber": origination_number,
+                        },
                     },
                 },
-            },
-        )
-        print(r)
+            )
+            result = r.get("MessageResponse", {}).get("Result", {})
 
-        logging.info("Message sent!")
+            for destination_number in destination_numbers[start:end]:
+                status = result.get(destination_number, {})
+                results[destination_number] = {
+                    "delivery_status": status.get("DeliveryStatus", "UNKNOWN"),
+                    "status_code": status.get("StatusCode"),
+                    "status_message": status.get("StatusMessage"),
+                }
+                logging.info(
+                    f"SMS to {destination_number}: {results[destination_number]['delivery_status']}",
+                )
 
-        return True
+        return results
 
     def send_voice_message(
         self: Self,
@@ -87,3 +136,54 @@ class PinpointClient:
         logging.info("Message sent!")
 
         return True
+
+    def send_voice_messages(
+        self: Self,
+        origination_number: str,
+        destination_numbers: list[str],
+        ssml_message: str,
+        max_workers: int = VOICE_MAX_WORKERS,
+    ) -> dict[str, dict]:
+        """
+        Send the same voice message to several numbers concurrently.
+
+        Pinpoint only takes one number per voice call, so the calls are made
+        from a bounded thread pool. A failed call doesn't stop the others.
+
+        :param origination_number: Number where the message will be sent from.
+        :param destination_numbers: Numbers to send the message to.
+        :param ssml_message: Message to send.
+        :param max_workers: Maximum number of calls made at the same time.
+        :return: Delivery status and status message by number.
+        """
+        destination_numbers = list(dict.fromkeys(destination_numbers))
+
+        def send(destination_number: str) -> dict:
+            """
+            Send the voice message to a number.
+
+            :param destination_number: Number to send the message to.
+            :return: Delivery status and status message.
+            """
+            try:
+                self.send_voice_message(
+                    origination_number,
+                    destination_number,
+                    ssml_message,
+                )
+
+            except Exception as e:
+                logging.info(f"Voice message to {destination_number} failed: {e}")
+                return {"delivery_status": "FAILED", "status_message": str(e)}
+
+            return {"delivery_status": "SUCCESSFUL", "status_message": None}
+
+        if len(destination_numbers) <= 1:
+            return {number: send(number) for number in destination_numbers}
+
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(destination_numbers)),
+        ) as pool:
+            return dict(
+                zip(destination_numbers, pool.map(send, destination_numbers)),
+            )
@@ -0,0 +1,99 @@
+"""Process the records of an SQS batch concurrently."""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+MAX_WORKERS = 10
+
+
+def _record_key(record: dict, ordering_key: Callable[[dict], str]) -> str:
+    """
+    Get the ordering key of a record.
+
+    :param record: SQS record.
+    :param ordering_key: Returns the key records must be ordered by.
+    :return: The ordering key, the message ID if it can't be computed.
+    """
+    try:
+        return ordering_key(record)
+
+    except Exception:
+        return record["messageId"]
+
+
+def _process_group(records: list[dict], process: Callable[[dict], None]) -> list[str]:
+    """
+    Process records that must keep their order, one after the other.
+
+    Once a record fails, the ones after it are not processed and are
+    reported as failed too, so a retry can't apply them out of order.
+
+    :param records: SQS records sharing an ordering key, in order.
+    :param process: Processes a single record.
+    :return: Message IDs of the records that failed.
+    """
+    failed: list[str] = []
+
+    for record in records:
+        if failed:
+            failed.append(record["messageId"])
+            continue
+
+        start = time.perf_counter()
+
+        try:
+            process(record)
+            logging.info(
+                f"Processed message {record['messageId']} in {time.perf_counter() - start:.3f}s",
+            )
+
+        except Exception as e:
+            logging.info(f"Failed to process message {record['messageId']}: {e}")
+            failed.append(record["messageId"])
+
+    return failed
+
+
+def process_records(
+    records: list[dict],
+    process: Callable[[dict], None],
+    ordering_key: Callable[[dict], str] = lambda record: record["messageId"],
+    max_workers: int = MAX_WORKERS,
+) -> dict:
+    """
+    Process the records of an SQS batch concurrently.
+
+    Records with the same ordering key run in order in the same worker,
+    records with different keys run in parallel in a bounded thread pool.
+
+    :param records: SQS records of the batch.
+    :param process: Processes a single record, raising if it failed.
+    :param ordering_key: Returns the key records must be ordered by.
+    :param max_workers: Maximum number of records processed at the same time.
+    :return: The records that failed, in the SQS partial batch response format.
+    """
+    groups: dict[str, list[dict]] = {}
+
+    for record in records:
+        groups.setdefault(_record_key(record, ordering_key), []).append(record)
+
+    if len(groups) <= 1 or max_workers <= 1:
+        failed = [
+            message_id
+            for group in groups.values()
+            for message_id in _process_group(group, process)
+        ]
+
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as pool:
+            results = pool.map(
+                lambda group: _process_group(group, process),
+                groups.values(),
+            )
+            failed = [message_id for result in results for message_id in result]
+
+    return {
+        "batchItemFailures": [{"itemIdentifier": message_id} for message_id in failed],
+    }
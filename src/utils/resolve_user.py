@@ -0,0 +1,25 @@
+"""Resolve the name of a Discord user."""
+
+from discord.discord_client import DiscordClient
+
+
+def resolve_user(
+    discord_client: DiscordClient,
+    user_id: str,
+    resolved_users: dict | None,
+) -> str:
+    """
+    Resolve the name of a Discord user.
+
+    USER options come with the user already resolved in the interaction, so
+    the Discord API is only called when that data is missing.
+
+    :param discord_client: Discord client used as a fallback.
+    :param user_id: ID of the user.
+    :param resolved_users: Names of the users resolved in the interaction.
+    :return: Username and discriminator of the user.
+    """
+    if resolved_users and user_id in resolved_users:
+        return resolved_users[user_id]
+
+    return discord_client.get_user(user_id)
@@ -2,9 +2,7 @@
 
 import os
 
-import requests
-
-from utils.secrets_manager_client import SecretsManagerClient
+from utils.client_registry import client_registry
 
 
 def run_command_updates(commands: list[dict]) -> None:
@@ -14,11 +12,11 @@ def run_command_updates(commands: list[dict]) -> None:
     :param commands: List of commands to update and their definition.
     """
     bot_secret_name = os.environ.get("BOT_SECRET_NAME")
-    sm_client = SecretsManagerClient()
-    secret = sm_client.get_secret(bot_secret_name)
+    secret = client_registry.get_secret(bot_secret_name)
     url = f"https://discord.com/api/v10/applications/{secret['ApplicationId']}/commands"
     headers = {"Authorization": f"Bot {secret['Token']}"}
+    session = client_registry.get_http_session()
 
     for command in commands:
-        r = requests.post(url, headers=headers, json=command)
+        r = session.post(url, headers=headers, json=command)
         r.raise_for_status()
@@ -6,7 +6,10 @@ from typing import Self
 
 import boto3
 
+from utils.tracing import tracer
 
+
+@tracer.client()
 class SecretsManagerClient:
     """Client for Secrets Manager operations."""
 
@@ -1,31 +1,117 @@
 """Add points to a user in DDB."""
 
+import logging
+import time
 from datetime import datetime
 from uuid import uuid4
 
-from utils.ddb_client import DdbClient
+from utils.client_registry import client_registry
+from utils.ddb_codec import from_item, to_attribute_value, to_item
 
+POINTS_TABLE_NAME = "points"
+POINT_BALANCES_TABLE_NAME = "point_balances"
 
-def add_points(discord_user: str, points: int, issuer: str) -> None:
+
+def add_points(
+    discord_user: str,
+    points: int,
+    issuer: str,
+    transaction_id: str | None = None,
+    non_negative: bool = False,
+    min_interval_seconds: float = 0,
+) -> None:
     """
     Add points to a user in DDB.
 
+    The transaction is appended to the ledger and the balance of the user is
+    updated in place, so reading the balances doesn't need the whole ledger.
+    Both writes are a single DDB transaction, the balance is never read
+    first, so concurrent commands can't race each other. A transaction ID
+    that is already in the ledger is not applied again.
+
     :param discord_user: Discord user to add points to.
     :param points: Number of points to add.
     :param issuer: Issuer of the user.
-    :raises ValueError: If the issuer is the same as the user.
+    :param transaction_id: ID of the transaction in the ledger, a random one if None.
+    :param non_negative: Whether to refuse transactions that leave the balance
+        below zero.
+    :param min_interval_seconds: Seconds that must pass between two transactions
+        of the same user, 0 to disable the limit.
+    :raises ValueError: If the issuer is the same as the user, or a condition
+        refused the transaction.
     """
     if discord_user == issuer:
         raise ValueError("You can't do transactions for yourself. Don't be a dick.")
 
-    ddb_client = DdbClient()
+    now = int(time.time())
+    cutoff = now - int(min_interval_seconds)
+    transaction_id = transaction_id or str(uuid4())
+    ledger_item = to_item(
+        {
+            "transaction_id": transaction_id,
+            "discord_user": discord_user,
+            "points": points,
+            "created_datetime": datetime.utcnow().isoformat(),
+            "issuer": issuer,
+        },
+    )
+    conditions = []
+    values = {
+        ":points": to_attribute_value(points),
+        ":now": to_attribute_value(now),
+    }
+
+    if non_negative and points < 0:
+        conditions.append("total_points >= :required")
+        values[":required"] = to_attribute_value(-points)
+
+    if min_interval_seconds > 0:
+        conditions.append(
+            "(attribute_not_exists(last_transaction_at) OR last_transaction_at <= :cutoff)",
+        )
+        values[":cutoff"] = to_attribute_value(cutoff)
 
-    data = {
-        "transaction_id": {"S": str(uuid4())},
-        "discord_user": {"S": discord_user},
-        "points": {"N": str(points)},
-        "created_datetime": {"S": datetime.utcnow().isoformat()},
-        "issuer": {"S": issuer},
+    balance_update = {
+        "TableName": POINT_BALANCES_TABLE_NAME,
+        "Key": {"discord_user": to_attribute_value(discord_user)},
+        "UpdateExpression": "ADD total_points :points SET last_transaction_at = :now",
+        "ExpressionAttributeValues": values,
+        "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
     }
 
-    ddb_client.put_item("points", data)
+    if conditions:
+        balance_update["ConditionExpression"] = " AND ".join(conditions)
+
+    reasons = client_registry.get_ddb_client().transact_write(
+        [
+            {
+                "Put": {
+                    "TableName": POINTS_TABLE_NAME,
+                    "Item": ledger_item,
+                    "ConditionExpression": "attribute_not_exists(transaction_id)",
+                },
+            },
+            {"Update": balance_update},
+        ],
+    )
+
+    if reasons is None:
+        return
+
+    ledger_reason, balance_reason = reasons
+
+    if ledger_reason.get("Code") == "ConditionalCheckFailed":
+        logging.info(f"Transaction {transaction_id} was already applied...")
+        return
+
+    balance = from_item(balance_reason.get("Item", {}))
+
+    if min_interval_seconds > 0 and balance.get("last_transaction_at", 0) > cutoff:
+        raise ValueError(
+            f"Slow down, {discord_user} had a transaction less than "
+            f"{int(min_interval_seconds)} seconds ago.",
+        )
+
+    raise ValueError(
+        f"{discord_user} only has {balance.get('total_points', 0)} points.",
+    )
@@ -1,8 +1,8 @@
 """Get the point balance of all users."""
 
-from collections import defaultdict
-
-from utils.ddb_client import DdbClient
+from utils.client_registry import client_registry
+from utils.ddb_codec import from_item
+from utils.simp_bot.add_points import POINT_BALANCES_TABLE_NAME
 
 
 def get_point_balance() -> list[dict]:
@@ -11,16 +11,10 @@ def get_point_balance() -> list[dict]:
 
     :return: A list with the balance for each user.
     """
-    ddb_client = DdbClient()
-    data = ddb_client.scan("points")
-    points_aggregation = defaultdict(int)
-
-    for transaction in data:
-        discord_user = transaction["discord_user"]["S"]
-        points = int(transaction["points"]["N"])
-        points_aggregation[discord_user] += points
+    ddb_client = client_registry.get_ddb_client()
+    data = ddb_client.scan_iter(
+        POINT_BALANCES_TABLE_NAME,
+        projection=["discord_user", "total_points"],
+    )
 
-    return [
-        {"discord_user": user, "total_points": points}
-        for user, points in points_aggregation.items()
-    ]
+    return [from_item(balance) for balance in data]
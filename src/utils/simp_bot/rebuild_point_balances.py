@@ -0,0 +1,93 @@
+"""Rebuild the point balances of SimpBot from the transaction ledger."""
+
+import logging
+from collections import defaultdict
+from typing import Iterable
+
+from utils.client_registry import client_registry
+from utils.ddb_codec import from_item, to_attribute_value
+from utils.simp_bot.add_points import POINT_BALANCES_TABLE_NAME, POINTS_TABLE_NAME
+
+LEDGER_SCAN_SEGMENTS = 4
+
+
+def aggregate_points(transactions: Iterable[dict]) -> dict[str, int]:
+    """
+    Add up the points of each user in a list of ledger transactions.
+
+    :param transactions: Items of the points table.
+    :return: Total points by user.
+    """
+    points_aggregation: dict[str, int] = defaultdict(int)
+
+    for transaction in map(from_item, transactions):
+        points_aggregation[transaction["discord_user"]] += transaction["points"]
+
+    return dict(points_aggregation)
+
+
+def rebuild_point_balances() -> list[dict]:
+    """
+    Recompute the balance of every user from the ledger and fix the ones that drifted.
+
+    The balances are read before the ledger and only rewritten if they still
+    hold the value that was read, so it is safe to run while the bot is in
+    use. Balances that changed during the run are skipped, running it again
+    fixes them.
+
+    :return: The balances that were corrected.
+    """
+    ddb_client = client_registry.get_ddb_client()
+    current = {
+        balance["discord_user"]: balance["total_points"]
+        for balance in map(
+            from_item,
+            ddb_client.scan_iter(POINT_BALANCES_TABLE_NAME, consistent_read=True),
+        )
+    }
+    expected = aggregate_points(
+        ddb_client.scan_iter(
+            POINTS_TABLE_NAME,
+            projection=["discord_user", "points"],
+            consistent_read=True,
+            total_segments=LEDGER_SCAN_SEGMENTS,
+        ),
+    )
+    corrected = []
+
+    for discord_user in sorted(expected.keys() | current.keys()):
+        total_points = expected.get(discord_user, 0)
+
+        if current.get(discord_user) == total_points:
+            continue
+
+        logging.info(
+            f"Balance of {discord_user} drifted: {current.get(discord_user)} -> {total_points}...",
+        )
+        values = {":total_points": to_attribute_value(total_points)}
+
+        if discord_user in current:
+            condition = "total_points = :current"
+            values[":current"] = to_attribute_value(current[discord_user])
+
+        else:
+            condition = "attribute_not_exists(total_points)"
+
+        # Only the total is replaced, last_transaction_at keeps the rate limit
+        updated = ddb_client.update_item(
+            POINT_BALANCES_TABLE_NAME,
+            {"discord_user": to_attribute_value(discord_user)},
+            "SET total_points = :total_points",
+            expression_attribute_values=values,
+            condition_expression=condition,
+        )
+
+        if updated is None:
+            logging.info(
+                f"Balance of {discord_user} changed during the rebuild, skipping...",
+            )
+            continue
+
+        corrected.append({"discord_user": discord_user, "total_points": total_points})
+
+    return corrected
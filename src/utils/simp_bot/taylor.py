@@ -0,0 +1,38 @@
+"""Pick a random Taylor Swift song."""
+
+import random
+
+# Song and album of every pick, kept in memory so the command never does I/O
+SONGS = (
+    ("Love Story", "Fearless"),
+    ("You Belong With Me", "Fearless"),
+    ("Mine", "Speak Now"),
+    ("Enchanted", "Speak Now"),
+    ("All Too Well", "Red"),
+    ("I Knew You Were Trouble", "Red"),
+    ("Shake It Off", "1989"),
+    ("Blank Space", "1989"),
+    ("Style", "1989"),
+    ("Delicate", "reputation"),
+    ("Lover", "Lover"),
+    ("Cruel Summer", "Lover"),
+    ("cardigan", "folklore"),
+    ("august", "folklore"),
+    ("willow", "evermore"),
+    ("Anti-Hero", "Midnights"),
+    ("Fortnight", "The Tortured Poets Department"),
+)
+
+_rng = random.Random()
+
+
+def random_song(rng: random.Random | None = None) -> str:
+    """
+    Pick a random Taylor Swift song.
+
+    :param rng: Random number generator, a shared one if None.
+    :return: Reply with the song and its album.
+    """
+    song, album = (rng or _rng).choice(SONGS)
+
+    return f":notes: {song}, from {album}"
@@ -5,7 +5,12 @@ from typing import Self
 
 import boto3
 
+from utils.tracing import tracer
 
+SQS_BATCH_SIZE = 10
+
+
+@tracer.client()
 class SqsClient:
     """Client for SQS operations."""
 
@@ -30,6 +35,44 @@ class SqsClient:
 
         return True
 
+    def delete_message_batch(
+        self: Self,
+        queue_url: str,
+        receipt_handles: list[str],
+    ) -> list[str]:
+        """
+        Delete several SQS messages from a queue, 10 per request.
+
+        :param queue_url: URL of the queue to remove the messages from.
+        :param receipt_handles: Receipt handles of the messages to delete.
+        :return: Receipt handles of the messages that could not be deleted.
+        """
+        logging.info(f"Deleting {len(receipt_handles)} messages from {queue_url}...")
+
+        failed = []
+
+        for start in range(0, len(receipt_handles), SQS_BATCH_SIZE):
+            end = start + SQS_BATCH_SIZE
+            chunk = receipt_handles[start:end]
+
+            response = self.sqs.delete_message_batch(
+                QueueUrl=queue_url,
+                Entries=[
+                    {"Id": str(index), "ReceiptHandle": receipt_handle}
+                    for index, receipt_handle in enumerate(chunk)
+                ],
+            )
+
+            for failure in response.get("Failed", []):
+                logging.info(
+                    f"Failed to delete message: {failure.get('Code')} {failure.get('Message')}",
+                )
+                failed.append(chunk[int(failure["Id"])])
+
+        logging.info(f"{len(receipt_handles) - len(failed)} messages deleted!")
+
+        return failed
+
     def send_sqs_message(self: Self, queue_url: str, message: str) -> dict:
         """
         Send a message to an SQS queue.
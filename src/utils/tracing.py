@@ -0,0 +1,389 @@
+"""Time the handlers, commands and client calls, as CloudWatch EMF metrics."""
+
+import functools
+import json
+import os
+import random
+import threading
+import time
+import types
+from contextlib import contextmanager
+from typing import Any, Callable, Generator, Iterator, Self, TypeVar
+
+DEFAULT_SAMPLE_RATE = 0.1
+DEFAULT_NAMESPACE = "BotFactory"
+
+# inspect.CO_GENERATOR, inspect itself is slow to import on a cold start
+_CO_GENERATOR = 0x20
+
+T = TypeVar("T")
+
+
+class _Invocation:
+    """Timings of a single sampled invocation."""
+
+    def __init__(self: Self, handler: str, cold_start: bool) -> None:
+        """
+        Start the invocation.
+
+        :param handler: Name of the Lambda handler.
+        :param cold_start: Whether this is the first invocation of the container.
+        """
+        self.handler = handler
+        self.cold_start = cold_start
+        self.start = time.perf_counter()
+        self.lock = threading.Lock()
+        # Durations in milliseconds and errors, by kind (ie, Span) and name
+        self.timings: dict[tuple[str, str], tuple[list[float], list[int]]] = {}
+        # Counters and gauges, by component (ie, DiscordRateLimiter)
+        self.counters: dict[str, dict[str, float]] = {}
+
+    def record(self: Self, kind: str, name: str, seconds: float, failed: bool) -> None:
+        """
+        Record a timing.
+
+        :param kind: Kind of timing, the dimension it is reported under.
+        :param name: Name of what was timed.
+        :param seconds: Seconds it took.
+        :param failed: Whether it raised.
+        """
+        with self.lock:
+            durations, errors = self.timings.setdefault((kind, name), ([], [0]))
+            durations.append(round(seconds * 1000, 3))
+            errors[0] += int(failed)
+
+
+class Tracer:
+    """
+    Time the handlers, commands and client calls of a container.
+
+    Only a sample of the invocations is timed, the first one of a container
+    always is so cold starts are never missed. Each sampled invocation is
+    written to stdout as CloudWatch Embedded Metric Format lines, one for the
+    invocation, one per command and span and one per component whose counters
+    were recorded. Calls made outside a sampled invocation only pay for a
+    single attribute check.
+    """
+
+    def __init__(
+        self: Self,
+        sample_rate: float | None = None,
+        namespace: str | None = None,
+        emit: Callable[[str], None] = print,
+    ) -> None:
+        """
+        Create the tracer.
+
+        :param sample_rate: Fraction of the invocations timed, TRACE_SAMPLE_RATE
+            or DEFAULT_SAMPLE_RATE if None.
+        :param namespace: CloudWatch namespace of the metrics, METRICS_NAMESPACE
+            or DEFAULT_NAMESPACE if None.
+        :param emit: Writes an EMF line.
+        """
+        self.sample_rate = (
+            sample_rate
+            if sample_rate is not None
+            else float(os.environ.get("TRACE_SAMPLE_RATE", DEFAULT_SAMPLE_RATE))
+        )
+        self.namespace = namespace or os.environ.get(
+            "METRICS_NAMESPACE",
+            DEFAULT_NAMESPACE,
+        )
+        self.emit = emit
+        self._cold_start = True
+        # Counters of each component when they were last emitted
+        self._emitted_counters: dict[str, dict[str, float]] = {}
+        # Lambda runs one invocation at a time per container, the worker
+        # threads of the invocation all record into it
+        self._active: _Invocation | None = None
+
+    def handler(
+        self: Self,
+        name: str,
+    ) -> Callable[[Callable[..., T]], Callable[..., T]]:
+        """
+        Time every sampled invocation of a Lambda handler.
+
+        :param name: Name of the handler in the metrics.
+        :return: Decorator for the handler.
+        """
+
+        def decorate(handler: Callable[..., T]) -> Callable[..., T]:
+            """
+            Wrap the handler.
+
+            :param handler: The Lambda handler.
+            :return: The wrapped handler.
+            """
+
+            @functools.wraps(handler)
+            def wrapper(*args: Any, **kwargs: Any) -> T:
+                """
+                Run the handler inside an invocation.
+
+                :param args: Positional arguments of the handler.
+                :param kwargs: Keyword arguments of the handler.
+                :return: What the handler returns.
+                """
+                with self.invocation(name):
+                    return handler(*args, **kwargs)
+
+            return wrapper
+
+        return decorate
+
+    @contextmanager
+    def invocation(self: Self, handler: str) -> Generator[None, None, None]:
+        """
+        Time an invocation if it is sampled, and emit its metrics.
+
+        :param handler: Name of the Lambda handler.
+        :yield: Nothing, the invocation runs inside the block.
+        """
+        cold_start = self._cold_start
+        self._cold_start = False
+
+        if not cold_start and random.random() >= self.sample_rate:
+            yield
+            return
+
+        invocation = _Invocation(handler, cold_start)
+        self._active = invocation
+        failed = True
+
+        try:
+            yield
+            failed = False
+
+        finally:
+            self._active = None
+            invocation.record(
+                "Handler",
+                handler,
+                time.perf_counter() - invocation.start,
+                failed,
+            )
+            self._flush(invocation)
+
+    @contextmanager
+    def span(self: Self, name: str, kind: str = "Span") -> Generator[None, None, None]:
+        """
+        Time a block of code if the current invocation is sampled.
+
+        :param name: Name of the span.
+        :param kind: Kind of span, ie: Command.
+        :yield: Nothing, the timed code runs inside the block.
+        """
+        invocation = self._active
+
+        if invocation is None:
+            yield
+            return
+
+        start = time.perf_counter()
+        failed = True
+
+        try:
+            yield
+            failed = False
+
+        finally:
+            invocation.record(kind, name, time.perf_counter() - start, failed)
+
+    def record(
+        self: Self,
+        name: str,
+        seconds: float,
+        failed: bool = False,
+        kind: str = "Span",
+    ) -> None:
+        """
+        Record a timing measured elsewhere, if the current invocation is sampled.
+
+        :param name: Name of what was timed.
+        :param seconds: Seconds it took.
+        :param failed: Whether it raised.
+        :param kind: Kind of timing, ie: Command.
+        """
+        invocation = self._active
+
+        if invocation is not None:
+            invocation.record(kind, name, seconds, failed)
+
+    def counters(
+        self: Self,
+        component: str,
+        values: dict[str, float],
+        gauges: tuple[str, ...] = (),
+    ) -> None:
+        """
+        Record the counters of a component, if the current invocation is sampled.
+
+        The counters only grow for the lifetime of the container, so what they
+        grew since they were last emitted is what gets emitted. That way the
+        unsampled invocations are counted too, and only once.
+
+        :param component: Name of the component, ie: DiscordRateLimiter.
+        :param values: Current value of the counters and gauges, by name.
+        :param gauges: Names of the values emitted as they are, ie: sizes.
+        """
+        invocation = self._active
+
+        if invocation is None:
+            return
+
+        emitted = self._emitted_counters.get(component, {})
+        self._emitted_counters[component] = dict(values)
+
+        with invocation.lock:
+            invocation.counters[component] = {
+                name: value if name in gauges else value - emitted.get(name, 0)
+                for name, value in values.items()
+            }
+
+    def traced(self: Self, name: str, function: Callable[..., T]) -> Callable[..., T]:
+        """
+        Wrap a function so every call is a span.
+
+        Generators are timed until they are exhausted.
+
+        :param name: Name of the span.
+        :param function: Function to wrap.
+        :return: The wrapped function.
+        """
+        if (
+            isinstance(function, types.FunctionType)
+            and function.__code__.co_flags & _CO_GENERATOR
+        ):
+
+            @functools.wraps(function)
+            def generator_wrapper(*args: Any, **kwargs: Any) -> Iterator:
+                """
+                Run the generator inside a span.
+
+                :param args: Positional arguments of the generator.
+                :param kwargs: Keyword arguments of the generator.
+                :yield: What the generator yields.
+                """
+                with self.span(name):
+                    yield from function(*args, **kwargs)
+
+            return generator_wrapper  # type: ignore
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            """
+            Run the function inside a span.
+
+            :param args: Positional arguments of the function.
+            :param kwargs: Keyword arguments of the function.
+            :return: What the function returns.
+            """
+            with self.span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    def client(self: Self, *methods: str) -> Callable[[type[T]], type[T]]:
+        """
+        Make every call to the public methods of a client a span.
+
+        :param methods: Methods to time, every public method if none.
+        :return: Decorator for the client class.
+        """
+
+        def decorate(cls: type[T]) -> type[T]:
+            """
+            Wrap the methods of the class.
+
+            :param cls: The client class.
+            :return: The same class.
+            """
+            for attribute, value in list(vars(cls).items()):
+                selected = (
+                    attribute in methods if methods else not attribute.startswith("_")
+                )
+
+                if selected and isinstance(value, types.FunctionType):
+                    setattr(
+                        cls,
+                        attribute,
+                        self.traced(f"{cls.__name__}.{attribute}", value),
+                    )
+
+            return cls
+
+        return decorate
+
+    def _flush(self: Self, invocation: _Invocation) -> None:
+        """
+        Emit the metrics of an invocation as EMF lines.
+
+        :param invocation: The finished invocation.
+        """
+        timestamp = int(time.time() * 1000)
+
+        for (kind, name), (durations, errors) in invocation.timings.items():
+            metrics = [
+                {"Name": f"{kind}Duration", "Unit": "Milliseconds"},
+                {"Name": f"{kind}Calls", "Unit": "Count"},
+                {"Name": f"{kind}Errors", "Unit": "Count"},
+            ]
+            line = {
+                "Handler": invocation.handler,
+                kind: name,
+                f"{kind}Duration": durations,
+                f"{kind}Calls": len(durations),
+                f"{kind}Errors": errors[0],
+                "ColdStart": invocation.cold_start,
+                "SampleRate": self.sample_rate,
+            }
+
+            if kind == "Handler":
+                metrics.append({"Name": "ColdStarts", "Unit": "Count"})
+                line["ColdStarts"] = int(invocation.cold_start)
+
+            line["_aws"] = {
+                "Timestamp": timestamp,
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": self.namespace,
+                        "Dimensions": [
+                            ["Handler"] if kind == "Handler" else ["Handler", kind],
+                        ],
+                        "Metrics": metrics,
+                    },
+                ],
+            }
+
+            self.emit(json.dumps(line))
+
+        for component, values in invocation.counters.items():
+            line = {
+                "Handler": invocation.handler,
+                "Component": component,
+                **values,
+                "ColdStart": invocation.cold_start,
+                "SampleRate": self.sample_rate,
+            }
+            line["_aws"] = {
+                "Timestamp": timestamp,
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": self.namespace,
+                        "Dimensions": [["Handler", "Component"]],
+                        "Metrics": [
+                            {
+                                "Name": name,
+                                "Unit": "Seconds" if "seconds" in name else "Count",
+                            }
+                            for name in values
+                        ],
+                    },
+                ],
+            }
+
+            self.emit(json.dumps(line))
+
+
+tracer = Tracer()
@@ -0,0 +1,111 @@
+"""Bounded in-memory cache with per-entry expiration."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Self
+
+
+class TtlLruCache:
+    """
+    Bounded in-memory cache with per-entry expiration.
+
+    The least recently used entry is evicted once the cache is full, and
+    expired entries count as misses.
+    """
+
+    def __init__(
+        self: Self,
+        max_size: int = 1024,
+        ttl_seconds: float = 3600,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Create the cache.
+
+        :param max_size: Maximum number of entries.
+        :param ttl_seconds: Default seconds an entry is valid.
+        :param clock: Monotonic clock in seconds.
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Any, tuple[Any, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self: Self) -> int:
+        """
+        Get the number of entries, including expired ones not evicted yet.
+
+        :return: Number of entries.
+        """
+        return len(self._entries)
+
+    def get(self: Self, key: Any) -> Any | None:
+        """
+        Get an entry from the cache.
+
+        :param key: Key of the entry.
+        :return: The cached value, None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[1] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[0]
+
+    def set(self: Self, key: Any, value: Any, ttl_seconds: float | None = None) -> None:
+        """
+        Add or replace an entry in the cache.
+
+        :param key: Key of the entry.
+        :param value: Value to cache, it can't be None.
+        :param ttl_seconds: Seconds the entry is valid, the default TTL if None.
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+
+        with self._lock:
+            self._entries[key] = (value, self._clock() + ttl)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self: Self, key: Any) -> None:
+        """
+        Remove an entry from the cache.
+
+        :param key: Key of the entry.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self: Self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def metrics(self: Self) -> dict:
+        """
+        Get the counters of the cache.
+
+        :return: Hits, misses and current size.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+        }
@@ -2,7 +2,8 @@
 
 import logging
 
-from utils.ddb_client import DdbClient
+from utils.client_registry import client_registry
+from utils.ddb_codec import from_attribute_value
 
 
 def get_registered_users(contact_info_table_name: str) -> list[str]:
@@ -14,9 +15,15 @@ def get_registered_users(contact_info_table_name: str) -> list[str]:
     """
     logging.info("Getting registered users...")
 
-    ddb_client = DdbClient()
-    data = ddb_client.scan(contact_info_table_name)
+    ddb_client = client_registry.get_ddb_client()
+    users = [
+        from_attribute_value(user["discord_user"])
+        for user in ddb_client.scan_iter(
+            contact_info_table_name,
+            projection=["discord_user"],
+        )
+    ]
 
-    logging.info(f"There are {len(data)} users!")
+    logging.info(f"There are {len(users)} users!")
 
-    return [user["discord_user"]["S"] for user in data]
+    return users
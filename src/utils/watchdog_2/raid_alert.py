@@ -1,6 +1,8 @@
-"""Send raid alerts to a user."""
+"""Send raid alerts to users."""
 
-from utils.pinpoint_client import PinpointClient
+from utils.client_registry import client_registry
+
+RAID_MESSAGE = "You are being raided! Shield up!"
 
 
 def raid_alert(
@@ -16,20 +18,43 @@ def raid_alert(
     :param destination_number: Number to send the alerts to.
     :return: True.
     """
-    pinpoint_client = PinpointClient()
-    message = "You are being raided! Shield up!"
-    voice_message = f"<speak>{message}</speak>"
+    raid_alert_many(pinpoint_app_id, origination_number, [destination_number])
+
+    return True
+
+
+def raid_alert_many(
+    pinpoint_app_id: str,
+    origination_number: str,
+    destination_numbers: list[str],
+) -> dict[str, dict]:
+    """
+    Send raid alerts to several users at once.
+
+    The SMS messages go out in a single Pinpoint request and the voice calls
+    are made concurrently, so the time doesn't grow with the number of users.
 
-    pinpoint_client.send_sms_message(
+    :param pinpoint_app_id: Pinpoint application ID.
+    :param origination_number: Number to send the alerts from.
+    :param destination_numbers: Numbers to send the alerts to.
+    :return: SMS and voice delivery status by number.
+    """
+    pinpoint_client = client_registry.get_pinpoint_client()
+    voice_message = f"<speak>{RAID_MESSAGE}</speak>"
+
+    sms_results = pinpoint_client.send_sms_messages(
         pinpoint_app_id,
         origination_number,
-        destination_number,
-        message,
+        destination_numbers,
+        RAID_MESSAGE,
     )
-    pinpoint_client.send_voice_message(
+    voice_results = pinpoint_client.send_voice_messages(
         origination_number,
-        destination_number,
+        destination_numbers,
         voice_message,
     )
 
-    return True
+    return {
+        number: {"sms": sms_results[number], "voice": voice_results[number]}
+        for number in sms_results
+    }
@@ -0,0 +1,140 @@
+"""Collapse repeated raid alerts for the same user."""
+
+import logging
+import threading
+import time
+from typing import Self
+
+from utils.ddb_client import DdbClient
+from utils.ddb_codec import from_item, to_attribute_value
+from utils.ttl_cache import TtlLruCache
+
+RAID_ALERT_WINDOW_SECONDS = 300
+
+
+class RaidAlertDedup:
+    """
+    Collapse repeated raid alerts for the same user.
+
+    The first report of a user opens a window, reports inside it are only
+    counted. With a DDB table the window is shared by every container, it is
+    claimed with a conditional write and expires through the table TTL.
+    Without one, or if DDB fails, the window lives in memory.
+    """
+
+    def __init__(
+        self: Self,
+        window_seconds: float = RAID_ALERT_WINDOW_SECONDS,
+        ddb_client: DdbClient | None = None,
+        table_name: str | None = None,
+    ) -> None:
+        """
+        Create the dedup store.
+
+        :param window_seconds: Seconds repeated alerts are collapsed for.
+        :param ddb_client: DDB client for the shared store.
+        :param table_name: DDB table of the shared store, None to disable it.
+        """
+        self.window_seconds = window_seconds
+        self._ddb_client = ddb_client
+        self._table_name = table_name
+        self._lock = threading.Lock()
+        self._memory = TtlLruCache(ttl_seconds=window_seconds)
+
+    def report(self: Self, discord_user: str, reporter: str) -> tuple[bool, int]:
+        """
+        Record a raid report against a user.
+
+        :param discord_user: User being raided.
+        :param reporter: User that reported the raid.
+        :return: Whether the report opened the window, and how many people
+            reported the user inside it.
+        """
+        if self._ddb_client is not None and self._table_name:
+            try:
+                return self._report_shared(
+                    self._ddb_client,
+                    self._table_name,
+                    discord_user,
+                    reporter,
+                )
+
+            except Exception as e:
+                logging.info(f"Shared raid alert store unavailable: {e}")
+
+        with self._lock:
+            reporters = self._memory.get(discord_user)
+
+            if reporters is None:
+                self._memory.set(discord_user, {reporter})
+                return True, 1
+
+            reporters.add(reporter)
+
+            return False, len(reporters)
+
+    def release(self: Self, discord_user: str) -> None:
+        """
+        Close the window of a user, so the next report alerts again.
+
+        :param discord_user: User being raided.
+        """
+        self._memory.delete(discord_user)
+
+        if self._ddb_client is not None and self._table_name:
+            try:
+                self._ddb_client.update_item(
+                    self._table_name,
+                    {"discord_user": to_attribute_value(discord_user)},
+                    "SET expires_at = :now",
+                    expression_attribute_values={":now": to_attribute_value(0)},
+                )
+
+            except Exception as e:
+                logging.info(f"Shared raid alert store unavailable: {e}")
+
+    def _report_shared(
+        self: Self,
+        ddb_client: DdbClient,
+        table_name: str,
+        discord_user: str,
+        reporter: str,
+    ) -> tuple[bool, int]:
+        """
+        Record a raid report in the shared store.
+
+        :param ddb_client: DDB client for the shared store.
+        :param table_name: DDB table of the shared store.
+        :param discord_user: User being raided.
+        :param reporter: User that reported the raid.
+        :return: Whether the report opened the window, and how many people
+            reported the user inside it.
+        """
+        now = int(time.time())
+        key = {"discord_user": to_attribute_value(discord_user)}
+        reporters = to_attribute_value({reporter})
+
+        # TTL deletes are lazy, so expired windows are checked explicitly
+        opened = ddb_client.update_item(
+            table_name,
+            key,
+            "SET reporters = :reporters, expires_at = :expires_at",
+            expression_attribute_values={
+                ":reporters": reporters,
+                ":expires_at": to_attribute_value(now + int(self.window_seconds)),
+                ":now": to_attribute_value(now),
+            },
+            condition_expression="attribute_not_exists(discord_user) OR expires_at <= :now",
+        )
+
+        if opened is not None:
+            return True, 1
+
+        item = ddb_client.update_item(
+            table_name,
+            key,
+            "ADD reporters :reporters",
+            expression_attribute_values={":reporters": reporters},
+        )
+
+        return False, len(from_item(item or {}).get("reporters", ()))
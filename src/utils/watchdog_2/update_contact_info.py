@@ -1,6 +1,7 @@
 """Update the contact info in DDB for a user."""
 
-from utils.ddb_client import DdbClient
+from utils.client_registry import client_registry
+from utils.ddb_codec import to_item
 from utils.validate_phone_number import validate_phone_number
 
 
@@ -17,12 +18,9 @@ def update_contact_info(discord_user: str, phone_number: str, table_name: str) -
     if not validate_phone_number(phone_number):
         raise ValueError("Invalid phone number!")
 
-    dynamo_db_client = DdbClient()
+    dynamo_db_client = client_registry.get_ddb_client()
 
-    data = {
-        "discord_user": {"S": discord_user},
-        "phone_number": {"S": phone_number},
-    }
+    data = to_item({"discord_user": discord_user, "phone_number": phone_number})
 
     dynamo_db_client.put_item(table_name, data)
 
@@ -7,6 +7,7 @@ import {
     App,
 } from 'aws-cdk-lib';
 import {
+    Match,
     Template,
 } from 'aws-cdk-lib/assertions';
 import DiscordBotStack from '../lib/discord-bot-stack';
@@ -75,4 +76,44 @@ describe('DiscordBotStack', () => {
             Name: `bot/${botName}`,
         });
     });
+
+    /**
+     * Test that every priority lane gets its own queue wired to the receiver.
+     */
+    it('should create a queue per priority lane', () => {
+        const app = new App();
+        const botName = 'Watchdog2';
+
+        const stack = new DiscordBotStack(app, 'DiscordBotStackWithLanes', {
+            env: {
+                account: '8373873873',
+                region: 'us-east-1',
+            },
+            botName,
+            processingStackClass: Watchdog2ProcessingStack,
+            hostedZoneId: 'abcdefg',
+            zoneName: 'botfactory.lol',
+            commandLanes: {
+                raid2: 'urgent',
+            },
+        });
+
+        const template = Template.fromStack(stack);
+
+        template.resourceCountIs('AWS::SQS::Queue', 2);
+        template.hasResourceProperties('AWS::SQS::Queue', {
+            QueueName: `SQS${botName}Urgent`,
+        });
+
+        template.hasResourceProperties('AWS::Lambda::Function', {
+            FunctionName: `LambdaReceiver${botName}`,
+            Environment: {
+                Variables: Match.objectLike({
+                    COMMAND_LANES: JSON.stringify({
+                        raid2: 'urgent',
+                    }),
+                }),
+            },
+        });
+    });
 });
@@ -48,6 +48,26 @@ describe('SimpBotProcessingStack', () => {
             TableName: 'points',
         });
 
+        // Check for the DDB table with the balance of each user
+        template.hasResourceProperties('AWS::DynamoDB::Table', {
+            TableName: 'point_balances',
+            KeySchema: [
+                {
+                    AttributeName: 'discord_user',
+                    KeyType: 'HASH',
+                },
+            ],
+        });
+
+        // Check the DDB table that skips redelivered interactions
+        template.hasResourceProperties('AWS::DynamoDB::Table', {
+            TableName: 'simp_bot_idempotency',
+            TimeToLiveSpecification: {
+                AttributeName: 'expires_at',
+                Enabled: true,
+            },
+        });
+
         // Check for KMS Key for the table
         template.hasResourceProperties('AWS::KMS::Key', {
             // We don't have an Alias check in CloudFormation, but we can do a partial check:
@@ -63,5 +83,12 @@ describe('SimpBotProcessingStack', () => {
         template.hasResourceProperties('AWS::Lambda::Function', {
             FunctionName: 'CommandUpdatesSimpBot',
         });
+
+        // Check the Lambda that rebuilds the balances and its one-off trigger
+        template.hasResourceProperties('AWS::Lambda::Function', {
+            FunctionName: 'RebuildPointBalancesSimpBot',
+            Handler: 'processing_lambdas.simp_bot.simp_bot_rebuild_point_balances',
+        });
+        template.resourceCountIs('Custom::Trigger', 1);
     });
 });
@@ -0,0 +1,35 @@
+/**
+ * @file convert-to-pascal-case.test.ts
+ * Tests for convertToPascalCase function in lib/utils/convert-to-pascal-case.ts.
+ */
+
+import convertToPascalCase from '../../lib/utils/convert-to-pascal-case';
+
+describe('convertToPascalCase', () => {
+    /**
+     * Test converting a single lowercase word.
+     */
+    it('should capitalize a single word', () => {
+        const input = 'urgent';
+        const output = convertToPascalCase(input);
+        expect(output).toBe('Urgent');
+    });
+
+    /**
+     * Test converting a snake-cased string.
+     */
+    it('should convert snake case strings to Pascal case', () => {
+        const input = 'bulk_admin';
+        const output = convertToPascalCase(input);
+        expect(output).toBe('BulkAdmin');
+    });
+
+    /**
+     * Test converting an already Pascal-cased string.
+     */
+    it('should handle an already Pascal-cased string gracefully', () => {
+        const input = 'HelloWorld';
+        const output = convertToPascalCase(input);
+        expect(output).toBe('HelloWorld');
+    });
+});
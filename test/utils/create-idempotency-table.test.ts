@@ -0,0 +1,43 @@
+/**
+ * @file create-idempotency-table.test.ts
+ * Tests for createIdempotencyTable in lib/utils/create-idempotency-table.ts.
+ */
+
+import {
+    App, Stack,
+} from 'aws-cdk-lib';
+import {
+    Template,
+} from 'aws-cdk-lib/assertions';
+import createIdempotencyTable from '../../lib/utils/create-idempotency-table';
+
+describe('createIdempotencyTable', () => {
+    /**
+     * Test that the table is keyed on the interaction and expires its entries.
+     */
+    it('should create a DDB table with TTL keyed on the interaction ID', () => {
+        const app = new App();
+        const stack = new Stack(app, 'TestStackIdempotencyTable');
+
+        createIdempotencyTable(stack, 'SimpBot');
+
+        const template = Template.fromStack(stack);
+
+        template.hasResourceProperties('AWS::DynamoDB::Table', {
+            TableName: 'simp_bot_idempotency',
+            KeySchema: [
+                {
+                    AttributeName: 'interaction_id',
+                    KeyType: 'HASH',
+                },
+            ],
+            TimeToLiveSpecification: {
+                AttributeName: 'expires_at',
+                Enabled: true,
+            },
+        });
+        template.hasResourceProperties('AWS::KMS::Key', {
+            EnableKeyRotation: true,
+        });
+    });
+});
@@ -70,5 +70,52 @@ describe('createProcessingLambda', () => {
 
         // Check for event source mapping to SQS
         template.resourceCountIs('AWS::Lambda::EventSourceMapping', 1);
+        template.hasResourceProperties('AWS::Lambda::EventSourceMapping', {
+            FunctionResponseTypes: [
+                'ReportBatchItemFailures',
+            ],
+        });
+    });
+
+    /**
+     * Test that every priority lane gets its own function and event source.
+     */
+    it('should create a function per priority lane', () => {
+        const app = new App();
+        const stack = new Stack(app, 'TestStackProcessingLambdaLanes');
+
+        const role = new Role(stack, 'TestProcessingRole', {
+            assumedBy: new ServicePrincipal('lambda.amazonaws.com'),
+        });
+
+        const secret = new Secret(stack, 'TestSecret', {
+            secretName: 'bot/SimpBot',
+        });
+
+        const queue = new Queue(stack, 'TestQueue', {
+            queueName: 'MyQueue',
+        });
+
+        const urgentQueue = new Queue(stack, 'TestUrgentQueue', {
+            queueName: 'MyUrgentQueue',
+        });
+
+        createProcessingLambda(
+            stack,
+            'SimpBot',
+            secret,
+            role,
+            queue,
+            {
+                urgent: urgentQueue,
+            },
+        );
+
+        const template = Template.fromStack(stack);
+
+        template.hasResourceProperties('AWS::Lambda::Function', {
+            FunctionName: 'LambdaProcessingSimpBotUrgent',
+        });
+        template.resourceCountIs('AWS::Lambda::EventSourceMapping', 2);
     });
 });
@@ -42,6 +42,24 @@ describe('Watchdog2ProcessingStack', () => {
             TableName: 'contact_info',
         });
 
+        // Check the DDB table that collapses repeated raid alerts
+        template.hasResourceProperties('AWS::DynamoDB::Table', {
+            TableName: 'raid_alerts',
+            TimeToLiveSpecification: {
+                AttributeName: 'expires_at',
+                Enabled: true,
+            },
+        });
+
+        // Check the DDB table that skips redelivered interactions
+        template.hasResourceProperties('AWS::DynamoDB::Table', {
+            TableName: 'watchdog2_idempotency',
+            TimeToLiveSpecification: {
+                AttributeName: 'expires_at',
+                Enabled: true,
+            },
+        });
+
         // Check KMS Key for the table
         template.hasResourceProperties('AWS::KMS::Key', {
             EnableKeyRotation: true,
@@ -0,0 +1 @@
+"""Load test and benchmark harness of the bot pipeline."""
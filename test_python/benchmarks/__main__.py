@@ -0,0 +1,77 @@
+"""
+Benchmark the bot pipeline from the command line.
+
+PYTHONPATH=./src python -m test_python.benchmarks --check
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from test_python.benchmarks.harness import WORKLOADS, check_regressions, run_benchmark
+
+BASELINES_PATH = Path(__file__).parent / "baselines.json"
+DEFAULT_TOLERANCE = 0.5
+
+
+def main(argv: list[str] | None = None, baselines_path: Path = BASELINES_PATH) -> int:
+    """
+    Run the benchmarks and compare them against the baselines.
+
+    :param argv: Command line arguments, sys.argv if None.
+    :param baselines_path: JSON file with the baseline of every bot.
+    :return: Exit code, 1 if a benchmark regressed.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bot", action="append", choices=list(WORKLOADS))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--aws-latency-ms", type=float, default=5.0)
+    parser.add_argument("--discord-latency-ms", type=float, default=20.0)
+    parser.add_argument("--alloc-samples", type=int, default=20)
+    parser.add_argument("--events", type=Path, help="JSON list of interaction bodies")
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--update-baselines", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    recorded = json.loads(args.events.read_text()) if args.events else None
+    baselines = (
+        json.loads(baselines_path.read_text()) if baselines_path.exists() else {}
+    )
+    exit_code = 0
+
+    for bot in args.bot or list(WORKLOADS):
+        report = run_benchmark(
+            bot=bot,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            batch_size=args.batch_size,
+            aws_latency_ms=args.aws_latency_ms,
+            discord_latency_ms=args.discord_latency_ms,
+            alloc_samples=args.alloc_samples,
+            recorded=recorded,
+        )
+        print(json.dumps(report, indent=4))
+
+        if args.check and bot in baselines:
+            regressions = check_regressions(report, baselines[bot], args.tolerance)
+
+            for regression in regressions:
+                print(f"REGRESSION {bot} {regression}")
+
+            exit_code = 1 if regressions else exit_code
+
+        if args.update_baselines:
+            baselines[bot] = {"config": report["config"], "stages": report["stages"]}
+
+    if args.update_baselines:
+        baselines_path.write_text(json.dumps(baselines, indent=4) + "\n")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
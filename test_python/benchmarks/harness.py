@@ -0,0 +1,469 @@
+"""Replay interactions through the receiver and the processing lambdas."""
+
+import importlib
+import json
+import math
+import os
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from unittest.mock import patch
+
+from nacl.signing import SigningKey
+
+from discord.discord_receiver import discord_receiver
+from test_python.benchmarks.stand_ins import FakeAws, FakeDiscordSession
+from utils.client_registry import client_registry
+from utils.tracing import tracer
+
+APPLICATION_ID = "1216559048451952710"
+CHANNEL_ID = "1000523254928257125"
+QUEUE_URL = "benchmark_queue"
+AWS_SERVICES = ("sqs", "dynamodb", "pinpoint", "pinpoint-sms-voice", "secretsmanager")
+
+# Users resolved in every interaction, raid2 targets all of them
+RESOLVED_USERS = {
+    user_id: {"username": f"target{index}", "discriminator": "0002"}
+    for index, user_id in enumerate(("200", "201", "202"))
+}
+
+# Processing handler, command mix and DDB items of every bot. Raid alerts
+# are answered by the Pinpoint stand-in and the raid window is disabled, so
+# every raid2 fans out to all its targets.
+WORKLOADS: dict[str, dict] = {
+    "simp_bot": {
+        "handler": "processing_lambdas.simp_bot:simp_bot",
+        "commands": [
+            (
+                "add_points",
+                [
+                    {"name": "user", "type": 6, "value": "200"},
+                    {"name": "points", "type": 4, "value": 5},
+                ],
+            ),
+            (
+                "remove_points",
+                [
+                    {"name": "user", "type": 6, "value": "200"},
+                    {"name": "points", "type": 4, "value": 1},
+                ],
+            ),
+            ("point_balance", []),
+        ],
+    },
+    "watchdog_2": {
+        "handler": "processing_lambdas.watchdog_2:watchdog2",
+        "commands": [
+            ("update2", [{"name": "number", "type": 3, "value": "+12068903991"}]),
+            ("registered_users2", []),
+            (
+                "raid2",
+                [
+                    {"name": "user", "type": 6, "value": "200"},
+                    {"name": "user2", "type": 6, "value": "201"},
+                    {"name": "user3", "type": 6, "value": "202"},
+                ],
+            ),
+        ],
+        "items": {
+            "contact_info": {
+                f"{user['username']}#{user['discriminator']}": {
+                    "discord_user": {
+                        "S": f"{user['username']}#{user['discriminator']}",
+                    },
+                    "phone_number": {"S": f"+1206890399{index}"},
+                }
+                for index, user in enumerate(RESOLVED_USERS.values())
+            },
+        },
+    },
+}
+
+# Metrics where a higher value is a regression, the rest regress when lower
+LOWER_IS_BETTER = ("p50_ms", "p99_ms", "peak_alloc_kib", "errors")
+
+# Metrics that are reported but never regress. The cold start depends on
+# what the process loaded before, ie: the benchmarks of other bots.
+INFORMATIONAL = ("requests", "cold_start_ms")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """
+    Get a percentile of some samples with the nearest rank method.
+
+    :param samples: The samples.
+    :param pct: Percentile to get, from 0 to 100.
+    :return: The percentile, 0 if there are no samples.
+    """
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+
+    return ordered[rank - 1]
+
+
+def build_interactions(
+    bot: str,
+    count: int,
+    recorded: list[dict] | None = None,
+) -> list[dict]:
+    """
+    Build the bodies of the interactions to replay.
+
+    :param bot: Bot the interactions are sent to.
+    :param count: Number of interactions.
+    :param recorded: Recorded interaction bodies to cycle through, the
+        command mix of the bot if None.
+    :return: Bodies of the interactions, each with its own ID and token.
+    """
+    if not recorded:
+        recorded = [
+            {
+                "application_id": APPLICATION_ID,
+                "type": 2,
+                "channel_id": CHANNEL_ID,
+                "member": {
+                    "user": {
+                        "id": "100",
+                        "username": "issuer",
+                        "discriminator": "0001",
+                    },
+                },
+                "data": {
+                    "name": command,
+                    "options": options,
+                    "resolved": {"users": RESOLVED_USERS},
+                },
+            }
+            for command, options in WORKLOADS[bot]["commands"]
+        ]
+
+    return [
+        {
+            **recorded[index % len(recorded)],
+            "id": str(index),
+            "token": f"benchmark_token_{index}",
+        }
+        for index in range(count)
+    ]
+
+
+def sign_events(bodies: list[dict], signing_key: SigningKey) -> list[dict]:
+    """
+    Wrap interaction bodies in signed Lambda events.
+
+    :param bodies: Bodies of the interactions.
+    :param signing_key: Key the bot secret verifies against.
+    :return: Lambda events, as API Gateway sends them.
+    """
+    timestamp = str(int(time.time()))
+    events = []
+
+    for body in bodies:
+        raw_body = json.dumps(body)
+        signature = signing_key.sign(f"{timestamp}{raw_body}".encode()).signature
+        events.append(
+            {
+                "headers": {
+                    "x-signature-ed25519": signature.hex(),
+                    "x-signature-timestamp": timestamp,
+                },
+                "body": raw_body,
+            },
+        )
+
+    return events
+
+
+def _measure(calls: list[Callable[[], bool]], concurrency: int) -> dict:
+    """
+    Run calls concurrently and time them.
+
+    :param calls: Calls to run, each returns True if it succeeded.
+    :param concurrency: Calls running at the same time.
+    :return: Latency percentiles, throughput and errors of the calls.
+    """
+
+    def timed(call: Callable[[], bool]) -> tuple[float, bool]:
+        """
+        Time a single call.
+
+        :param call: Call to run.
+        :return: Seconds the call took and whether it succeeded.
+        """
+        start = time.perf_counter()
+
+        try:
+            succeeded = call()
+
+        except Exception:
+            succeeded = False
+
+        return time.perf_counter() - start, succeeded
+
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, calls))
+
+    elapsed = time.perf_counter() - start
+    latencies_ms = [seconds * 1000 for seconds, _ in results]
+
+    return {
+        "requests": len(results),
+        "errors": sum(not succeeded for _, succeeded in results),
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p99_ms": round(percentile(latencies_ms, 99), 3),
+        "requests_per_second": round(len(results) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def _peak_alloc_kib(calls: list[Callable[[], Any]]) -> float:
+    """
+    Get the average memory allocated at the peak of each call.
+
+    The calls run one after the other, so the peaks don't overlap.
+
+    :param calls: Calls to run.
+    :return: Average peak in KiB, 0 if there are no calls.
+    """
+    if not calls:
+        return 0.0
+
+    peaks = []
+    tracemalloc.start()
+
+    try:
+        for call in calls:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            call()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+
+    finally:
+        tracemalloc.stop()
+
+    return round(sum(peaks) / len(peaks) / 1024, 1)
+
+
+def _run_stage(
+    calls: list[Callable[[], bool]],
+    measured: int,
+    concurrency: int,
+) -> dict:
+    """
+    Benchmark a stage of the pipeline.
+
+    The first call is timed on its own as the cold start, the next ones are
+    timed concurrently and the rest are replayed one by one to measure
+    allocations.
+
+    :param calls: Calls of the stage.
+    :param measured: Number of calls timed concurrently.
+    :param concurrency: Calls running at the same time.
+    :return: Metrics of the stage.
+    """
+    start = time.perf_counter()
+    calls[0]()
+    cold_start_ms = (time.perf_counter() - start) * 1000
+
+    end = measured + 1
+    metrics = _measure(calls[1:end], concurrency)
+    metrics["cold_start_ms"] = round(cold_start_ms, 3)
+    metrics["peak_alloc_kib"] = _peak_alloc_kib(calls[end:])
+
+    return metrics
+
+
+def _batches(records: list[dict], batch_size: int) -> list[list[dict]]:
+    """
+    Split records in SQS batches.
+
+    :param records: SQS records.
+    :param batch_size: Records per batch.
+    :return: The batches, in order.
+    """
+    batches = []
+
+    for start in range(0, len(records), batch_size):
+        end = start + batch_size
+        batches.append(records[start:end])
+
+    return batches
+
+
+def _receiver_call(event: dict) -> Callable[[], bool]:
+    """
+    Send an event to the receiver.
+
+    :param event: Signed Lambda event.
+    :return: Call that succeeds if the receiver answered with a 200.
+    """
+    return lambda: discord_receiver(event, {})["statusCode"] == 200
+
+
+def _processor_call(
+    handler: Callable[[dict, dict], dict],
+    records: list[dict],
+) -> Callable[[], bool]:
+    """
+    Send a batch of records to a processing lambda.
+
+    :param handler: Handler of the processing lambda.
+    :param records: SQS records of the batch.
+    :return: Call that succeeds if no record of the batch failed.
+    """
+    return lambda: not handler({"Records": records}, {})["batchItemFailures"]
+
+
+def run_benchmark(
+    bot: str = "simp_bot",
+    requests: int = 200,
+    concurrency: int = 8,
+    batch_size: int = 1,
+    aws_latency_ms: float = 5.0,
+    discord_latency_ms: float = 20.0,
+    alloc_samples: int = 20,
+    recorded: list[dict] | None = None,
+) -> dict:
+    """
+    Replay interactions through the receiver and then the processing lambda.
+
+    :param bot: Bot the interactions are sent to.
+    :param requests: Number of interactions.
+    :param concurrency: Invocations running at the same time in each stage.
+    :param batch_size: SQS records per invocation of the processing lambda,
+        the metrics of the processor are per invocation.
+    :param aws_latency_ms: Milliseconds each AWS call takes.
+    :param discord_latency_ms: Milliseconds each Discord call takes.
+    :param alloc_samples: Extra interactions replayed one by one to measure
+        allocations. The first batch is replayed before the rest to measure
+        the cold start.
+    :param recorded: Recorded interaction bodies to replay.
+    :return: The config of the run, the metrics of each stage and the calls
+        made to the stand-ins.
+    """
+    config = {
+        "bot": bot,
+        "requests": requests,
+        "concurrency": concurrency,
+        "batch_size": batch_size,
+        "aws_latency_ms": aws_latency_ms,
+        "discord_latency_ms": discord_latency_ms,
+    }
+    module_name, handler_name = WORKLOADS[bot]["handler"].split(":")
+    handler = getattr(importlib.import_module(module_name), handler_name)
+
+    signing_key = SigningKey.generate()
+    secret = {"Token": "token", "PublicKey": signing_key.verify_key.encode().hex()}
+    fake_aws = FakeAws(
+        secret,
+        {service: aws_latency_ms / 1000 for service in AWS_SERVICES},
+        WORKLOADS[bot].get("items"),
+    )
+    fake_session = FakeDiscordSession(discord_latency_ms / 1000)
+    events = sign_events(
+        build_interactions(bot, batch_size + requests + alloc_samples, recorded),
+        signing_key,
+    )
+    env = {
+        "AWS_DEFAULT_REGION": os.environ.get("AWS_DEFAULT_REGION", "us-west-2"),
+        "BOT_SECRET_NAME": "benchmark_secret",
+        "SQS_QUEUE_URL": QUEUE_URL,
+        "CONTACT_INFO_TABLE_NAME": "contact_info",
+        "PINPOINT_APP_ID": "benchmark_app",
+        "ORIGINATION_NUMBER": "+12068900000",
+        "RAID_ALERT_WINDOW_SECONDS": "0",
+        "COMMAND_LANES": "",
+        "INLINE_COMMANDS": "",
+    }
+
+    client_registry.reset()
+
+    try:
+        with (
+            patch.dict(os.environ, env),
+            # Sampled invocations are still timed, their metrics are dropped
+            patch.object(tracer, "emit", lambda _: None),
+            # A function, unlike a bound method, also receives the client
+            patch(
+                "botocore.client.BaseClient._make_api_call",
+                new=lambda client, name, params: fake_aws.make_api_call(
+                    client,
+                    name,
+                    params,
+                ),
+            ),
+            patch(
+                "utils.http_session.create_http_session",
+                return_value=fake_session,
+            ),
+        ):
+            receiver_calls = [_receiver_call(event) for event in events]
+            receiver = _run_stage(receiver_calls, requests, concurrency)
+
+            records = [
+                {
+                    "messageId": str(index),
+                    "receiptHandle": str(index),
+                    "body": body,
+                }
+                for index, body in enumerate(fake_aws.queues.get(QUEUE_URL, []))
+            ]
+            processor_calls = [
+                _processor_call(handler, batch)
+                for batch in _batches(records, batch_size)
+            ]
+            processor = _run_stage(
+                processor_calls,
+                math.ceil(requests / batch_size),
+                concurrency,
+            )
+
+    finally:
+        client_registry.reset()
+
+    return {
+        "config": config,
+        "stages": {"receiver": receiver, "processor": processor},
+        "calls": {"aws": fake_aws.calls, "discord": fake_session.calls},
+    }
+
+
+def check_regressions(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Compare a report against a baseline.
+
+    :param report: Report of run_benchmark.
+    :param baseline: Report stored as the baseline.
+    :param tolerance: Fraction a metric can get worse before it regresses.
+    :return: Description of every regression, empty if there are none.
+    """
+    if report["config"] != baseline["config"]:
+        return ["The baseline was recorded with a different config."]
+
+    regressions = []
+
+    for stage, expected_metrics in baseline["stages"].items():
+        metrics = report["stages"][stage]
+
+        for name, expected in expected_metrics.items():
+            if name in INFORMATIONAL:
+                continue
+
+            value = metrics[name]
+
+            if name in LOWER_IS_BETTER:
+                regressed = value > expected * (1 + tolerance)
+
+            else:
+                regressed = value < expected * (1 - tolerance)
+
+            if regressed:
+                regressions.append(f"{stage} {name}: {value} (baseline {expected})")
+
+    return regressions
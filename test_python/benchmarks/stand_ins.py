@@ -0,0 +1,197 @@
+"""In-process stand-ins for AWS and Discord with configurable latency."""
+
+import json
+import threading
+import time
+from typing import Any, Self
+
+from test_python.test_utils.mock_api_call import mock_make_api_call
+
+
+class FakeAws:
+    """
+    Stand-in for the AWS APIs used by the bots.
+
+    Every call sleeps for the latency of its service. Messages sent to SQS
+    are kept by queue URL so the processing stage can consume them, secrets
+    and the items of the given tables are served from memory and the rest of
+    the calls are answered by mock_make_api_call.
+    """
+
+    def __init__(
+        self: Self,
+        secret: dict,
+        latency_seconds: dict[str, float],
+        items: dict[str, dict[str, dict]] | None = None,
+    ) -> None:
+        """
+        Create the stand-in.
+
+        :param secret: Contents of every secret.
+        :param latency_seconds: Seconds each call takes by boto3 service name.
+        :param items: DDB items by table name and partition key value.
+        """
+        self.secret = secret
+        self.latency_seconds = latency_seconds
+        self.items = items or {}
+        self.queues: dict[str, list[str]] = {}
+        self.calls: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def make_api_call(
+        self: Self,
+        client: Any,
+        operation_name: str,
+        operation_params: dict,
+    ) -> dict:
+        """
+        Answer a boto3 call, replaces BaseClient._make_api_call.
+
+        :param client: The boto3 client making the call.
+        :param operation_name: Name of the API call.
+        :param operation_params: Dictionary with the parameters of the request.
+        :return: The API response.
+        """
+        service_name = client.meta.service_model.service_name
+        time.sleep(self.latency_seconds.get(service_name, 0.0))
+
+        with self._lock:
+            self.calls[operation_name] = self.calls.get(operation_name, 0) + 1
+
+            if operation_name == "SendMessage":
+                queue = self.queues.setdefault(operation_params["QueueUrl"], [])
+                queue.append(operation_params["MessageBody"])
+                return {"MessageId": str(len(queue))}
+
+        if operation_name == "GetSecretValue":
+            return {"SecretString": json.dumps(self.secret)}
+
+        if operation_name == "GetItem" and operation_params["TableName"] in self.items:
+            item = self._get_item(
+                operation_params["TableName"],
+                operation_params["Key"],
+            )
+            return {"Item": item} if item is not None else {}
+
+        if operation_name == "BatchGetItem" and all(
+            table_name in self.items for table_name in operation_params["RequestItems"]
+        ):
+            return {
+                "Responses": {
+                    table_name: [
+                        item
+                        for item in (
+                            self._get_item(table_name, key) for key in request["Keys"]
+                        )
+                        if item is not None
+                    ]
+                    for table_name, request in operation_params["RequestItems"].items()
+                },
+                "UnprocessedKeys": {},
+            }
+
+        return mock_make_api_call(client, operation_name, operation_params)
+
+    def _get_item(self: Self, table_name: str, key: dict) -> dict | None:
+        """
+        Get an item served from memory.
+
+        :param table_name: Name of the table.
+        :param key: Key of the item, in the DDB format.
+        :return: The item, None if the table doesn't have it.
+        """
+        (key_value,) = key.values()
+
+        return self.items[table_name].get(key_value["S"])
+
+
+class FakeResponse:
+    """Response of the Discord stand-in."""
+
+    def __init__(self: Self, status_code: int, content: dict) -> None:
+        """
+        Create the response.
+
+        :param status_code: HTTP status code.
+        :param content: JSON content of the response.
+        """
+        self.status_code = status_code
+        self.content = json.dumps(content).encode()
+        self.headers: dict[str, str] = {}
+
+    def json(self: Self) -> dict:
+        """
+        Parse the content of the response.
+
+        :return: The JSON content.
+        """
+        return json.loads(self.content)
+
+
+class FakeDiscordSession:
+    """Stand-in for the HTTP session used to call Discord."""
+
+    def __init__(self: Self, latency_seconds: float) -> None:
+        """
+        Create the stand-in.
+
+        :param latency_seconds: Seconds each request takes.
+        """
+        self.latency_seconds = latency_seconds
+        self.calls: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _request(self: Self, method: str, url: str) -> FakeResponse:
+        """
+        Answer a request to Discord.
+
+        :param method: HTTP method of the request.
+        :param url: URL of the request.
+        :return: A successful response.
+        """
+        time.sleep(self.latency_seconds)
+
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+
+        if method == "GET" and "/users/" in url:
+            return FakeResponse(
+                200,
+                {
+                    "id": url.rsplit("/", 1)[-1],
+                    "username": "user",
+                    "discriminator": "0001",
+                },
+            )
+
+        return FakeResponse(200, {"id": "message"})
+
+    def get(self: Self, url: str, **_: Any) -> FakeResponse:
+        """
+        Send a GET request.
+
+        :param url: URL of the request.
+        :param _: Unused request arguments.
+        :return: The response.
+        """
+        return self._request("GET", url)
+
+    def post(self: Self, url: str, **_: Any) -> FakeResponse:
+        """
+        Send a POST request.
+
+        :param url: URL of the request.
+        :param _: Unused request arguments.
+        :return: The response.
+        """
+        return self._request("POST", url)
+
+    def patch(self: Self, url: str, **_: Any) -> FakeResponse:
+        """
+        Send a PATCH request.
+
+        :param url: URL of the request.
+        :param _: Unused request arguments.
+        :return: The response.
+        """
+        return self._request("PATCH", url)
@@ -0,0 +1,109 @@
+"""Tests for the benchmark harness."""
+
+import copy
+from pathlib import Path
+
+import pytest
+
+from test_python.benchmarks.__main__ import main
+from test_python.benchmarks.harness import check_regressions, percentile, run_benchmark
+
+
+def test_percentile() -> None:
+    """Test that percentiles use the nearest rank."""
+    samples = [float(sample) for sample in range(1, 101)]
+
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    assert percentile([3.0], 99) == 3
+    assert percentile([], 50) == 0
+
+
+@pytest.mark.parametrize("bot", ["simp_bot", "watchdog_2"])
+def test_run_benchmark(bot: str) -> None:
+    """
+    Test that interactions go through the receiver and the processing lambda.
+
+    :param bot: Bot the interactions are sent to.
+    """
+    report = run_benchmark(
+        bot=bot,
+        requests=10,
+        concurrency=4,
+        aws_latency_ms=0,
+        discord_latency_ms=0,
+        alloc_samples=2,
+    )
+
+    for stage in ("receiver", "processor"):
+        metrics = report["stages"][stage]
+        assert metrics["requests"] == 10
+        assert metrics["errors"] == 0
+        assert metrics["p50_ms"] <= metrics["p99_ms"]
+        assert metrics["peak_alloc_kib"] > 0
+
+    # Every reply edits the deferred response of its interaction
+    assert report["calls"]["aws"]["SendMessage"] == 13
+    assert report["calls"]["discord"] == {"PATCH": 13}
+
+    # Every raid2 sends its three alerts in one SMS request and three calls
+    if bot == "watchdog_2":
+        assert report["calls"]["aws"]["SendMessages"] == 4
+        assert report["calls"]["aws"]["SendVoiceMessage"] == 12
+
+
+def test_check_regressions() -> None:
+    """Test that metrics worse than the baseline beyond the tolerance regress."""
+    baseline: dict = {
+        "config": {"bot": "simp_bot"},
+        "stages": {
+            "receiver": {
+                "requests": 10,
+                "errors": 0,
+                "p99_ms": 10.0,
+                "requests_per_second": 100.0,
+                "cold_start_ms": 50.0,
+            },
+        },
+    }
+    report = copy.deepcopy(baseline)
+    report["stages"]["receiver"].update(p99_ms=14.0, cold_start_ms=500.0)
+
+    assert check_regressions(report, baseline, 0.5) == []
+
+    report["stages"]["receiver"].update(p99_ms=16.0, requests_per_second=40.0)
+
+    assert check_regressions(report, baseline, 0.5) == [
+        "receiver p99_ms: 16.0 (baseline 10.0)",
+        "receiver requests_per_second: 40.0 (baseline 100.0)",
+    ]
+
+    report["config"] = {"bot": "watchdog_2"}
+
+    assert len(check_regressions(report, baseline, 0.5)) == 1
+
+
+def test_main_baselines(tmp_path: Path) -> None:
+    """
+    Test that baselines are stored and checked from the command line.
+
+    :param tmp_path: Temporary directory of the test.
+    """
+    baselines_path = tmp_path / "baselines.json"
+    args = [
+        "--bot",
+        "watchdog_2",
+        "--requests",
+        "5",
+        "--aws-latency-ms",
+        "0",
+        "--discord-latency-ms",
+        "0",
+        "--alloc-samples",
+        "1",
+    ]
+
+    assert main([*args, "--update-baselines"], baselines_path) == 0
+    assert baselines_path.exists()
+    assert main([*args, "--check", "--tolerance", "1000"], baselines_path) == 0
+    assert main([*args, "--check", "--requests", "6"], baselines_path) == 1
@@ -34,10 +34,16 @@ def test_simp_bot_commands_happy_path(dummy_event: dict, dummy_context: dict) ->
         assert {
             "name": "taylor",
             "type": 1,
-            "description": "Sends a random Taylor Swift song quote.",
+            "description": "Sends a random Taylor Swift song.",
         } in commands_arg
         assert {
             "name": "point_balance",
             "type": 1,
             "description": "Sends the points balance of all users.",
         } in commands_arg
+
+        # Discord only accepts positive points
+        for command in commands_arg:
+            for option in command.get("options", []):
+                if option["name"] == "points":
+                    assert option["min_value"] == 1
@@ -30,20 +30,18 @@ def test_watchdog2_commands_success() -> None:
 
     This test verifies behavior when the HTTP status code is < 400.
     """
-    with (
-        patch("command_updates.watchdog_2.requests.post") as mock_requests_post,
-        patch(
-            "command_updates.watchdog_2.SecretsManagerClient",
-        ) as mock_secrets_manager_class,
-    ):
-        # Mock the SecretsManagerClient so it returns fake credentials.
-        instance = mock_secrets_manager_class.return_value
-        instance.get_secret.return_value = {
+    with patch(
+        "command_updates.watchdog_2.client_registry",
+    ) as mock_client_registry:
+        mock_requests_post = mock_client_registry.get_http_session.return_value.post
+
+        # Mock the client registry so it returns fake credentials.
+        mock_client_registry.get_secret.return_value = {
             "ApplicationId": "1234567890",
             "Token": "fake-bot-token",
         }
 
-        # Configure the mock for requests.post so all calls return 200.
+        # Configure the mock for session.post so all calls return 200.
         mock_requests_post.side_effect = [
             mock_response(200),
             mock_response(200),
@@ -78,16 +76,14 @@ def test_watchdog2_commands_failure() -> None:
     """
     Test that watchdog2_commands raises an HTTPError.
 
-    This test verifies behavior if any call to requests.post returns a 400+ status code.
+    This test verifies behavior if any call to session.post returns a 400+ status code.
     """
-    with (
-        patch("command_updates.watchdog_2.requests.post") as mock_requests_post,
-        patch(
-            "command_updates.watchdog_2.SecretsManagerClient",
-        ) as mock_secrets_manager_class,
-    ):
-        instance = mock_secrets_manager_class.return_value
-        instance.get_secret.return_value = {
+    with patch(
+        "command_updates.watchdog_2.client_registry",
+    ) as mock_client_registry:
+        mock_requests_post = mock_client_registry.get_http_session.return_value.post
+
+        mock_client_registry.get_secret.return_value = {
             "ApplicationId": "1234567890",
             "Token": "fake-bot-token",
         }
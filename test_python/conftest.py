@@ -1,11 +1,21 @@
 """Shared test configurations."""
 
+from typing import Generator
 from unittest.mock import patch
 
 import pytest
 
 from discord.discord_client import DiscordClient
 from test_python.test_utils.mock_api_call import mock_make_api_call
+from utils.client_registry import client_registry
+
+
+@pytest.fixture(autouse=True)
+def reset_client_registry() -> Generator:
+    """Start and finish every test with an empty client registry."""
+    client_registry.reset()
+    yield
+    client_registry.reset()
 
 
 @pytest.fixture
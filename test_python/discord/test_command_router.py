@@ -0,0 +1,206 @@
+"""Tests for the command router."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from discord.command_router import CommandContext, CommandRouter
+from utils.idempotency import IdempotencyStore
+
+
+def _make_context(command: str = "ping") -> CommandContext:
+    """
+    Create a command context for the tests.
+
+    :param command: Name of the command.
+    :return: The command context.
+    """
+    return CommandContext(
+        command=command,
+        options={},
+        command_issuer="issuer#0001",
+        channel_id="123",
+    )
+
+
+def test_parse_options() -> None:
+    """Test that options are parsed into typed values by name."""
+    options = CommandContext.parse_options(
+        [
+            {"name": "user", "type": 6, "value": "456"},
+            {"name": "points", "type": 4, "value": "10"},
+            {"name": "ratio", "type": 10, "value": "1.5"},
+            {"name": "untyped", "value": "raw"},
+        ],
+    )
+
+    assert options == {"user": "456", "points": 10, "ratio": 1.5, "untyped": "raw"}
+    assert CommandContext.parse_options(None) == {}
+
+
+def test_from_record() -> None:
+    """Test that a context is created from an SQS record."""
+    record = {
+        "body": json.dumps(
+            {
+                "command": "add_points",
+                "options": [{"name": "points", "type": 4, "value": 5}],
+                "command_issuer": "issuer#0001",
+                "channel_id": "123",
+                "application_id": "app",
+                "interaction_token": "token",
+                "interaction_id": "interaction",
+                "resolved_users": {"456": "user#0002"},
+                "resolved_members": {"456": {"nick": "Captain"}},
+            },
+        ),
+    }
+    context = CommandContext.from_record(record)
+
+    assert context.command == "add_points"
+    assert context.options == {"points": 5}
+    assert context.channel_id == "123"
+    assert context.resolved_users == {"456": "user#0002"}
+    assert context.resolved_members == {"456": {"nick": "Captain"}}
+    assert context.command_issuer_id is None
+    assert context.interaction_token == "token"
+    assert context.interaction_id == "interaction"
+
+
+def test_dispatch() -> None:
+    """Test that the handler reply is sent to the channel."""
+    router = CommandRouter()
+    router.command("ping")(lambda context, _: f"pong {context.command_issuer}")
+    discord_client = MagicMock()
+
+    assert router.dispatch(_make_context(), discord_client) is True
+    assert router.commands == ["ping"]
+    assert router.metrics()["ping"]["calls"] == 1
+    assert router.metrics()["ping"]["errors"] == 0
+
+    discord_client.send_message_to_channel.assert_called_once_with(
+        {"content": "pong issuer#0001"},
+        "123",
+    )
+
+
+def test_dispatch_handler_error() -> None:
+    """Test that a handler error is sent to the channel and counted."""
+    router = CommandRouter()
+
+    @router.command("ping")
+    def _ping(_: CommandContext, __: MagicMock) -> str:
+        """
+        Fail to handle the command.
+
+        :param _: The parsed command.
+        :param __: Discord client of the bot.
+        :raises RuntimeError: Always.
+        """
+        raise RuntimeError("boom")
+
+    discord_client = MagicMock()
+
+    assert router.dispatch(_make_context(), discord_client) is True
+    assert router.metrics()["ping"]["errors"] == 1
+
+    discord_client.send_message_to_channel.assert_called_once_with(
+        {"content": "boom"},
+        "123",
+    )
+
+
+def test_dispatch_edits_deferred_response() -> None:
+    """Test that the reply edits the deferred response when there is a token."""
+    router = CommandRouter()
+    router.command("ping")(lambda _, __: "pong")
+    context = _make_context()
+    context.application_id = "app"
+    context.interaction_token = "token"
+    discord_client = MagicMock()
+
+    assert router.dispatch(context, discord_client) is True
+
+    discord_client.edit_original_response.assert_called_once_with(
+        {"content": "pong"},
+        "app",
+        "token",
+    )
+    discord_client.send_message_to_channel.assert_not_called()
+
+    discord_client.edit_original_response.side_effect = Exception("expired")
+
+    assert router.dispatch(context, discord_client) is True
+
+    discord_client.send_message_to_channel.assert_called_once_with(
+        {"content": "pong"},
+        "123",
+    )
+
+
+def test_dispatch_unknown_command() -> None:
+    """Test that unknown commands are ignored."""
+    router = CommandRouter()
+    discord_client = MagicMock()
+
+    assert router.dispatch(_make_context("unknown"), discord_client) is False
+
+    discord_client.send_message_to_channel.assert_not_called()
+
+
+def test_dispatch_skips_redelivered_interactions() -> None:
+    """Test that a redelivered interaction only sends its reply again."""
+    handler = MagicMock(return_value="pong")
+    router = CommandRouter()
+    router.command("ping")(handler)
+    context = _make_context()
+    context.interaction_id = "interaction"
+    discord_client = MagicMock()
+    store = IdempotencyStore()
+
+    assert router.dispatch(context, discord_client, store)
+    assert router.dispatch(context, discord_client, store)
+
+    handler.assert_called_once()
+    assert discord_client.send_message_to_channel.call_count == 2
+    discord_client.send_message_to_channel.assert_called_with(
+        {"content": "pong"},
+        "123",
+    )
+
+
+def test_dispatch_retries_failed_replies() -> None:
+    """Test that an interaction whose reply failed only retries the reply."""
+    router = CommandRouter()
+    router.command("ping")(lambda _, __: "pong")
+    context = _make_context()
+    context.interaction_id = "interaction"
+    discord_client = MagicMock()
+    discord_client.send_message_to_channel.side_effect = [Exception("down"), True]
+    store = IdempotencyStore()
+
+    with pytest.raises(Exception, match="down"):
+        router.dispatch(context, discord_client, store)
+
+    assert router.dispatch(context, discord_client, store)
+    assert router.metrics()["ping"]["calls"] == 1
+    discord_client.send_message_to_channel.assert_called_with(
+        {"content": "pong"},
+        "123",
+    )
+
+
+def test_dispatch_interaction_running_elsewhere() -> None:
+    """Test that an interaction claimed by another container is retried later."""
+    router = CommandRouter()
+    router.command("ping")(lambda _, __: "pong")
+    context = _make_context()
+    context.interaction_id = "interaction"
+    store = IdempotencyStore()
+    store.claim("interaction")
+
+    with pytest.raises(RuntimeError):
+        router.dispatch(context, MagicMock(), store)
+
+    assert router.metrics()["ping"]["calls"] == 0
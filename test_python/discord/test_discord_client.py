@@ -1,12 +1,13 @@
 """Tests for the Discord client."""
 
 import json
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 from nacl.signing import SigningKey
 
-from discord.discord_client import DiscordClient
+from discord.discord_client import DiscordClient, _get_verify_key
 
 
 def test_init(client: DiscordClient) -> None:
@@ -25,7 +26,7 @@ def test_send_message_to_channel_success(client: DiscordClient) -> None:
 
     :param client: A Discord client.
     """
-    with patch("requests.post") as mock_post:
+    with patch.object(client._session, "post") as mock_post:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_post.return_value = mock_response
@@ -46,7 +47,7 @@ def test_send_message_to_channel_failure(client: DiscordClient) -> None:
 
     :param client: A Discord client.
     """
-    with patch("requests.post") as mock_post:
+    with patch.object(client._session, "post") as mock_post:
         mock_response = MagicMock()
         mock_response.status_code = 400
         mock_post.return_value = mock_response
@@ -55,6 +56,48 @@ def test_send_message_to_channel_failure(client: DiscordClient) -> None:
             client.send_message_to_channel("Test message", "123456")
 
 
+def test_send_message_to_channel_rate_limited(client: DiscordClient) -> None:
+    """
+    Test that a 429 is waited out and the message is sent again.
+
+    :param client: A Discord client.
+    """
+    rate_limited = MagicMock()
+    rate_limited.status_code = 429
+    rate_limited.headers = {"Retry-After": "0.01"}
+    rate_limited.json.return_value = {"retry_after": 0.01}
+    ok = MagicMock()
+    ok.status_code = 200
+    ok.headers = {}
+
+    with patch.object(
+        client._session,
+        "post",
+        side_effect=[rate_limited, ok],
+    ) as mock_post:
+        assert client.send_message_to_channel({"content": "hi"}, "123456")
+        assert mock_post.call_count == 2
+
+    metrics = client.rate_limiter.metrics()
+    assert metrics["rate_limited_responses"] == 1
+    assert metrics["waits"] == 1
+
+
+def test_record_metrics(client: DiscordClient) -> None:
+    """
+    Test that the rate limiter and user cache counters are sent to the tracer.
+
+    :param client: A Discord client.
+    """
+    with patch("discord.discord_client.tracer") as mock_tracer:
+        client.record_metrics()
+
+    assert [call.args[0] for call in mock_tracer.counters.call_args_list] == [
+        "DiscordRateLimiter",
+        "UserCache",
+    ]
+
+
 def test_get_success_response(client: DiscordClient) -> None:
     """
     Test the get_success_response method for a non-ping scenario.
@@ -66,16 +109,14 @@ def test_get_success_response(client: DiscordClient) -> None:
     expected_response = {
         "isBase64Encoded": False,
         "statusCode": 200,
-        "body": json.dumps(
-            {
-                "type": client.response_types["CHANNEL_MESSAGE_WITH_SOURCE"],
-                "data": {
-                    "content": content,
-                },
+        "body": {
+            "type": client.response_types["CHANNEL_MESSAGE_WITH_SOURCE"],
+            "data": {
+                "content": content,
             },
-        ),
+        },
     }
-    assert response == expected_response
+    assert {**response, "body": json.loads(response["body"])} == expected_response
 
 
 def test_get_success_response_ping(client: DiscordClient) -> None:
@@ -89,10 +130,80 @@ def test_get_success_response_ping(client: DiscordClient) -> None:
     expected_response = {
         "isBase64Encoded": False,
         "statusCode": 200,
-        "body": json.dumps({"type": client.response_types["PONG"]}),
+        "body": {"type": client.response_types["PONG"]},
     }
 
-    assert response == expected_response
+    assert {**response, "body": json.loads(response["body"])} == expected_response
+
+
+def test_constant_bodies_are_reused(client: DiscordClient) -> None:
+    """
+    Test that the constant bodies are serialized once.
+
+    :param client: A Discord client.
+    """
+    first = client.get_success_response(None, ping=True)
+    second = client.get_success_response(None, ping=True)
+
+    assert first == second
+    assert first is not second
+    assert first["body"] is second["body"]
+    assert client.get_deferred_response()["body"] is client._deferred_body
+
+
+def test_get_deferred_response(client: DiscordClient) -> None:
+    """
+    Test that the deferred response acknowledges the interaction.
+
+    :param client: A Discord client.
+    """
+    response = client.get_deferred_response()
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"]) == {"type": 5}
+
+
+def test_edit_original_response(client: DiscordClient) -> None:
+    """
+    Test that the original response is edited through the interaction webhook.
+
+    :param client: A Discord client.
+    """
+    with patch.object(client._session, "patch") as mock_patch:
+        mock_patch.return_value.status_code = 200
+        mock_patch.return_value.headers = {}
+
+        assert client.edit_original_response({"content": "hi"}, "app", "token")
+
+        mock_patch.assert_called_once_with(
+            "https://discord.com/api/webhooks/app/token/messages/@original",
+            json={"content": "hi"},
+        )
+
+    with patch.object(client._session, "patch") as mock_patch:
+        mock_patch.return_value.status_code = 404
+        mock_patch.return_value.headers = {}
+
+        with pytest.raises(Exception):
+            client.edit_original_response({"content": "hi"}, "app", "token")
+
+
+def test_send_followup_message(client: DiscordClient) -> None:
+    """
+    Test that follow-up messages are sent through the interaction webhook.
+
+    :param client: A Discord client.
+    """
+    with patch.object(client._session, "post") as mock_post:
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.headers = {}
+
+        assert client.send_followup_message({"content": "hi"}, "app", "token")
+
+        mock_post.assert_called_once_with(
+            "https://discord.com/api/webhooks/app/token",
+            json={"content": "hi"},
+        )
 
 
 def test_get_unauthorized_response(client: DiscordClient) -> None:
@@ -107,17 +218,15 @@ def test_get_unauthorized_response(client: DiscordClient) -> None:
     expected_response = {
         "isBase64Encoded": False,
         "statusCode": 401,
-        "body": json.dumps(
-            {
-                "type": client.response_types["MESSAGE_NO_SOURCE"],
-                "data": {
-                    "content": f"[UNAUTHORIZED]: {content}",
-                },
+        "body": {
+            "type": client.response_types["MESSAGE_NO_SOURCE"],
+            "data": {
+                "content": f"[UNAUTHORIZED]: {content}",
             },
-        ),
+        },
     }
 
-    assert response == expected_response
+    assert {**response, "body": json.loads(response["body"])} == expected_response
 
 
 def test_get_error_response(client: DiscordClient) -> None:
@@ -132,17 +241,15 @@ def test_get_error_response(client: DiscordClient) -> None:
     expected_response = {
         "isBase64Encoded": False,
         "statusCode": 500,
-        "body": json.dumps(
-            {
-                "type": client.response_types["MESSAGE_NO_SOURCE"],
-                "data": {
-                    "content": f"[ERROR]: {error_message}",
-                },
+        "body": {
+            "type": client.response_types["MESSAGE_NO_SOURCE"],
+            "data": {
+                "content": f"[ERROR]: {error_message}",
             },
-        ),
+        },
     }
 
-    assert response == expected_response
+    assert {**response, "body": json.loads(response["body"])} == expected_response
 
 
 def test_verify_event_signature_failure(
@@ -181,7 +288,7 @@ def test_verify_event_signature_success(client: DiscordClient) -> None:
             "Token": "fake-token",
         },
     ):
-        auth_ts = "1234567890"
+        auth_ts = str(int(time.time()))
         raw_body = '{"test": "payload"}'.encode()
 
         # The message to sign is auth_ts + raw_body.
@@ -199,14 +306,109 @@ def test_verify_event_signature_success(client: DiscordClient) -> None:
         assert client.verify_event_signature(event) is True
 
 
-@patch("requests.get")
-def test_get_user_success(mock_get: MagicMock, client: DiscordClient) -> None:
+def _signed_event(client: DiscordClient, auth_ts: str) -> dict:
+    """
+    Build an event signed with a fresh key that the client trusts.
+
+    :param client: A Discord client.
+    :param auth_ts: Timestamp to sign the event with.
+    :return: A signed Lambda event.
+    """
+    signing_key = SigningKey.generate()
+    client.set_secret(
+        {
+            "PublicKey": signing_key.verify_key.encode().hex(),
+            "Token": "fake-token",
+        },
+    )
+    raw_body = '{"type": 1}'
+    signature = signing_key.sign(f"{auth_ts}{raw_body}".encode()).signature.hex()
+
+    return {
+        "headers": {
+            "x-signature-ed25519": signature,
+            "x-signature-timestamp": auth_ts,
+        },
+        "body": raw_body,
+    }
+
+
+@pytest.mark.parametrize(
+    "event",
+    [
+        {"body": "{}"},
+        {"headers": {}, "body": "{}"},
+        {
+            "headers": {
+                "x-signature-ed25519": "abcd",
+                "x-signature-timestamp": "1234567890",
+            },
+            "body": "{}",
+        },
+        {
+            "headers": {
+                "x-signature-ed25519": "ab" * 64,
+                "x-signature-timestamp": "not-a-number",
+            },
+            "body": "{}",
+        },
+    ],
+)
+def test_pre_validate_event_rejects_junk(client: DiscordClient, event: dict) -> None:
+    """
+    Test that malformed events are rejected before any crypto runs.
+
+    :param client: A Discord client.
+    :param event: A malformed event.
+    """
+    with patch("discord.discord_client._get_verify_key") as mock_get_verify_key:
+        with pytest.raises(ValueError):
+            client.verify_event_signature(event)
+
+        mock_get_verify_key.assert_not_called()
+
+
+def test_verify_event_signature_stale_timestamp(client: DiscordClient) -> None:
+    """
+    Test that a correctly signed but old event is rejected as stale.
+
+    :param client: A Discord client.
+    """
+    event = _signed_event(client, str(int(time.time()) - 3600))
+
+    with pytest.raises(ValueError, match="Stale"):
+        client.verify_event_signature(event)
+
+
+def test_verify_event_signature_replay(client: DiscordClient) -> None:
+    """
+    Test that the same signed event is only accepted once.
+
+    :param client: A Discord client.
+    """
+    event = _signed_event(client, str(int(time.time())))
+
+    assert client.verify_event_signature(event) is True
+
+    with pytest.raises(ValueError, match="Replayed"):
+        client.verify_event_signature(event)
+
+
+def test_verify_key_is_cached() -> None:
+    """Test that a public key is only parsed once."""
+    public_key = SigningKey.generate().verify_key.encode().hex()
+
+    assert _get_verify_key(public_key) is _get_verify_key(public_key)
+
+
+def test_get_user_success(client: DiscordClient) -> None:
     """
     Test the get_user method for a successful response.
 
     :param client: A Discord client.
-    :param mock_get: Mock GET method.
     """
+    mock_get = MagicMock()
+    client._session.get = mock_get  # type: ignore
     mock_response = MagicMock()
     mock_response.status_code = 200
 
@@ -229,14 +431,14 @@ def test_get_user_success(mock_get: MagicMock, client: DiscordClient) -> None:
     )
 
 
-@patch("requests.get")
-def test_get_user_error(mock_get: MagicMock, client: DiscordClient) -> None:
+def test_get_user_error(client: DiscordClient) -> None:
     """
     Test the get_user method for an error response.
 
     :param client: A Discord client.
-    :param mock_get: Mock GET method.
     """
+    mock_get = MagicMock()
+    client._session.get = mock_get  # type: ignore
     mock_response = MagicMock()
     mock_response.status_code = 400
     user_data = {}
@@ -252,6 +454,42 @@ def test_get_user_error(mock_get: MagicMock, client: DiscordClient) -> None:
     )
 
 
+def test_get_user_is_cached(client: DiscordClient) -> None:
+    """
+    Test that get_user only calls Discord once per user.
+
+    :param client: A Discord client.
+    """
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.content = json.dumps(
+        {"username": "TestUser", "discriminator": "0001"},
+    ).encode("utf-8")
+
+    with patch.object(client._session, "get", return_value=mock_response) as mock_get:
+        assert client.get_user("123456") == "TestUser#0001"
+        assert client.get_user("123456") == "TestUser#0001"
+        mock_get.assert_called_once()
+
+
+def test_get_user_unknown_is_cached(client: DiscordClient) -> None:
+    """
+    Test that an unknown user is negatively cached.
+
+    :param client: A Discord client.
+    """
+    mock_response = MagicMock()
+    mock_response.status_code = 404
+    mock_response.content = json.dumps({"message": "Unknown User"}).encode("utf-8")
+
+    with patch.object(client._session, "get", return_value=mock_response) as mock_get:
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                client.get_user("123456")
+
+        mock_get.assert_called_once()
+
+
 def test_get_event_attributes_ping() -> None:
     """Test the get_event_attributes method for a ping event."""
     event = {"body": json.dumps({"type": 1})}
@@ -287,6 +525,41 @@ def test_get_event_attributes_command() -> None:
         "command_issuer": "TestUser#0001",
         "command_issuer_id": "123456789",
         "channel_id": "987654321",
+        "application_id": None,
+        "interaction_token": None,
+        "interaction_id": None,
+        "resolved_users": {},
+        "resolved_members": {},
     }
 
     assert attributes == expected_attributes
+
+
+def test_get_event_attributes_resolved_users() -> None:
+    """Test that users resolved by Discord are forwarded with the attributes."""
+    event_body = {
+        "type": 2,
+        "member": {
+            "user": {
+                "username": "TestUser",
+                "discriminator": "0001",
+                "id": "123456789",
+            },
+        },
+        "channel_id": "987654321",
+        "data": {
+            "name": "raid2",
+            "options": [{"name": "user", "type": 6, "value": "555"}],
+            "resolved": {
+                "users": {
+                    "555": {"id": "555", "username": "Raided", "discriminator": "0"},
+                },
+                "members": {"555": {"nick": "Captain"}},
+            },
+        },
+    }
+
+    attributes = DiscordClient.get_event_attributes({"body": json.dumps(event_body)})
+
+    assert attributes["resolved_users"] == {"555": "Raided#0"}
+    assert attributes["resolved_members"] == {"555": {"nick": "Captain"}}
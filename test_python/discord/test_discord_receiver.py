@@ -5,7 +5,7 @@ import os
 from unittest.mock import patch
 
 from discord.discord_client import DiscordClient
-from discord.discord_receiver import discord_receiver
+from discord.discord_receiver import discord_receiver, get_queue_url
 from test_python.test_utils.mock_api_call import mock_make_api_call
 
 
@@ -66,7 +66,7 @@ def test_discord_receiver_forward_to_sqs(
     lambda_bad_not_ping_discord_event: dict,
 ) -> None:
     """
-    Test that a discord event gets sent to SQS and returns a success.
+    Test that a discord event gets sent to SQS and the response is deferred.
 
     :param client: A Discord client.
     :param lambda_bad_not_ping_discord_event: Lambda discord event.
@@ -81,7 +81,82 @@ def test_discord_receiver_forward_to_sqs(
         ):
             response = discord_receiver(lambda_bad_not_ping_discord_event, {})
             assert response["statusCode"] == 200
-            assert json.loads(response["body"]) == {
-                "data": {"content": "Working on it..."},
-                "type": 4,
-            }
+            assert json.loads(response["body"]) == {"type": 5}
+
+
+def test_get_queue_url() -> None:
+    """Test that commands are routed to the queue of their lane."""
+    with patch.dict(
+        "os.environ",
+        {
+            "SQS_QUEUE_URL": "default_queue",
+            "COMMAND_LANES": json.dumps({"raid2": "urgent", "update2": "missing"}),
+            "LANE_QUEUE_URLS": json.dumps({"urgent": "urgent_queue"}),
+        },
+    ):
+        assert get_queue_url("raid2") == "urgent_queue"
+        assert get_queue_url("update2") == "default_queue"
+        assert get_queue_url("registered_users2") == "default_queue"
+        assert get_queue_url(None) == "default_queue"
+
+
+def test_discord_receiver_forward_to_lane(
+    client: DiscordClient,
+    lambda_bad_not_ping_discord_event: dict,
+) -> None:
+    """
+    Test that a discord event is sent to the queue of its priority lane.
+
+    :param client: A Discord client.
+    :param lambda_bad_not_ping_discord_event: Lambda discord event.
+    """
+    with (
+        patch.dict(
+            "os.environ",
+            {
+                "BOT_SECRET_NAME": "test_secret",
+                "SQS_QUEUE_URL": "test_queue",
+                "COMMAND_LANES": json.dumps({"update2": "interactive"}),
+                "LANE_QUEUE_URLS": json.dumps({"interactive": "interactive_queue"}),
+            },
+        ),
+        patch("botocore.client.BaseClient._make_api_call", new=mock_make_api_call),
+        patch(
+            "discord.discord_client.DiscordClient.verify_event_signature",
+            new=mock_verify_event_signature,
+        ),
+        patch("utils.sqs_client.SqsClient.send_sqs_message") as mock_send,
+    ):
+        response = discord_receiver(lambda_bad_not_ping_discord_event, {})
+
+    assert response["statusCode"] == 200
+    assert mock_send.call_args.args[0] == "interactive_queue"
+
+
+def test_discord_receiver_inline(
+    client: DiscordClient,
+    lambda_bad_not_ping_discord_event: dict,
+) -> None:
+    """
+    Test that a command run inline is answered without going through SQS.
+
+    :param client: A Discord client.
+    :param lambda_bad_not_ping_discord_event: Lambda discord event.
+    """
+    with (
+        patch.dict(
+            "os.environ",
+            {"BOT_SECRET_NAME": "test_secret", "SQS_QUEUE_URL": "test_queue"},
+        ),
+        patch("botocore.client.BaseClient._make_api_call", new=mock_make_api_call),
+        patch(
+            "discord.discord_client.DiscordClient.verify_event_signature",
+            new=mock_verify_event_signature,
+        ),
+        patch("discord.discord_receiver.run_inline", return_value="Done!"),
+        patch("utils.sqs_client.SqsClient.send_sqs_message") as mock_send,
+    ):
+        response = discord_receiver(lambda_bad_not_ping_discord_event, {})
+
+    assert json.loads(response["body"])["data"] == {"content": "Done!"}
+    mock_send.assert_not_called()
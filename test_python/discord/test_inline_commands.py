@@ -0,0 +1,87 @@
+"""Tests for the inline commands."""
+
+import time
+from typing import Generator
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from discord.inline_commands import get_inline_commands, run_inline
+
+
+def _make_attributes(command: str) -> dict:
+    """
+    Build the attributes of a Discord event.
+
+    :param command: Name of the command.
+    :return: The event attributes.
+    """
+    return {
+        "command": command,
+        "options": [],
+        "command_issuer": "issuer#0001",
+        "channel_id": "123",
+    }
+
+
+@pytest.fixture(autouse=True)
+def mock_env() -> Generator:
+    """Enable taylor inline for all tests."""
+    with patch.dict(
+        "os.environ",
+        {"INLINE_COMMANDS": "taylor, point_balance, unknown"},
+    ):
+        yield
+
+
+def test_get_inline_commands() -> None:
+    """Test that only CPU-only commands can be enabled."""
+    assert get_inline_commands() == {"taylor"}
+
+
+def test_run_inline() -> None:
+    """Test that an enabled command returns its reply."""
+    reply = run_inline(_make_attributes("taylor"), MagicMock())
+
+    assert reply is not None and reply.startswith(":notes:")
+
+
+def test_run_inline_not_enabled() -> None:
+    """Test that commands not enabled are left to the queue."""
+    with patch("processing_lambdas.simp_bot.get_point_balance") as mock_balance:
+        assert run_inline(_make_attributes("point_balance"), MagicMock()) is None
+
+        mock_balance.assert_not_called()
+
+
+def _slow_song() -> str:
+    """
+    Pick a song slowly.
+
+    :return: A reply.
+    """
+    time.sleep(0.2)
+    return "song"
+
+
+def test_run_inline_out_of_budget() -> None:
+    """Test that a command that runs out of budget is left to the queue."""
+    with patch("processing_lambdas.simp_bot.random_song") as mock_song:
+        mock_song.side_effect = _slow_song
+
+        assert (
+            run_inline(
+                _make_attributes("taylor"),
+                MagicMock(),
+                budget_seconds=0.01,
+            )
+            is None
+        )
+
+
+def test_run_inline_error() -> None:
+    """Test that a command that fails is left to the queue."""
+    with patch("processing_lambdas.simp_bot.random_song") as mock_song:
+        mock_song.side_effect = RuntimeError("boom")
+
+        assert run_inline(_make_attributes("taylor"), MagicMock()) is None
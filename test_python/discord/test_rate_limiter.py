@@ -0,0 +1,181 @@
+"""Tests for the Discord rate limiter."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from discord.rate_limiter import DiscordRateLimiter, RateLimitedError
+
+ROUTE = "POST /channels/{channel_id}/messages"
+
+
+class FakeClock:
+    """Clock that only moves when the rate limiter sleeps."""
+
+    def __init__(self) -> None:
+        """Start the clock at 0."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """
+        Get the current time.
+
+        :return: The current time.
+        """
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Move the clock forward.
+
+        :param seconds: Seconds to move.
+        """
+        self.now += seconds
+
+
+def _response(status_code: int, headers: dict, body: dict | None = None) -> MagicMock:
+    """
+    Build a fake Discord response.
+
+    :param status_code: HTTP status code.
+    :param headers: Response headers.
+    :param body: JSON body of the response.
+    :return: A fake response.
+    """
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers
+    response.json.return_value = body or {}
+    return response
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """
+    Create a fake clock.
+
+    :return: A fake clock.
+    """
+    return FakeClock()
+
+
+@pytest.fixture
+def limiter(clock: FakeClock) -> DiscordRateLimiter:
+    """
+    Create a rate limiter that uses the fake clock.
+
+    :param clock: A fake clock.
+    :return: A rate limiter.
+    """
+    return DiscordRateLimiter(clock=clock, sleep=clock.sleep)
+
+
+def test_unknown_route_does_not_wait(limiter: DiscordRateLimiter) -> None:
+    """
+    Test that routes without state are sent right away.
+
+    :param limiter: A rate limiter.
+    """
+    assert limiter.acquire(ROUTE, "1") == 0.0
+    assert limiter.metrics()["waits"] == 0
+
+
+def test_exhausted_bucket_waits_for_reset(
+    limiter: DiscordRateLimiter,
+    clock: FakeClock,
+) -> None:
+    """
+    Test that an exhausted bucket waits until it resets.
+
+    :param limiter: A rate limiter.
+    :param clock: A fake clock.
+    """
+    limiter.update(
+        ROUTE,
+        _response(
+            200,
+            {
+                "X-RateLimit-Bucket": "abc",
+                "X-RateLimit-Limit": "5",
+                "X-RateLimit-Remaining": "0",
+                "X-RateLimit-Reset-After": "1.5",
+            },
+        ),
+        "1",
+    )
+
+    # Other channels are tracked separately
+    assert limiter.acquire(ROUTE, "2") == 0.0
+
+    assert limiter.acquire(ROUTE, "1") == 1.5
+    assert clock.now == 1.5
+    assert limiter.metrics() == {
+        "wait_seconds_total": 1.5,
+        "waits": 1,
+        "rate_limited_responses": 0,
+        "buckets": 1,
+    }
+
+    # The new window has 5 requests
+    for _ in range(4):
+        assert limiter.acquire(ROUTE, "1") == 0.0
+
+
+def test_reset_buckets_are_evicted(
+    limiter: DiscordRateLimiter,
+    clock: FakeClock,
+) -> None:
+    """
+    Test that buckets of one-off major parameters don't pile up.
+
+    :param limiter: A rate limiter.
+    :param clock: A fake clock.
+    """
+    route = "PATCH /webhooks/{application_id}/{interaction_token}/messages/@original"
+
+    for token in range(1000):
+        limiter.update(
+            route,
+            _response(
+                200,
+                {
+                    "X-RateLimit-Bucket": "webhook",
+                    "X-RateLimit-Limit": "5",
+                    "X-RateLimit-Remaining": "4",
+                    "X-RateLimit-Reset-After": "1",
+                },
+            ),
+            str(token),
+        )
+        clock.sleep(0.5)
+
+    assert limiter.metrics()["buckets"] <= 2
+
+
+def test_global_rate_limit(limiter: DiscordRateLimiter) -> None:
+    """
+    Test that a global 429 pauses every route.
+
+    :param limiter: A rate limiter.
+    """
+    retry_after = limiter.update(
+        ROUTE,
+        _response(429, {"X-RateLimit-Global": "true"}, {"retry_after": 0.5}),
+        "1",
+    )
+
+    assert retry_after == 0.5
+    assert limiter.acquire("GET /users/{user_id}") == 0.5
+    assert limiter.metrics()["rate_limited_responses"] == 1
+
+
+def test_wait_over_budget_raises(limiter: DiscordRateLimiter) -> None:
+    """
+    Test that a wait longer than max_wait_seconds fails fast.
+
+    :param limiter: A rate limiter.
+    """
+    limiter.update(ROUTE, _response(429, {"Retry-After": "30"}), "1")
+
+    with pytest.raises(RateLimitedError):
+        limiter.acquire(ROUTE, "1")
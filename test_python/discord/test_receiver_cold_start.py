@@ -0,0 +1,229 @@
+"""Cold start checks of the receiver."""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterator, Self
+
+import pytest
+from nacl.signing import SigningKey
+
+SRC_PATH = Path(__file__).parents[2] / "src"
+
+# Importing the receiver used to take ~170ms because of boto3 and requests,
+# with lazy imports it takes ~10ms
+RECEIVER_IMPORT_BUDGET_US = 100_000
+
+# Modules the receiver must not load before it needs them
+HEAVY_MODULES = {"boto3", "botocore", "requests", "urllib3", "nacl"}
+
+LOCALHOST = "127.0.0.1"
+
+# The events are signed by the test, so the script only imports the receiver
+PING_SCRIPT = """
+import json
+import os
+import sys
+
+from discord.discord_receiver import discord_receiver
+
+cold_event, warm_event = json.loads(os.environ["PING_EVENTS"])
+cold = discord_receiver(cold_event, {})
+cold_modules = set(sys.modules)
+warm = discord_receiver(warm_event, {})
+
+print(
+    json.dumps(
+        {
+            "responses": [cold, warm],
+            "modules": sorted(cold_modules),
+            "warm_modules": sorted(set(sys.modules) - cold_modules),
+        },
+    ),
+)
+"""
+
+
+class _SecretsManagerHandler(BaseHTTPRequestHandler):
+    """Answer GetSecretValue with the secret of the server."""
+
+    def do_POST(self: Self) -> None:  # noqa: N802
+        """Send the secret back."""
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.calls.append(self.headers["X-Amz-Target"])  # type: ignore
+        body = json.dumps(
+            {
+                "Name": "bot_secret",
+                "SecretString": json.dumps(self.server.secret),  # type: ignore
+            },
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-amz-json-1.1")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self: Self, *_: Any) -> None:
+        """
+        Keep the test output clean.
+
+        :param _: Unused log arguments.
+        """
+
+
+@pytest.fixture
+def secrets_manager() -> Iterator[ThreadingHTTPServer]:
+    """
+    Serve the Secrets Manager API on a local port.
+
+    :yield: The server, with the secret it serves and the calls it got.
+    """
+    server = ThreadingHTTPServer((LOCALHOST, 0), _SecretsManagerHandler)
+    server.calls = []  # type: ignore
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        yield server
+
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _run_python(
+    *args: str,
+    env: dict[str, str] | None = None,
+) -> subprocess.CompletedProcess:
+    """
+    Run a fresh interpreter with the sources in the path.
+
+    :param args: Arguments for the interpreter.
+    :param env: Extra environment variables.
+    :return: The finished process.
+    """
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(SRC_PATH),
+        "BOT_SECRET_NAME": "bot_secret",
+        **(env or {}),
+    }
+
+    return subprocess.run(
+        [sys.executable, *args],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """
+    Import a module in a fresh interpreter and parse its -X importtime report.
+
+    :param module: Module to import.
+    :return: Cumulative microseconds by imported module.
+    """
+    process = _run_python("-X", "importtime", "-c", f"import {module}")
+    times = {}
+
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        _, cumulative, name = line.split("|")
+
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+
+    return times
+
+
+def _top_level(modules: set[str] | list[str]) -> set[str]:
+    """
+    Get the top level packages of some modules.
+
+    :param modules: Module names.
+    :return: Names of the top level packages.
+    """
+    return {module.split(".")[0] for module in modules}
+
+
+def test_receiver_import_is_light() -> None:
+    """Test that importing the receiver doesn't load the heavy modules."""
+    times = _import_times("discord.discord_receiver")
+
+    assert not _top_level(times) & HEAVY_MODULES
+
+
+@pytest.mark.benchmark
+def test_receiver_import_budget() -> None:
+    """Test that importing the receiver stays within budget."""
+    times = _import_times("discord.discord_receiver")
+
+    assert times["discord.discord_receiver"] <= RECEIVER_IMPORT_BUDGET_US
+
+
+def test_cold_ping_skips_discord_http_session(
+    secrets_manager: ThreadingHTTPServer,
+) -> None:
+    """
+    Test that a cold ping fetches the secret and only loads what that needs.
+
+    The secret comes from a local Secrets Manager endpoint, so the ping goes
+    through the same boto3 client as in Lambda. The Discord HTTP session is
+    never created for a ping, and a warm ping loads nothing else.
+
+    :param secrets_manager: Local Secrets Manager endpoint.
+    """
+    signing_key = SigningKey.generate()
+    secrets_manager.secret = {  # type: ignore
+        "Token": "token",
+        "PublicKey": signing_key.verify_key.encode().hex(),
+    }
+    timestamp = str(int(time.time()))
+    events = []
+
+    for ping_id in ("cold", "warm"):
+        body = json.dumps({"type": 1, "id": ping_id})
+        signature = signing_key.sign(f"{timestamp}{body}".encode()).signature
+        events.append(
+            {
+                "headers": {
+                    "x-signature-ed25519": signature.hex(),
+                    "x-signature-timestamp": timestamp,
+                },
+                "body": body,
+            },
+        )
+
+    port = secrets_manager.server_address[1]
+
+    process = _run_python(
+        "-c",
+        PING_SCRIPT,
+        env={
+            "PING_EVENTS": json.dumps(events),
+            "AWS_ENDPOINT_URL_SECRETS_MANAGER": f"http://{LOCALHOST}:{port}",
+            "AWS_DEFAULT_REGION": "us-west-2",
+            "AWS_ACCESS_KEY_ID": "testing",
+            "AWS_SECRET_ACCESS_KEY": "testing",
+            "NO_PROXY": LOCALHOST,
+        },
+    )
+    result = json.loads(process.stdout.splitlines()[-1])
+
+    assert [json.loads(response["body"]) for response in result["responses"]] == [
+        {"type": 1},
+        {"type": 1},
+    ]
+    assert secrets_manager.calls == ["secretsmanager.GetSecretValue"]  # type: ignore
+    assert {"nacl", "boto3", "botocore"} <= _top_level(result["modules"])
+    assert "requests" not in _top_level(result["modules"])
+    assert result["warm_modules"] == []
@@ -0,0 +1,78 @@
+"""Ping throughput benchmark of the receiver."""
+
+import json
+import time
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from nacl.signing import SigningKey
+
+from discord.discord_receiver import discord_receiver
+from utils.client_registry import client_registry
+
+PINGS = 500
+
+# Verifying the signature is most of the work, libsodium does it in ~50us
+PING_THROUGHPUT_FLOOR = 1000
+
+
+@pytest.mark.benchmark
+def test_ping_throughput(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that a warm receiver answers signed pings above the throughput floor.
+
+    :param monkeypatch: Pytest monkeypatch fixture.
+    """
+    monkeypatch.setenv("BOT_SECRET_NAME", "bot_secret")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-west-2")
+    signing_key = SigningKey.generate()
+    secret = {"Token": "token", "PublicKey": signing_key.verify_key.encode().hex()}
+
+    def get_secret_value(_: Any, operation_name: str, __: dict) -> dict:
+        """
+        Answer GetSecretValue, replaces BaseClient._make_api_call.
+
+        :param _: The boto3 client making the call.
+        :param operation_name: Name of the API call.
+        :param __: Parameters of the request.
+        :return: The secret.
+        """
+        assert operation_name == "GetSecretValue"
+        return {"SecretString": json.dumps(secret)}
+
+    timestamp = str(int(time.time()))
+    events = []
+
+    for ping_id in range(PINGS):
+        body = json.dumps({"type": 1, "id": str(ping_id)})
+        signature = signing_key.sign(f"{timestamp}{body}".encode()).signature
+        events.append(
+            {
+                "headers": {
+                    "x-signature-ed25519": signature.hex(),
+                    "x-signature-timestamp": timestamp,
+                },
+                "body": body,
+            },
+        )
+
+    client_registry.reset()
+
+    try:
+        with patch(
+            "botocore.client.BaseClient._make_api_call",
+            new=get_secret_value,
+        ):
+            # The first ping fetches the secret, the rest are timed warm
+            assert discord_receiver(events.pop(), {})["statusCode"] == 200
+
+            start = time.perf_counter()
+            responses = [discord_receiver(event, {}) for event in events]
+            elapsed = time.perf_counter() - start
+
+    finally:
+        client_registry.reset()
+
+    assert all(response["statusCode"] == 200 for response in responses)
+    assert len(responses) / elapsed >= PING_THROUGHPUT_FLOOR
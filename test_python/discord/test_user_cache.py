@@ -0,0 +1,61 @@
+"""Tests for the Discord user cache."""
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from discord.user_cache import UserCache
+
+
+def test_memory_tier() -> None:
+    """Test that cached users are served from memory."""
+    user_cache = UserCache()
+
+    assert user_cache.get("1") is None
+    user_cache.set("1", "TestUser#0001")
+    assert user_cache.get("1") == "TestUser#0001"
+    assert user_cache.metrics() == {
+        "hits": 1,
+        "misses": 1,
+        "size": 1,
+        "shared_hits": 0,
+    }
+
+
+def test_unknown_user() -> None:
+    """Test that unknown users raise without calling Discord again."""
+    user_cache = UserCache()
+    user_cache.set_unknown("1")
+
+    with pytest.raises(RuntimeError):
+        user_cache.get("1")
+
+
+def test_shared_tier() -> None:
+    """Test that the DDB tier is read on memory misses and written on sets."""
+    ddb_client = MagicMock()
+    ddb_client.get_item.return_value = {
+        "user_id": {"S": "1"},
+        "user_name": {"S": "TestUser#0001"},
+        "expires_at": {"N": str(int(time.time()) + 60)},
+    }
+    user_cache = UserCache(ddb_client=ddb_client, table_name="user_cache")
+
+    assert user_cache.get("1") == "TestUser#0001"
+    assert user_cache.get("1") == "TestUser#0001"
+    ddb_client.get_item.assert_called_once_with("user_cache", "user_id", "1")
+    assert user_cache.metrics()["shared_hits"] == 1
+
+    user_cache.set("2", "Other#0002")
+    _, data = ddb_client.put_item.call_args[0]
+    assert data["user_name"] == {"S": "Other#0002"}
+
+
+def test_shared_tier_failure_is_a_miss() -> None:
+    """Test that a failing DDB tier does not break lookups."""
+    ddb_client = MagicMock()
+    ddb_client.get_item.side_effect = RuntimeError("DynamoDB is down!")
+    user_cache = UserCache(ddb_client=ddb_client, table_name="user_cache")
+
+    assert user_cache.get("1") is None
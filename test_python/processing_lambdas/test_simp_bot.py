@@ -6,7 +6,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from processing_lambdas.simp_bot import simp_bot
+from processing_lambdas.simp_bot import simp_bot, simp_bot_rebuild_point_balances
 
 
 def _make_sqs_record(
@@ -14,6 +14,7 @@ def _make_sqs_record(
     options: list,
     command_issuer: str,
     channel_id: str,
+    resolved_users: dict | None = None,
 ) -> dict:
     """
     Build an SQS record containing a single command.
@@ -22,6 +23,7 @@ def _make_sqs_record(
     :param options: The command options.
     :param command_issuer: The user who issued the command.
     :param channel_id: The Discord channel to send responses to.
+    :param resolved_users: Users resolved by Discord in the interaction.
     :return: An SQS record dict.
     """
     return {
@@ -31,8 +33,10 @@ def _make_sqs_record(
                 "options": options,
                 "command_issuer": command_issuer,
                 "channel_id": channel_id,
+                "resolved_users": resolved_users or {},
             },
         ),
+        "messageId": "dummy_message_id",
         "receiptHandle": "dummy_receipt_handle",
     }
 
@@ -69,28 +73,38 @@ def test_simp_bot_points_happy_path(command: str, options: list) -> None:
     }
 
     with (
-        patch("processing_lambdas.simp_bot.DiscordClient") as mock_discord_client_class,
-        patch("processing_lambdas.simp_bot.SqsClient") as mock_sqs_client_class,
+        patch(
+            "processing_lambdas.simp_bot.client_registry",
+        ) as mock_client_registry,
         patch("processing_lambdas.simp_bot.add_points") as mock_add_points,
     ):
         mock_discord_client = MagicMock()
-        mock_sqs_client = MagicMock()
-        mock_discord_client_class.return_value = mock_discord_client
-        mock_sqs_client_class.return_value = mock_sqs_client
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
 
         mock_discord_client.get_user.return_value = "someUser#9999"
-        simp_bot(event, {})
+        response = simp_bot(event, {})
 
         # Check that we used the correct queue handle
-        mock_sqs_client.delete_sqs_message.assert_called_once_with(
-            "test_queue",
-            "dummy_receipt_handle",
-        )
+        assert response == {"batchItemFailures": []}
         # For remove_points, we pass the points negative
+        # and don't let the balance go below zero
         if command == "remove_points":
-            mock_add_points.assert_called_once_with("someUser#9999", -50, "issuer#1111")
+            mock_add_points.assert_called_once_with(
+                "someUser#9999",
+                -50,
+                "issuer#1111",
+                transaction_id=None,
+                non_negative=True,
+                min_interval_seconds=0.0,
+            )
         else:
-            mock_add_points.assert_called_once_with("someUser#9999", 50, "issuer#1111")
+            mock_add_points.assert_called_once_with(
+                "someUser#9999",
+                50,
+                "issuer#1111",
+                transaction_id=None,
+                min_interval_seconds=0.0,
+            )
 
         # Check we posted a success message
         mock_discord_client.send_message_to_channel.assert_called_once_with(
@@ -99,6 +113,39 @@ def test_simp_bot_points_happy_path(command: str, options: list) -> None:
         )
 
 
+def test_simp_bot_uses_resolved_users() -> None:
+    """Test that users resolved in the interaction skip the Discord API."""
+    event = {
+        "Records": [
+            _make_sqs_record(
+                command="add_points",
+                options=[
+                    {"name": "user", "value": "123456"},
+                    {"name": "points", "value": 5},
+                ],
+                command_issuer="issuer#1111",
+                channel_id="987654",
+                resolved_users={"123456": "resolvedUser#0"},
+            ),
+        ],
+    }
+
+    with (
+        patch(
+            "processing_lambdas.simp_bot.client_registry",
+        ) as mock_client_registry,
+        patch("processing_lambdas.simp_bot.add_points") as mock_add_points,
+    ):
+        mock_discord_client = MagicMock()
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
+
+        simp_bot(event, {})
+
+        mock_discord_client.get_user.assert_not_called()
+        mock_add_points.assert_called_once()
+        assert mock_add_points.call_args.args == ("resolvedUser#0", 5, "issuer#1111")
+
+
 def test_simp_bot_point_balance_happy_path() -> None:
     """Test that simp_bot handles point_balance successfully."""
     event = {
@@ -115,26 +162,23 @@ def test_simp_bot_point_balance_happy_path() -> None:
     mock_balance = [{"discord_user": "Alice#1234", "total_points": 100}]
 
     with (
-        patch("processing_lambdas.simp_bot.DiscordClient") as mock_discord_client_class,
-        patch("processing_lambdas.simp_bot.SqsClient") as mock_sqs_client_class,
+        patch(
+            "processing_lambdas.simp_bot.client_registry",
+        ) as mock_client_registry,
         patch("processing_lambdas.simp_bot.get_point_balance") as mock_get_balance,
     ):
         mock_discord_client = MagicMock()
-        mock_sqs_client = MagicMock()
-        mock_discord_client_class.return_value = mock_discord_client
-        mock_sqs_client_class.return_value = mock_sqs_client
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
 
         mock_get_balance.return_value = mock_balance
-        simp_bot(event, {})
+        response = simp_bot(event, {})
 
         mock_discord_client.send_message_to_channel.assert_called_once()
         sent_message_args, _ = mock_discord_client.send_message_to_channel.call_args
         assert sent_message_args[0]["content"].startswith("```")
+        mock_discord_client.record_metrics.assert_called_once_with()
 
-        mock_sqs_client.delete_sqs_message.assert_called_once_with(
-            "test_queue",
-            "dummy_receipt_handle",
-        )
+        assert response == {"batchItemFailures": []}
 
 
 def test_simp_bot_add_points_exception() -> None:
@@ -154,29 +198,64 @@ def test_simp_bot_add_points_exception() -> None:
     }
 
     with (
-        patch("processing_lambdas.simp_bot.DiscordClient") as mock_discord_client_class,
-        patch("processing_lambdas.simp_bot.SqsClient") as mock_sqs_client_class,
+        patch(
+            "processing_lambdas.simp_bot.client_registry",
+        ) as mock_client_registry,
         patch("processing_lambdas.simp_bot.add_points") as mock_add_points,
     ):
         mock_discord_client = MagicMock()
-        mock_sqs_client = MagicMock()
-        mock_discord_client_class.return_value = mock_discord_client
-        mock_sqs_client_class.return_value = mock_sqs_client
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
 
         mock_discord_client.get_user.return_value = "issuer#9999"
         mock_add_points.side_effect = ValueError(
             "You can't do transactions for yourself. Don't be a dick.",
         )
 
-        simp_bot(event, {})
+        response = simp_bot(event, {})
 
         mock_discord_client.send_message_to_channel.assert_called_once()
         args, _ = mock_discord_client.send_message_to_channel.call_args
         assert "You can't do transactions for yourself" in args[0]["content"]
 
-        mock_sqs_client.delete_sqs_message.assert_called_once_with(
-            "test_queue",
-            "dummy_receipt_handle",
+        assert response == {"batchItemFailures": []}
+
+
+@pytest.mark.parametrize("command", ["add_points", "remove_points"])
+def test_simp_bot_points_must_be_positive(command: str) -> None:
+    """
+    Test that add_points and remove_points refuse points that aren't positive.
+
+    :param command: The command name to test.
+    """
+    event = {
+        "Records": [
+            _make_sqs_record(
+                command=command,
+                options=[
+                    {"name": "user", "value": "123456"},
+                    {"name": "points", "value": -50},
+                ],
+                command_issuer="issuer#1111",
+                channel_id="987654",
+            ),
+        ],
+    }
+
+    with (
+        patch(
+            "processing_lambdas.simp_bot.client_registry",
+        ) as mock_client_registry,
+        patch("processing_lambdas.simp_bot.add_points") as mock_add_points,
+    ):
+        mock_discord_client = MagicMock()
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
+
+        simp_bot(event, {})
+
+        mock_add_points.assert_not_called()
+        mock_discord_client.send_message_to_channel.assert_called_once_with(
+            {"content": "Points must be a positive number."},
+            "987654",
         )
 
 
@@ -194,21 +273,17 @@ def test_simp_bot_unknown_command() -> None:
     }
 
     with (
-        patch("processing_lambdas.simp_bot.DiscordClient") as mock_discord_client_class,
-        patch("processing_lambdas.simp_bot.SqsClient") as mock_sqs_client_class,
+        patch(
+            "processing_lambdas.simp_bot.client_registry",
+        ) as mock_client_registry,
     ):
         mock_discord_client = MagicMock()
-        mock_sqs_client = MagicMock()
-        mock_discord_client_class.return_value = mock_discord_client
-        mock_sqs_client_class.return_value = mock_sqs_client
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
 
-        simp_bot(event, {})
+        response = simp_bot(event, {})
 
-        # We only expect the message to be deleted, no calls to add_points or get_point_balance.
-        mock_sqs_client.delete_sqs_message.assert_called_once_with(
-            "test_queue",
-            "dummy_receipt_handle",
-        )
+        # We only expect the message to succeed, no calls to add_points or get_point_balance.
+        assert response == {"batchItemFailures": []}
         # Because there's no matching if/elif branch, we do NOT call send_message_to_channel.
 
 
@@ -240,31 +315,27 @@ def test_simp_bot_remove_points_exception() -> None:
     }
 
     with (
-        patch("processing_lambdas.simp_bot.DiscordClient") as mock_discord_client_class,
-        patch("processing_lambdas.simp_bot.SqsClient") as mock_sqs_client_class,
+        patch(
+            "processing_lambdas.simp_bot.client_registry",
+        ) as mock_client_registry,
         patch("processing_lambdas.simp_bot.add_points") as mock_add_points,
     ):
         mock_discord_client = MagicMock()
-        mock_sqs_client = MagicMock()
-        mock_discord_client_class.return_value = mock_discord_client
-        mock_sqs_client_class.return_value = mock_sqs_client
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
 
         mock_discord_client.get_user.return_value = "someUser#9999"
         mock_add_points.side_effect = RuntimeError(
             "Some random error during remove_points.",
         )
 
-        simp_bot(event, {})
+        response = simp_bot(event, {})
 
         # We expect an error message to be posted
         mock_discord_client.send_message_to_channel.assert_called_once()
         args, _ = mock_discord_client.send_message_to_channel.call_args
         assert "Some random error during remove_points." in args[0]["content"]
 
-        mock_sqs_client.delete_sqs_message.assert_called_once_with(
-            "test_queue",
-            "dummy_receipt_handle",
-        )
+        assert response == {"batchItemFailures": []}
 
 
 def test_simp_bot_point_balance_exception() -> None:
@@ -281,26 +352,69 @@ def test_simp_bot_point_balance_exception() -> None:
     }
 
     with (
-        patch("processing_lambdas.simp_bot.DiscordClient") as mock_discord_client_class,
-        patch("processing_lambdas.simp_bot.SqsClient") as mock_sqs_client_class,
+        patch(
+            "processing_lambdas.simp_bot.client_registry",
+        ) as mock_client_registry,
         patch("processing_lambdas.simp_bot.get_point_balance") as mock_get_balance,
     ):
         mock_discord_client = MagicMock()
-        mock_sqs_client = MagicMock()
-        mock_discord_client_class.return_value = mock_discord_client
-        mock_sqs_client_class.return_value = mock_sqs_client
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
 
         mock_get_balance.side_effect = RuntimeError(
             "Something went wrong fetching balances.",
         )
 
-        simp_bot(event, {})
+        response = simp_bot(event, {})
 
         mock_discord_client.send_message_to_channel.assert_called_once()
         args, _ = mock_discord_client.send_message_to_channel.call_args
         assert "Something went wrong fetching balances." in args[0]["content"]
 
-        mock_sqs_client.delete_sqs_message.assert_called_once_with(
-            "test_queue",
-            "dummy_receipt_handle",
+        assert response == {"batchItemFailures": []}
+
+
+def test_simp_bot_reports_failed_records() -> None:
+    """Test that records failing outside the command are reported back to SQS."""
+    event = {
+        "Records": [
+            _make_sqs_record(
+                command="point_balance",
+                options=[],
+                command_issuer="issuer#7777",
+                channel_id="channelXYZ",
+            ),
+        ],
+    }
+
+    with (
+        patch(
+            "processing_lambdas.simp_bot.client_registry",
+        ) as mock_client_registry,
+        patch("processing_lambdas.simp_bot.get_point_balance"),
+    ):
+        mock_discord_client = MagicMock()
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
+        mock_discord_client.send_message_to_channel.side_effect = RuntimeError(
+            "Discord is down!",
         )
+
+        response = simp_bot(event, {})
+
+        assert response == {
+            "batchItemFailures": [
+                {"itemIdentifier": "dummy_message_id"},
+            ],
+        }
+
+
+def test_simp_bot_rebuild_point_balances() -> None:
+    """Test that the rebuild handler returns the balances it corrected."""
+    corrected = [{"discord_user": "user_1", "total_points": 3}]
+
+    with patch(
+        "processing_lambdas.simp_bot.rebuild_point_balances",
+        return_value=corrected,
+    ) as mock_rebuild:
+        assert simp_bot_rebuild_point_balances({}, {}) == {"corrected": corrected}
+
+        mock_rebuild.assert_called_once_with()
@@ -7,6 +7,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from processing_lambdas.watchdog_2 import watchdog2
+from utils.watchdog_2.raid_alert_dedup import RaidAlertDedup
 
 
 def _make_sqs_record(
@@ -14,6 +15,8 @@ def _make_sqs_record(
     options: list,
     command_issuer: str,
     channel_id: str,
+    resolved_users: dict | None = None,
+    message_id: str = "dummy_message_id",
 ) -> dict:
     """
     Build an SQS record containing a single command.
@@ -22,6 +25,8 @@ def _make_sqs_record(
     :param options: Command options.
     :param command_issuer: The user who issued the command.
     :param channel_id: The Discord channel to send responses to.
+    :param resolved_users: Users resolved by Discord in the interaction.
+    :param message_id: ID of the SQS message.
     :return: An SQS record dict.
     """
     return {
@@ -31,8 +36,10 @@ def _make_sqs_record(
                 "options": options,
                 "command_issuer": command_issuer,
                 "channel_id": channel_id,
+                "resolved_users": resolved_users or {},
             },
         ),
+        "messageId": message_id,
         "receiptHandle": "dummy_receipt_handle",
     }
 
@@ -51,16 +58,15 @@ def test_watchdog2_update2_happy_path() -> None:
     }
 
     with (
-        patch("processing_lambdas.watchdog_2.DiscordClient") as mock_discord_class,
-        patch("processing_lambdas.watchdog_2.SqsClient") as mock_sqs_class,
+        patch(
+            "processing_lambdas.watchdog_2.client_registry",
+        ) as mock_client_registry,
         patch("processing_lambdas.watchdog_2.update_contact_info") as mock_update,
     ):
         mock_discord_client = MagicMock()
-        mock_sqs_client = MagicMock()
-        mock_discord_class.return_value = mock_discord_client
-        mock_sqs_class.return_value = mock_sqs_client
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
 
-        watchdog2(event, {})
+        response = watchdog2(event, {})
 
         mock_update.assert_called_once_with(
             "issuer#0001",
@@ -71,10 +77,7 @@ def test_watchdog2_update2_happy_path() -> None:
             {"content": "Info updated!"},
             "chan123",
         )
-        mock_sqs_client.delete_sqs_message.assert_called_once_with(
-            "test_queue",
-            "dummy_receipt_handle",
-        )
+        assert response == {"batchItemFailures": []}
 
 
 def test_watchdog2_update2_invalid_number() -> None:
@@ -91,17 +94,16 @@ def test_watchdog2_update2_invalid_number() -> None:
     }
 
     with (
-        patch("processing_lambdas.watchdog_2.DiscordClient") as mock_discord_class,
-        patch("processing_lambdas.watchdog_2.SqsClient") as mock_sqs_class,
+        patch(
+            "processing_lambdas.watchdog_2.client_registry",
+        ) as mock_client_registry,
         patch("processing_lambdas.watchdog_2.update_contact_info") as mock_update,
     ):
         mock_discord_client = MagicMock()
-        mock_sqs_client = MagicMock()
-        mock_discord_class.return_value = mock_discord_client
-        mock_sqs_class.return_value = mock_sqs_client
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
 
         mock_update.side_effect = ValueError("Invalid phone number!")
-        watchdog2(event, {})
+        response = watchdog2(event, {})
 
         mock_update.assert_called_once_with(
             "issuer#0001",
@@ -111,10 +113,7 @@ def test_watchdog2_update2_invalid_number() -> None:
         mock_discord_client.send_message_to_channel.assert_called_once()
         args, _ = mock_discord_client.send_message_to_channel.call_args
         assert "ValueError" in args[0]["content"]
-        mock_sqs_client.delete_sqs_message.assert_called_once_with(
-            "test_queue",
-            "dummy_receipt_handle",
-        )
+        assert response == {"batchItemFailures": []}
 
 
 def test_watchdog2_raid2_happy_path() -> None:
@@ -133,36 +132,49 @@ def test_watchdog2_raid2_happy_path() -> None:
     fake_ddb_item = {"phone_number": {"S": "+15559990000"}}
 
     with (
-        patch("processing_lambdas.watchdog_2.DiscordClient") as mock_discord_class,
-        patch("processing_lambdas.watchdog_2.SqsClient") as mock_sqs_class,
-        patch("processing_lambdas.watchdog_2.DdbClient") as mock_ddb_class,
-        patch("processing_lambdas.watchdog_2.raid_alert") as mock_raid_alert,
+        patch(
+            "processing_lambdas.watchdog_2.client_registry",
+        ) as mock_client_registry,
+        patch("processing_lambdas.watchdog_2.raid_alert_many") as mock_raid_alert,
     ):
         mock_discord_client = MagicMock()
-        mock_sqs_client = MagicMock()
         mock_ddb = MagicMock()
-        mock_discord_class.return_value = mock_discord_client
-        mock_sqs_class.return_value = mock_sqs_client
-        mock_ddb_class.return_value = mock_ddb
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
+        mock_client_registry.get_ddb_client.return_value = mock_ddb
+        mock_client_registry.get_raid_alert_dedup.return_value = RaidAlertDedup()
 
         mock_discord_client.get_user.return_value = "someUser#7777"
         mock_ddb.get_item.return_value = fake_ddb_item
+        mock_raid_alert.return_value = _delivered("+15559990000")
 
-        watchdog2(event, {})
+        response = watchdog2(event, {})
 
         mock_raid_alert.assert_called_once_with(
             "test_pinpoint_app_id",
             "+12223334447",
-            "+15559990000",
+            ["+15559990000"],
         )
         mock_discord_client.send_message_to_channel.assert_called_once_with(
             {"content": "User has been contacted!"},
             "chan999",
         )
-        mock_sqs_client.delete_sqs_message.assert_called_once_with(
-            "test_queue",
-            "dummy_receipt_handle",
-        )
+        assert response == {"batchItemFailures": []}
+
+
+def _delivered(*phone_numbers: str) -> dict:
+    """
+    Build the raid_alert_many result of successful deliveries.
+
+    :param phone_numbers: Numbers the alerts were sent to.
+    :return: Delivery status by number.
+    """
+    return {
+        phone_number: {
+            "sms": {"delivery_status": "SUCCESSFUL"},
+            "voice": {"delivery_status": "SUCCESSFUL"},
+        }
+        for phone_number in phone_numbers
+    }
 
 
 def test_watchdog2_registered_users2_happy_path() -> None:
@@ -179,26 +191,22 @@ def test_watchdog2_registered_users2_happy_path() -> None:
     }
 
     with (
-        patch("processing_lambdas.watchdog_2.DiscordClient") as mock_discord_class,
-        patch("processing_lambdas.watchdog_2.SqsClient") as mock_sqs_class,
+        patch(
+            "processing_lambdas.watchdog_2.client_registry",
+        ) as mock_client_registry,
         patch("processing_lambdas.watchdog_2.get_registered_users") as mock_get_users,
     ):
         mock_discord_client = MagicMock()
-        mock_sqs_client = MagicMock()
-        mock_discord_class.return_value = mock_discord_client
-        mock_sqs_class.return_value = mock_sqs_client
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
 
         mock_get_users.return_value = ["UserA#1111", "UserB#2222"]
-        watchdog2(event, {})
+        response = watchdog2(event, {})
 
         mock_discord_client.send_message_to_channel.assert_called_once_with(
             {"content": "UserA#1111\nUserB#2222"},
             "chan444",
         )
-        mock_sqs_client.delete_sqs_message.assert_called_once_with(
-            "test_queue",
-            "dummy_receipt_handle",
-        )
+        assert response == {"batchItemFailures": []}
 
 
 def test_watchdog2_raid2_exception() -> None:
@@ -215,27 +223,23 @@ def test_watchdog2_raid2_exception() -> None:
     }
 
     with (
-        patch("processing_lambdas.watchdog_2.DiscordClient") as mock_discord_class,
-        patch("processing_lambdas.watchdog_2.SqsClient") as mock_sqs_class,
-        patch("processing_lambdas.watchdog_2.DdbClient") as mock_ddb_class,
+        patch(
+            "processing_lambdas.watchdog_2.client_registry",
+        ) as mock_client_registry,
     ):
         mock_discord_client = MagicMock()
-        mock_sqs_client = MagicMock()
         mock_ddb = MagicMock()
-        mock_discord_class.return_value = mock_discord_client
-        mock_sqs_class.return_value = mock_sqs_client
-        mock_ddb_class.return_value = mock_ddb
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
+        mock_client_registry.get_ddb_client.return_value = mock_ddb
+        mock_client_registry.get_raid_alert_dedup.return_value = RaidAlertDedup()
 
         mock_discord_client.get_user.side_effect = RuntimeError("Error fetching user!")
-        watchdog2(event, {})
+        response = watchdog2(event, {})
 
         mock_discord_client.send_message_to_channel.assert_called_once()
         args, _ = mock_discord_client.send_message_to_channel.call_args
         assert "Error fetching user!" in args[0]["content"]
-        mock_sqs_client.delete_sqs_message.assert_called_once_with(
-            "test_queue",
-            "dummy_receipt_handle",
-        )
+        assert response == {"batchItemFailures": []}
 
 
 @pytest.fixture(autouse=True)
@@ -268,29 +272,25 @@ def test_watchdog2_registered_users2_exception() -> None:
     }
 
     with (
-        patch("processing_lambdas.watchdog_2.DiscordClient") as mock_discord_class,
-        patch("processing_lambdas.watchdog_2.SqsClient") as mock_sqs_class,
+        patch(
+            "processing_lambdas.watchdog_2.client_registry",
+        ) as mock_client_registry,
         patch("processing_lambdas.watchdog_2.get_registered_users") as mock_get_users,
     ):
         mock_discord_client = MagicMock()
-        mock_sqs_client = MagicMock()
-        mock_discord_class.return_value = mock_discord_client
-        mock_sqs_class.return_value = mock_sqs_client
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
 
         mock_get_users.side_effect = RuntimeError(
             "Failed to list users for some reason.",
         )
 
-        watchdog2(event, {})
+        response = watchdog2(event, {})
 
         mock_discord_client.send_message_to_channel.assert_called_once()
         args, _ = mock_discord_client.send_message_to_channel.call_args
         assert "Failed to list users for some reason." in args[0]["content"]
 
-        mock_sqs_client.delete_sqs_message.assert_called_once_with(
-            "test_queue",
-            "dummy_receipt_handle",
-        )
+        assert response == {"batchItemFailures": []}
 
 
 def test_watchdog2_update2_ddb_exception() -> None:
@@ -307,24 +307,258 @@ def test_watchdog2_update2_ddb_exception() -> None:
     }
 
     with (
-        patch("processing_lambdas.watchdog_2.DiscordClient") as mock_discord_class,
-        patch("processing_lambdas.watchdog_2.SqsClient") as mock_sqs_class,
+        patch(
+            "processing_lambdas.watchdog_2.client_registry",
+        ) as mock_client_registry,
         patch("processing_lambdas.watchdog_2.update_contact_info") as mock_update_info,
     ):
         mock_discord_client = MagicMock()
-        mock_sqs_client = MagicMock()
-        mock_discord_class.return_value = mock_discord_client
-        mock_sqs_class.return_value = mock_sqs_client
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
 
         mock_update_info.side_effect = RuntimeError("DynamoDB is down!")
 
-        watchdog2(event, {})
+        response = watchdog2(event, {})
 
         mock_discord_client.send_message_to_channel.assert_called_once()
         args, _ = mock_discord_client.send_message_to_channel.call_args
         assert "DynamoDB is down!" in args[0]["content"]
 
-        mock_sqs_client.delete_sqs_message.assert_called_once_with(
-            "test_queue",
-            "dummy_receipt_handle",
+        assert response == {"batchItemFailures": []}
+
+
+def test_watchdog2_raid2_prefetches_contact_info() -> None:
+    """Test that raid2 targets resolved in the batch are loaded in one call."""
+    event = {
+        "Records": [
+            _make_sqs_record(
+                command="raid2",
+                options=[{"name": "user", "value": user_id}],
+                command_issuer="issuer#0002",
+                channel_id=f"chan{user_id}",
+                resolved_users={user_id: f"user#{user_id}"},
+                message_id=f"message_{user_id}",
+            )
+            for user_id in ["1", "2"]
+        ],
+    }
+
+    with (
+        patch(
+            "processing_lambdas.watchdog_2.client_registry",
+        ) as mock_client_registry,
+        patch("processing_lambdas.watchdog_2.raid_alert_many") as mock_raid_alert,
+    ):
+        mock_discord_client = MagicMock()
+        mock_ddb = MagicMock()
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
+        mock_client_registry.get_ddb_client.return_value = mock_ddb
+        mock_client_registry.get_raid_alert_dedup.return_value = RaidAlertDedup()
+
+        mock_ddb.batch_get.return_value = {
+            "user#1": {"phone_number": {"S": "+15550000001"}},
+            "user#2": {"phone_number": {"S": "+15550000002"}},
+        }
+        mock_raid_alert.side_effect = lambda _, __, numbers: _delivered(*numbers)
+
+        response = watchdog2(event, {})
+
+        mock_ddb.batch_get.assert_called_once_with(
+            "contact_info",
+            "discord_user",
+            ["user#1", "user#2"],
+            projection=["phone_number"],
+        )
+        mock_ddb.get_item.assert_not_called()
+        mock_discord_client.get_user.assert_not_called()
+        assert sorted(
+            number for call in mock_raid_alert.call_args_list for number in call.args[2]
+        ) == ["+15550000001", "+15550000002"]
+        assert response == {"batchItemFailures": []}
+
+
+def test_watchdog2_raid2_several_users() -> None:
+    """Test that raid2 alerts every targeted user with a single fan-out."""
+    event = {
+        "Records": [
+            _make_sqs_record(
+                command="raid2",
+                options=[
+                    {"name": "user", "type": 6, "value": "1"},
+                    {"name": "user2", "type": 6, "value": "2"},
+                    {"name": "user3", "type": 6, "value": "3"},
+                ],
+                command_issuer="issuer#0002",
+                channel_id="chan1",
+            ),
+        ],
+    }
+
+    with (
+        patch(
+            "processing_lambdas.watchdog_2.client_registry",
+        ) as mock_client_registry,
+        patch("processing_lambdas.watchdog_2.raid_alert_many") as mock_raid_alert,
+    ):
+        mock_discord_client = MagicMock()
+        mock_ddb = MagicMock()
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
+        mock_client_registry.get_ddb_client.return_value = mock_ddb
+        mock_client_registry.get_raid_alert_dedup.return_value = RaidAlertDedup()
+
+        mock_discord_client.get_user.side_effect = lambda user_id: f"user#{user_id}"
+        mock_ddb.batch_get.return_value = {
+            "user#1": {"phone_number": {"S": "+15550000001"}},
+            "user#2": {"phone_number": {"S": "+15550000002"}},
+            "user#3": {"phone_number": {"S": "+15550000003"}},
+        }
+        mock_raid_alert.return_value = {
+            **_delivered("+15550000001", "+15550000002"),
+            "+15550000003": {
+                "sms": {"delivery_status": "PERMANENT_FAILURE"},
+                "voice": {"delivery_status": "FAILED"},
+            },
+        }
+
+        response = watchdog2(event, {})
+
+        mock_raid_alert.assert_called_once_with(
+            "test_pinpoint_app_id",
+            "+12223334447",
+            ["+15550000001", "+15550000002", "+15550000003"],
+        )
+        mock_discord_client.send_message_to_channel.assert_called_once_with(
+            {"content": "Unable to contact: user#3"},
+            "chan1",
+        )
+        assert response == {"batchItemFailures": []}
+
+
+def test_watchdog2_raid2_unregistered_user() -> None:
+    """Test that raid2 reports targets without contact info."""
+    event = {
+        "Records": [
+            _make_sqs_record(
+                command="raid2",
+                options=[{"name": "user", "value": "1"}],
+                command_issuer="issuer#0002",
+                channel_id="chan1",
+                resolved_users={"1": "user#1"},
+            ),
+        ],
+    }
+
+    with (
+        patch(
+            "processing_lambdas.watchdog_2.client_registry",
+        ) as mock_client_registry,
+        patch("processing_lambdas.watchdog_2.raid_alert_many") as mock_raid_alert,
+    ):
+        mock_discord_client = MagicMock()
+        mock_ddb = MagicMock()
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
+        mock_client_registry.get_ddb_client.return_value = mock_ddb
+        mock_client_registry.get_raid_alert_dedup.return_value = RaidAlertDedup()
+
+        mock_ddb.batch_get.return_value = {}
+        mock_ddb.get_item.return_value = None
+
+        watchdog2(event, {})
+
+        mock_raid_alert.assert_not_called()
+        mock_discord_client.send_message_to_channel.assert_called_once_with(
+            {"content": "Not registered in Watchdog: user#1"},
+            "chan1",
         )
+
+
+def test_watchdog2_raid2_deduplicates_reports() -> None:
+    """Test that repeated raid2 reports of a user only alert once."""
+    event = {
+        "Records": [
+            _make_sqs_record(
+                command="raid2",
+                options=[{"name": "user", "value": "1"}],
+                command_issuer=f"issuer#{i}",
+                channel_id="chan1",
+                resolved_users={"1": "user#1"},
+                message_id=f"message_{i}",
+            )
+            for i in range(3)
+        ],
+    }
+
+    with (
+        patch(
+            "processing_lambdas.watchdog_2.client_registry",
+        ) as mock_client_registry,
+        patch("processing_lambdas.watchdog_2.raid_alert_many") as mock_raid_alert,
+    ):
+        mock_discord_client = MagicMock()
+        mock_ddb = MagicMock()
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
+        mock_client_registry.get_ddb_client.return_value = mock_ddb
+        mock_client_registry.get_raid_alert_dedup.return_value = RaidAlertDedup()
+
+        mock_ddb.batch_get.return_value = {
+            "user#1": {"phone_number": {"S": "+15550000001"}},
+        }
+        mock_raid_alert.return_value = _delivered("+15550000001")
+
+        response = watchdog2(event, {})
+
+        mock_raid_alert.assert_called_once()
+        replies = sorted(
+            call.args[0]["content"]
+            for call in mock_discord_client.send_message_to_channel.call_args_list
+        )
+        assert replies == [
+            "User has been contacted!",
+            "user#1 was already alerted, 2 people reported this raid.",
+            "user#1 was already alerted, 3 people reported this raid.",
+        ]
+        assert response == {"batchItemFailures": []}
+
+
+def test_watchdog2_raid2_releases_window_on_error() -> None:
+    """Test that a raid2 that failed to page anyone doesn't collapse the next report."""
+    event = {
+        "Records": [
+            _make_sqs_record(
+                command="raid2",
+                options=[{"name": "user", "value": "1"}],
+                command_issuer="issuer#1",
+                channel_id="chan1",
+                resolved_users={"1": "user#1"},
+            ),
+        ],
+    }
+
+    with (
+        patch(
+            "processing_lambdas.watchdog_2.client_registry",
+        ) as mock_client_registry,
+        patch("processing_lambdas.watchdog_2.raid_alert_many") as mock_raid_alert,
+    ):
+        mock_discord_client = MagicMock()
+        mock_ddb = MagicMock()
+        mock_client_registry.get_discord_client.return_value = mock_discord_client
+        mock_client_registry.get_ddb_client.return_value = mock_ddb
+        mock_client_registry.get_raid_alert_dedup.return_value = RaidAlertDedup()
+
+        mock_ddb.batch_get.return_value = {
+            "user#1": {"phone_number": {"S": "+15550000001"}},
+        }
+        mock_raid_alert.side_effect = [
+            RuntimeError("Pinpoint is down"),
+            _delivered("+15550000001"),
+        ]
+
+        watchdog2(event, {})
+        watchdog2(event, {})
+
+        assert mock_raid_alert.call_count == 2
+        replies = [
+            call.args[0]["content"]
+            for call in mock_discord_client.send_message_to_channel.call_args_list
+        ]
+        assert replies == ["Pinpoint is down", "User has been contacted!"]
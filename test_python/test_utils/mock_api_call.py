@@ -30,6 +30,13 @@ def mock_make_api_call(_: Any, operation_name: str, operation_params: dict) -> d
         }
     elif operation_name == "DeleteMessage":
         return {}
+    elif operation_name == "DeleteMessageBatch":
+        return {
+            "Successful": [
+                {"Id": entry["Id"]} for entry in operation_params["Entries"]
+            ],
+            "Failed": [],
+        }
     elif operation_name == "GetItem":
         return {
             "Item": {
@@ -40,6 +47,22 @@ def mock_make_api_call(_: Any, operation_name: str, operation_params: dict) -> d
         }
     elif operation_name == "PutItem":
         return {}
+    elif operation_name == "BatchGetItem":
+        return {
+            "Responses": {
+                table_name: [
+                    {**key, "test_key": {"S": "test_value"}} for key in request["Keys"]
+                ]
+                for table_name, request in operation_params["RequestItems"].items()
+            },
+            "UnprocessedKeys": {},
+        }
+    elif operation_name == "BatchWriteItem":
+        return {
+            "UnprocessedItems": {},
+        }
+    elif operation_name == "TransactWriteItems":
+        return {}
     elif operation_name == "Scan" and "ExclusiveStartKey" not in operation_params:
         return {
             "Items": [
@@ -66,7 +89,18 @@ def mock_make_api_call(_: Any, operation_name: str, operation_params: dict) -> d
             ],
         }
     elif operation_name == "SendMessages":
-        return {}
+        return {
+            "MessageResponse": {
+                "Result": {
+                    address: {
+                        "DeliveryStatus": "SUCCESSFUL",
+                        "StatusCode": 200,
+                        "StatusMessage": "MessageId: abcd",
+                    }
+                    for address in operation_params["MessageRequest"]["Addresses"]
+                },
+            },
+        }
     elif operation_name == "SendVoiceMessage":
         return {}
 
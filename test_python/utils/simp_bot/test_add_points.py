@@ -0,0 +1,86 @@
+"""Test the add_points function."""
+
+from unittest.mock import patch
+
+import pytest
+
+from utils.simp_bot.add_points import add_points
+
+
+def test_add_points() -> None:
+    """Check that the transaction and the balance are written in one transaction."""
+    with patch("utils.simp_bot.add_points.client_registry") as mock_registry:
+        ddb_client = mock_registry.get_ddb_client.return_value
+        ddb_client.transact_write.return_value = None
+        add_points("user_1", -5, "issuer_1", transaction_id="interaction_1")
+
+        ((ledger, balance),) = ddb_client.transact_write.call_args.args
+        assert ledger["Put"]["TableName"] == "points"
+        assert ledger["Put"]["Item"]["transaction_id"] == {"S": "interaction_1"}
+        assert ledger["Put"]["Item"]["discord_user"] == {"S": "user_1"}
+        assert ledger["Put"]["Item"]["points"] == {"N": "-5"}
+        assert balance["Update"]["TableName"] == "point_balances"
+        assert balance["Update"]["Key"] == {"discord_user": {"S": "user_1"}}
+        assert balance["Update"]["ExpressionAttributeValues"][":points"] == {"N": "-5"}
+        assert "ConditionExpression" not in balance["Update"]
+        assert not ddb_client.transact_write.call_args.kwargs
+
+
+def test_add_points_conditions() -> None:
+    """Check that the balance guard and the rate limit are conditions of the update."""
+    with patch("utils.simp_bot.add_points.client_registry") as mock_registry:
+        ddb_client = mock_registry.get_ddb_client.return_value
+        ddb_client.transact_write.return_value = None
+        add_points("user_1", -5, "issuer_1", non_negative=True, min_interval_seconds=60)
+
+        ((_, balance),) = ddb_client.transact_write.call_args.args
+        assert "total_points >= :required" in balance["Update"]["ConditionExpression"]
+        assert (
+            "last_transaction_at <= :cutoff" in balance["Update"]["ConditionExpression"]
+        )
+        assert balance["Update"]["ExpressionAttributeValues"][":required"] == {"N": "5"}
+
+
+def test_add_points_refused() -> None:
+    """Check that refused transactions explain why."""
+    with patch("utils.simp_bot.add_points.client_registry") as mock_registry:
+        ddb_client = mock_registry.get_ddb_client.return_value
+        ddb_client.transact_write.return_value = [
+            {"Code": "None"},
+            {"Code": "ConditionalCheckFailed", "Item": {"total_points": {"N": "3"}}},
+        ]
+
+        with pytest.raises(ValueError, match="only has 3 points"):
+            add_points("user_1", -5, "issuer_1", non_negative=True)
+
+        ddb_client.transact_write.return_value = [
+            {"Code": "None"},
+            {
+                "Code": "ConditionalCheckFailed",
+                "Item": {"last_transaction_at": {"N": "9999999999"}},
+            },
+        ]
+
+        with pytest.raises(ValueError, match="Slow down"):
+            add_points("user_1", 5, "issuer_1", min_interval_seconds=60)
+
+
+def test_add_points_already_applied() -> None:
+    """Check that a transaction already in the ledger is not applied again."""
+    with patch("utils.simp_bot.add_points.client_registry") as mock_registry:
+        ddb_client = mock_registry.get_ddb_client.return_value
+        ddb_client.transact_write.return_value = [
+            {"Code": "ConditionalCheckFailed"},
+            {"Code": "None"},
+        ]
+
+        add_points("user_1", 5, "issuer_1", transaction_id="interaction_1")
+
+
+def test_add_points_to_self() -> None:
+    """Check that users can't add points to themselves."""
+    with patch("utils.simp_bot.add_points.client_registry") as mock_registry:
+        with pytest.raises(ValueError):
+            add_points("user_1", 5, "user_1")
+
+        mock_registry.get_ddb_client.assert_not_called()
@@ -0,0 +1,24 @@
+"""Test the get_point_balance function."""
+
+from unittest.mock import patch
+
+from utils.simp_bot.get_point_balance import get_point_balance
+
+
+def test_get_point_balance() -> None:
+    """Check that the balances are read from the balances table."""
+    with patch("utils.simp_bot.get_point_balance.client_registry") as mock_registry:
+        ddb_client = mock_registry.get_ddb_client.return_value
+        ddb_client.scan_iter.return_value = [
+            {"discord_user": {"S": "user_1"}, "total_points": {"N": "10"}},
+            {"discord_user": {"S": "user_2"}, "total_points": {"N": "-3"}},
+        ]
+
+        assert get_point_balance() == [
+            {"discord_user": "user_1", "total_points": 10},
+            {"discord_user": "user_2", "total_points": -3},
+        ]
+        ddb_client.scan_iter.assert_called_once_with(
+            "point_balances",
+            projection=["discord_user", "total_points"],
+        )
@@ -0,0 +1,91 @@
+"""Test the rebuild_point_balances function."""
+
+from unittest.mock import patch
+
+from utils.simp_bot.rebuild_point_balances import (
+    aggregate_points,
+    rebuild_point_balances,
+)
+
+
+def _transaction(discord_user: str, points: int) -> dict:
+    """
+    Create a ledger transaction for the tests.
+
+    :param discord_user: Discord user of the transaction.
+    :param points: Points of the transaction.
+    :return: The transaction as stored in DDB.
+    """
+    return {"discord_user": {"S": discord_user}, "points": {"N": str(points)}}
+
+
+def test_aggregate_points() -> None:
+    """Check that the points of each user are added up."""
+    transactions = [
+        _transaction("user_1", 5),
+        _transaction("user_2", 1),
+        _transaction("user_1", -2),
+    ]
+
+    assert aggregate_points(transactions) == {"user_1": 3, "user_2": 1}
+
+
+def test_rebuild_point_balances() -> None:
+    """Check that only the balances that drifted are rewritten."""
+    with patch(
+        "utils.simp_bot.rebuild_point_balances.client_registry",
+    ) as mock_registry:
+        ddb_client = mock_registry.get_ddb_client.return_value
+        ddb_client.scan_iter.side_effect = [
+            [
+                {"discord_user": {"S": "user_1"}, "total_points": {"N": "5"}},
+                {"discord_user": {"S": "user_2"}, "total_points": {"N": "4"}},
+            ],
+            [
+                _transaction("user_1", 5),
+                _transaction("user_2", 1),
+                _transaction("user_3", 2),
+            ],
+        ]
+
+        assert rebuild_point_balances() == [
+            {"discord_user": "user_2", "total_points": 1},
+            {"discord_user": "user_3", "total_points": 2},
+        ]
+        assert ddb_client.scan_iter.call_args_list[0].args == ("point_balances",)
+        assert ddb_client.update_item.call_count == 2
+        ddb_client.update_item.assert_any_call(
+            "point_balances",
+            {"discord_user": {"S": "user_2"}},
+            "SET total_points = :total_points",
+            expression_attribute_values={
+                ":total_points": {"N": "1"},
+                ":current": {"N": "4"},
+            },
+            condition_expression="total_points = :current",
+        )
+        ddb_client.update_item.assert_called_with(
+            "point_balances",
+            {"discord_user": {"S": "user_3"}},
+            "SET total_points = :total_points",
+            expression_attribute_values={":total_points": {"N": "2"}},
+            condition_expression="attribute_not_exists(total_points)",
+        )
+        ddb_client.put_item.assert_not_called()
+
+
+def test_rebuild_point_balances_skips_changed_balances() -> None:
+    """Check that balances written during the rebuild are not overwritten."""
+    with patch(
+        "utils.simp_bot.rebuild_point_balances.client_registry",
+    ) as mock_registry:
+        ddb_client = mock_registry.get_ddb_client.return_value
+        ddb_client.scan_iter.side_effect = [
+            [{"discord_user": {"S": "user_1"}, "total_points": {"N": "4"}}],
+            [_transaction("user_1", 5)],
+        ]
+        ddb_client.update_item.return_value = None
+
+        assert rebuild_point_balances() == []
+
+        ddb_client.update_item.assert_called_once()
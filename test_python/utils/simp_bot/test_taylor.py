@@ -0,0 +1,13 @@
+"""Test the random_song function."""
+
+import random
+
+from utils.simp_bot.taylor import SONGS, random_song
+
+
+def test_random_song() -> None:
+    """Check that the reply names a song and its album."""
+    reply = random_song(random.Random(0))
+    song, album = random.Random(0).choice(SONGS)
+
+    assert reply == f":notes: {song}, from {album}"
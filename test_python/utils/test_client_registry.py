@@ -0,0 +1,120 @@
+"""Test the ClientRegistry class."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from test_python.test_utils.mock_api_call import mock_make_api_call
+from utils.client_registry import ClientRegistry
+
+
+@pytest.fixture
+def registry() -> ClientRegistry:
+    """
+    Create a ClientRegistry fixture.
+
+    :return: A ClientRegistry instance.
+    """
+    return ClientRegistry()
+
+
+def test_clients_are_reused(registry: ClientRegistry) -> None:
+    """
+    Test that every client is only built once per registry.
+
+    :param registry: A ClientRegistry instance.
+    """
+    assert registry.get_sqs_client() is registry.get_sqs_client()
+    assert registry.get_ddb_client() is registry.get_ddb_client()
+    assert registry.get_pinpoint_client() is registry.get_pinpoint_client()
+    assert registry.get_http_session() is registry.get_http_session()
+    assert (
+        registry.get_secrets_manager_client() is registry.get_secrets_manager_client()
+    )
+
+
+def test_secret_is_cached(registry: ClientRegistry) -> None:
+    """
+    Test that a secret is only fetched once while its TTL has not expired.
+
+    :param registry: A ClientRegistry instance.
+    """
+    with patch(
+        "botocore.client.BaseClient._make_api_call",
+        side_effect=mock_make_api_call,
+        autospec=True,
+    ) as mock_api_call:
+        first = registry.get_secret("dummy")
+        second = registry.get_secret("dummy")
+
+        assert first is second
+        assert mock_api_call.call_count == 1
+
+
+def test_secret_is_refreshed_after_ttl(registry: ClientRegistry) -> None:
+    """
+    Test that an expired or force refreshed secret is fetched again.
+
+    :param registry: A ClientRegistry instance.
+    """
+    with patch("botocore.client.BaseClient._make_api_call", new=mock_make_api_call):
+        first = registry.get_secret("dummy")
+        forced = registry.get_secret("dummy", force_refresh=True)
+        assert forced is not first
+
+        registry.secret_ttl_seconds = 0
+        assert registry.get_secret("dummy") is not forced
+
+
+def test_discord_client_is_reused(registry: ClientRegistry) -> None:
+    """
+    Test that the Discord client is shared and picks up refreshed secrets.
+
+    :param registry: A ClientRegistry instance.
+    """
+    with patch("botocore.client.BaseClient._make_api_call", new=mock_make_api_call):
+        discord_client = registry.get_discord_client("dummy")
+        assert registry.get_discord_client("dummy") is discord_client
+
+        assert discord_client._session is registry.get_http_session()
+
+        registry.secret_ttl_seconds = 0
+        assert registry.get_discord_client("dummy") is discord_client
+        assert discord_client.secret is registry._secrets["dummy"][0]
+
+
+def test_discord_client_refreshes_secret_on_401(registry: ClientRegistry) -> None:
+    """
+    Test that a 401 from Discord refreshes the secret and retries the request.
+
+    :param registry: A ClientRegistry instance.
+    """
+    with patch("botocore.client.BaseClient._make_api_call", new=mock_make_api_call):
+        discord_client = registry.get_discord_client("dummy")
+        old_secret = discord_client.secret
+
+        unauthorized = MagicMock()
+        unauthorized.status_code = 401
+        ok = MagicMock()
+        ok.status_code = 200
+
+        with patch.object(
+            discord_client._session,
+            "post",
+            side_effect=[unauthorized, ok],
+        ) as mock_post:
+            assert discord_client.send_message_to_channel({"content": "hi"}, "123")
+            assert mock_post.call_count == 2
+
+        assert discord_client.secret is not old_secret
+
+
+def test_reset(registry: ClientRegistry) -> None:
+    """
+    Test that reset drops the cached clients.
+
+    :param registry: A ClientRegistry instance.
+    """
+    sqs_client = registry.get_sqs_client()
+    registry.reset()
+    assert registry.get_sqs_client() is not sqs_client
@@ -1,8 +1,10 @@
 """Test the DdbClient class."""
 
+from typing import Any
 from unittest.mock import patch
 
 import pytest
+from botocore.exceptions import ClientError
 
 from test_python.test_utils.mock_api_call import mock_make_api_call
 from utils.ddb_client import DdbClient
@@ -50,3 +52,305 @@ def test_scan(ddb_client: DdbClient) -> None:
         assert len(response) == 2
         assert response[0]["discord_user"]["S"] == "user_1"
         assert response[1]["discord_user"]["S"] == "user_2"
+
+
+def test_scan_keeps_parameters_across_pages(ddb_client: DdbClient) -> None:
+    """
+    Test that every page of a scan is requested with the same parameters.
+
+    :param ddb_client: A DdbClient instance.
+    """
+    calls = []
+
+    def record_call(*args: Any) -> dict:
+        """
+        Record the parameters of the call before mocking it.
+
+        :param args: Arguments of the API call.
+        :return: The mock API response.
+        """
+        calls.append(args[2])
+        return mock_make_api_call(*args)
+
+    with patch("botocore.client.BaseClient._make_api_call", new=record_call):
+        response = ddb_client.scan(
+            "dummy_table",
+            projection=["discord_user"],
+            consistent_read=True,
+        )
+
+    assert len(response) == 2
+    assert len(calls) == 2
+
+    for call in calls:
+        assert call["TableName"] == "dummy_table"
+        assert call["ConsistentRead"] is True
+        assert call["ProjectionExpression"] == "#p0"
+        assert call["ExpressionAttributeNames"] == {"#p0": "discord_user"}
+
+    assert "ExclusiveStartKey" in calls[1]
+
+
+def test_scan_iter_parallel(ddb_client: DdbClient) -> None:
+    """
+    Test that a parallel scan reads every segment.
+
+    :param ddb_client: A DdbClient instance.
+    """
+    segments = set()
+
+    def record_call(*args: Any) -> dict:
+        """
+        Record the segment of the call before mocking it.
+
+        :param args: Arguments of the API call.
+        :return: The mock API response.
+        """
+        segments.add((args[2]["Segment"], args[2]["TotalSegments"]))
+        return mock_make_api_call(*args)
+
+    with patch("botocore.client.BaseClient._make_api_call", new=record_call):
+        items = list(ddb_client.scan_iter("dummy_table", total_segments=3))
+
+    assert len(items) == 6
+    assert segments == {(0, 3), (1, 3), (2, 3)}
+
+
+def test_scan_iter_parallel_error(ddb_client: DdbClient) -> None:
+    """
+    Test that an error in a segment is raised by the parallel scan.
+
+    :param ddb_client: A DdbClient instance.
+    """
+
+    def fail_segment(*args: Any) -> dict:
+        """
+        Fail the scan of the last segment.
+
+        :param args: Arguments of the API call.
+        :raises RuntimeError: For the last segment.
+        :return: The mock API response.
+        """
+        if args[2]["Segment"] == 1:
+            raise RuntimeError("Throttled")
+
+        return mock_make_api_call(*args)
+
+    with patch("botocore.client.BaseClient._make_api_call", new=fail_segment):
+        with pytest.raises(RuntimeError):
+            list(ddb_client.scan_iter("dummy_table", total_segments=2))
+
+
+def test_batch_get(ddb_client: DdbClient) -> None:
+    """
+    Test that batch_get chunks the keys and returns the items by PK value.
+
+    :param ddb_client: A DdbClient instance.
+    """
+    chunk_sizes = []
+
+    def record_call(*args: Any) -> dict:
+        """
+        Record the size of each chunk before mocking the call.
+
+        :param args: Arguments of the API call.
+        :return: The mock API response.
+        """
+        chunk_sizes.append(len(args[2]["RequestItems"]["dummy_table"]["Keys"]))
+        return mock_make_api_call(*args)
+
+    key_values = [f"user_{i}" for i in range(150)] + ["user_0"]
+
+    with patch("botocore.client.BaseClient._make_api_call", new=record_call):
+        items = ddb_client.batch_get("dummy_table", "discord_user", key_values)
+
+    assert chunk_sizes == [100, 50]
+    assert len(items) == 150
+    assert items["user_42"]["test_key"]["S"] == "test_value"
+
+
+def test_batch_get_retries_unprocessed_keys(ddb_client: DdbClient) -> None:
+    """
+    Test that batch_get retries the keys DDB did not process.
+
+    :param ddb_client: A DdbClient instance.
+    """
+    responses = [
+        {
+            "Responses": {"dummy_table": [{"discord_user": {"S": "user_1"}}]},
+            "UnprocessedKeys": {
+                "dummy_table": {"Keys": [{"discord_user": {"S": "user_2"}}]},
+            },
+        },
+        {
+            "Responses": {"dummy_table": [{"discord_user": {"S": "user_2"}}]},
+        },
+    ]
+
+    with (
+        patch.object(ddb_client.ddb, "batch_get_item", side_effect=responses),
+        patch("utils.ddb_client.time.sleep") as mock_sleep,
+    ):
+        items = ddb_client.batch_get(
+            "dummy_table",
+            "discord_user",
+            ["user_1", "user_2"],
+        )
+
+    assert sorted(items) == ["user_1", "user_2"]
+    mock_sleep.assert_called_once()
+
+
+def test_batch_write(ddb_client: DdbClient) -> None:
+    """
+    Test that batch_write chunks the requests.
+
+    :param ddb_client: A DdbClient instance.
+    """
+    items = [{"discord_user": {"S": f"user_{i}"}} for i in range(30)]
+
+    with patch.object(
+        ddb_client.ddb,
+        "batch_write_item",
+        return_value={"UnprocessedItems": {}},
+    ) as mock_write:
+        written = ddb_client.batch_write(
+            "dummy_table",
+            items=items,
+            delete_keys=[{"discord_user": {"S": "user_old"}}],
+        )
+
+    assert written == 31
+    assert [
+        len(call.kwargs["RequestItems"]["dummy_table"])
+        for call in mock_write.call_args_list
+    ] == [25, 6]
+
+
+def test_batch_write_gives_up(ddb_client: DdbClient) -> None:
+    """
+    Test that batch_write raises if items are never processed.
+
+    :param ddb_client: A DdbClient instance.
+    """
+    unprocessed = {
+        "UnprocessedItems": {
+            "dummy_table": [{"PutRequest": {"Item": {"discord_user": {"S": "u"}}}}],
+        },
+    }
+
+    with (
+        patch.object(ddb_client.ddb, "batch_write_item", return_value=unprocessed),
+        patch("utils.ddb_client.time.sleep"),
+    ):
+        with pytest.raises(RuntimeError):
+            ddb_client.batch_write("dummy_table", items=[{"discord_user": {"S": "u"}}])
+
+
+def test_update_item(ddb_client: DdbClient) -> None:
+    """
+    Test that update_item returns the updated item.
+
+    :param ddb_client: A DdbClient instance.
+    """
+    with patch.object(
+        ddb_client.ddb,
+        "update_item",
+        return_value={"Attributes": {"discord_user": {"S": "user_1"}}},
+    ) as mock_update:
+        item = ddb_client.update_item(
+            "dummy_table",
+            {"discord_user": {"S": "user_1"}},
+            "SET expires_at = :now",
+            expression_attribute_values={":now": {"N": "0"}},
+            condition_expression="attribute_exists(discord_user)",
+        )
+
+    assert item == {"discord_user": {"S": "user_1"}}
+    assert mock_update.call_args.kwargs["ReturnValues"] == "ALL_NEW"
+    assert "ExpressionAttributeNames" not in mock_update.call_args.kwargs
+
+
+def test_update_item_condition_failed(ddb_client: DdbClient) -> None:
+    """
+    Test that update_item returns None when the condition fails.
+
+    :param ddb_client: A DdbClient instance.
+    """
+    error = ClientError(
+        {"Error": {"Code": "ConditionalCheckFailedException", "Message": ""}},
+        "UpdateItem",
+    )
+
+    with patch.object(ddb_client.ddb, "update_item", side_effect=error):
+        assert (
+            ddb_client.update_item(
+                "dummy_table",
+                {"discord_user": {"S": "user_1"}},
+                "SET expires_at = :now",
+                condition_expression="attribute_exists(discord_user)",
+            )
+            is None
+        )
+
+
+def test_transact_write(ddb_client: DdbClient) -> None:
+    """
+    Test that transact_write sends every item in one call.
+
+    :param ddb_client: A DdbClient instance.
+    """
+    items = [
+        {"Put": {"TableName": "dummy_table", "Item": {"id": {"S": "1"}}}},
+        {"Put": {"TableName": "dummy_table", "Item": {"id": {"S": "2"}}}},
+    ]
+
+    with patch.object(
+        ddb_client.ddb,
+        "transact_write_items",
+        return_value={},
+    ) as mock_transact:
+        assert ddb_client.transact_write(items) is None
+
+    mock_transact.assert_called_once_with(TransactItems=items)
+
+
+def test_transact_write_condition_failed(ddb_client: DdbClient) -> None:
+    """
+    Test that transact_write returns the cancellation reasons of a failed condition.
+
+    :param ddb_client: A DdbClient instance.
+    """
+    reasons: list[Any] = [
+        {"Code": "None"},
+        {"Code": "ConditionalCheckFailed", "Item": {}},
+    ]
+    error = ClientError(
+        {
+            "Error": {"Code": "TransactionCanceledException", "Message": ""},
+            "CancellationReasons": reasons,
+        },  # type: ignore
+        "TransactWriteItems",
+    )
+
+    with patch.object(ddb_client.ddb, "transact_write_items", side_effect=error):
+        assert ddb_client.transact_write([{"Put": {}}, {"Update": {}}]) == reasons
+
+
+def test_transact_write_error(ddb_client: DdbClient) -> None:
+    """
+    Test that transact_write raises errors that are not failed conditions.
+
+    :param ddb_client: A DdbClient instance.
+    """
+    error = ClientError(
+        {
+            "Error": {"Code": "TransactionCanceledException", "Message": ""},
+            "CancellationReasons": [{"Code": "TransactionConflict"}],
+        },  # type: ignore
+        "TransactWriteItems",
+    )
+
+    with patch.object(ddb_client.ddb, "transact_write_items", side_effect=error):
+        with pytest.raises(ClientError):
+            ddb_client.transact_write([{"Put": {}}])
@@ -0,0 +1,75 @@
+"""Test the DDB codec."""
+
+from collections import OrderedDict
+from decimal import Decimal
+
+import pytest
+
+from utils.ddb_codec import from_attribute_value, from_item, to_attribute_value, to_item
+
+
+def test_to_item() -> None:
+    """Check that Python values are serialized into attribute values."""
+    item = to_item(
+        {
+            "name": "user_1",
+            "points": -5,
+            "ratio": Decimal("1.5"),
+            "active": True,
+            "missing": None,
+            "tags": ["a", 1],
+            "profile": {"nick": "u"},
+            "roles": {"admin"},
+        },
+    )
+
+    assert item == {
+        "name": {"S": "user_1"},
+        "points": {"N": "-5"},
+        "ratio": {"N": "1.5"},
+        "active": {"BOOL": True},
+        "missing": {"NULL": True},
+        "tags": {"L": [{"S": "a"}, {"N": "1"}]},
+        "profile": {"M": {"nick": {"S": "u"}}},
+        "roles": {"SS": ["admin"]},
+    }
+
+
+def test_round_trip() -> None:
+    """Check that values survive a round trip."""
+    data = {
+        "name": "user_1",
+        "points": 10,
+        "ratio": Decimal("0.25"),
+        "active": False,
+        "missing": None,
+        "tags": ["a", 2],
+        "profile": {"nick": "u", "level": 3},
+        "scores": {1, 2},
+        "blob": b"\x00\x01",
+    }
+
+    assert from_item(to_item(data)) == data
+
+
+def test_subclasses_are_serialized() -> None:
+    """Check that subclasses of supported types use the parent serializer."""
+    assert to_attribute_value(OrderedDict(a=1)) == {"M": {"a": {"N": "1"}}}
+
+
+def test_from_attribute_value_numbers() -> None:
+    """Check that integral numbers become ints and the rest Decimals."""
+    assert from_attribute_value({"N": "42"}) == 42
+    assert from_attribute_value({"N": "4.2"}) == Decimal("4.2")
+    assert from_attribute_value({"N": "1E+3"}) == Decimal("1E+3")
+
+
+@pytest.mark.parametrize("value", [float("nan"), set(), object()])
+def test_unsupported_values(value: object) -> None:
+    """
+    Check that values DDB can't store raise ValueError.
+
+    :param value: The unsupported value.
+    """
+    with pytest.raises(ValueError):
+        to_attribute_value(value)
@@ -0,0 +1,64 @@
+"""Test the create_http_session function."""
+
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from utils.http_session import (
+    CONNECT_TIMEOUT_SECONDS,
+    MAX_RETRIES,
+    POOL_MAXSIZE,
+    READ_TIMEOUT_SECONDS,
+    TimeoutHTTPAdapter,
+    create_http_session,
+)
+
+# Timeout of the processing Lambdas in lib/utils/create-processing-lambda.ts
+PROCESSING_TIMEOUT_SECONDS = 5
+
+
+def test_create_http_session() -> None:
+    """Check that the session pools connections and never retries POST on 5xx."""
+    session = create_http_session()
+    adapter = session.get_adapter("https://discord.com/api")
+
+    assert isinstance(adapter, TimeoutHTTPAdapter)
+    assert adapter._pool_maxsize == POOL_MAXSIZE  # type: ignore
+    assert adapter.max_retries.is_retry("GET", 503)
+    assert not adapter.max_retries.is_retry("POST", 503)
+
+
+def test_retries_fit_in_the_lambda_timeout() -> None:
+    """Check that a hung call and its retries fail before the Lambda times out."""
+    adapter = create_http_session().get_adapter("https://discord.com/api")
+    assert isinstance(adapter, TimeoutHTTPAdapter)
+
+    retry = adapter.max_retries
+    worst_case = (
+        CONNECT_TIMEOUT_SECONDS * (1 + MAX_RETRIES)
+        + READ_TIMEOUT_SECONDS * (1 + (retry.read or 0))
+        + retry.get_backoff_time()
+    )
+
+    assert retry.total == MAX_RETRIES
+    assert worst_case < PROCESSING_TIMEOUT_SECONDS
+
+
+def test_default_timeout() -> None:
+    """Check that requests without a timeout get the default one."""
+    adapter = TimeoutHTTPAdapter()
+
+    with patch("requests.adapters.HTTPAdapter.send") as mock_send:
+        mock_send.return_value = MagicMock()
+        adapter.send(requests.Request("GET", "https://discord.com").prepare())
+        adapter.send(
+            requests.Request("GET", "https://discord.com").prepare(),
+            timeout=1,
+        )
+
+        first_call, second_call = mock_send.call_args_list
+        assert first_call.kwargs["timeout"] == (
+            CONNECT_TIMEOUT_SECONDS,
+            READ_TIMEOUT_SECONDS,
+        )
+        assert second_call.kwargs["timeout"] == 1
@@ -0,0 +1,75 @@
+"""Test the IdempotencyStore class."""
+
+from unittest.mock import MagicMock
+
+from utils.idempotency import CLAIMED, COMPLETED, IN_PROGRESS, IdempotencyStore
+
+
+def test_claim_in_memory() -> None:
+    """Check that an interaction is only claimed once and keeps its reply."""
+    store = IdempotencyStore()
+
+    assert store.claim("interaction_1") == (CLAIMED, None)
+    assert store.claim("interaction_1") == (IN_PROGRESS, None)
+    assert store.claim("interaction_2") == (CLAIMED, None)
+
+    store.complete("interaction_1", "Done!")
+
+    assert store.claim("interaction_1") == (COMPLETED, "Done!")
+
+
+def test_expired_lease() -> None:
+    """Check that a claim that was never completed can be taken again."""
+    store = IdempotencyStore(lease_seconds=0)
+
+    assert store.claim("interaction_1") == (CLAIMED, None)
+    assert store.claim("interaction_1") == (CLAIMED, None)
+
+
+def test_claim_shared() -> None:
+    """Check that the shared store claims interactions with a conditional write."""
+    ddb_client = MagicMock()
+    ddb_client.update_item.side_effect = [
+        {"interaction_id": {"S": "interaction_1"}},
+        None,
+        None,
+    ]
+    ddb_client.get_item.side_effect = [
+        {"status": {"S": IN_PROGRESS}},
+        {"status": {"S": COMPLETED}, "reply": {"S": "Done!"}},
+    ]
+    store = IdempotencyStore(ddb_client=ddb_client, table_name="idempotency")
+
+    assert store.claim("interaction_1") == (CLAIMED, None)
+    assert store.claim("interaction_1") == (IN_PROGRESS, None)
+    assert store.claim("interaction_1") == (COMPLETED, "Done!")
+
+    # Completed interactions are served from memory afterwards
+    assert store.claim("interaction_1") == (COMPLETED, "Done!")
+    assert ddb_client.update_item.call_count == 3
+
+    first_call = ddb_client.update_item.call_args_list[0]
+    assert first_call.args[0] == "idempotency"
+    assert "attribute_not_exists" in first_call.kwargs["condition_expression"]
+
+
+def test_complete_shared() -> None:
+    """Check that completing an interaction stores its reply until the TTL."""
+    ddb_client = MagicMock()
+    store = IdempotencyStore(ddb_client=ddb_client, table_name="idempotency")
+    store.complete("interaction_1", "Done!")
+
+    values = ddb_client.update_item.call_args.kwargs["expression_attribute_values"]
+    assert values[":status"] == {"S": COMPLETED}
+    assert values[":reply"] == {"S": "Done!"}
+    assert store.claim("interaction_1") == (COMPLETED, "Done!")
+
+
+def test_claim_shared_unavailable() -> None:
+    """Check that DDB errors fall back to the in-memory claims."""
+    ddb_client = MagicMock()
+    ddb_client.update_item.side_effect = RuntimeError("DDB is down")
+    store = IdempotencyStore(ddb_client=ddb_client, table_name="idempotency")
+
+    assert store.claim("interaction_1") == (CLAIMED, None)
+    assert store.claim("interaction_1") == (IN_PROGRESS, None)
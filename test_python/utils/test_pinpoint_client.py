@@ -45,3 +45,67 @@ def test_send_voice_message(pinpoint_client: PinpointClient) -> None:
             "phone_number",
             "message",
         )
+
+
+def test_send_sms_messages(pinpoint_client: PinpointClient) -> None:
+    """
+    Test that send_sms_messages returns the delivery status of every number.
+
+    :param pinpoint_client: A PinpointClient instance.
+    """
+    with patch("botocore.client.BaseClient._make_api_call", new=mock_make_api_call):
+        results = pinpoint_client.send_sms_messages(
+            "app_id",
+            "+12223334444",
+            ["+15550000001", "+15550000002", "+15550000001"],
+            "message",
+        )
+
+    assert results == {
+        number: {
+            "delivery_status": "SUCCESSFUL",
+            "status_code": 200,
+            "status_message": "MessageId: abcd",
+        }
+        for number in ["+15550000001", "+15550000002"]
+    }
+
+
+def test_send_voice_messages(pinpoint_client: PinpointClient) -> None:
+    """
+    Test that a failed voice call doesn't stop the others.
+
+    :param pinpoint_client: A PinpointClient instance.
+    """
+
+    def send_voice_message(_: str, destination_number: str, __: str) -> bool:
+        """
+        Fail the call to one of the numbers.
+
+        :param _: Origination number.
+        :param destination_number: Number to send the message to.
+        :param __: Message to send.
+        :raises RuntimeError: For the failing number.
+        :return: True.
+        """
+        if destination_number == "+15550000002":
+            raise RuntimeError("Unreachable")
+
+        return True
+
+    with patch.object(
+        pinpoint_client,
+        "send_voice_message",
+        side_effect=send_voice_message,
+    ):
+        results = pinpoint_client.send_voice_messages(
+            "+12223334444",
+            ["+15550000001", "+15550000002"],
+            "message",
+        )
+
+    assert results["+15550000001"]["delivery_status"] == "SUCCESSFUL"
+    assert results["+15550000002"] == {
+        "delivery_status": "FAILED",
+        "status_message": "Unreachable",
+    }
@@ -0,0 +1,77 @@
+"""Test the process_records function."""
+
+import threading
+import time
+
+from utils.process_records import process_records
+
+
+def _record(message_id: str, key: str) -> dict:
+    """
+    Build a minimal SQS record.
+
+    :param message_id: ID of the message.
+    :param key: Ordering key stored in the body.
+    :return: An SQS record dict.
+    """
+    return {"messageId": message_id, "body": key}
+
+
+def test_records_run_concurrently() -> None:
+    """Check that independent records take as long as the slowest one."""
+    records = [_record(str(i), str(i)) for i in range(5)]
+
+    start = time.perf_counter()
+    response = process_records(records, lambda _: time.sleep(0.2))
+
+    assert time.perf_counter() - start < 0.6
+    assert response == {"batchItemFailures": []}
+
+
+def test_records_with_same_key_keep_order() -> None:
+    """Check that records sharing an ordering key run in order."""
+    processed = []
+    lock = threading.Lock()
+
+    def process(record: dict) -> None:
+        """
+        Record the order records are processed in.
+
+        :param record: SQS record.
+        """
+        time.sleep(0.01 * (5 - int(record["messageId"])))
+        with lock:
+            processed.append(record["messageId"])
+
+    records = [_record(str(i), "same_channel") for i in range(5)]
+    process_records(records, process, ordering_key=lambda record: record["body"])
+
+    assert processed == ["0", "1", "2", "3", "4"]
+
+
+def test_failures_are_reported() -> None:
+    """Check that a failure also fails the later records with the same key."""
+
+    def process(record: dict) -> None:
+        """
+        Fail the first record.
+
+        :param record: SQS record.
+        :raises RuntimeError: For the first record.
+        """
+        if record["messageId"] == "a1":
+            raise RuntimeError("Boom!")
+
+    records = [_record("a1", "a"), _record("a2", "a"), _record("b1", "b")]
+    response = process_records(
+        records,
+        process,
+        ordering_key=lambda record: record["body"],
+    )
+
+    assert response == {
+        "batchItemFailures": [
+            {"itemIdentifier": "a1"},
+            {"itemIdentifier": "a2"},
+        ],
+    }
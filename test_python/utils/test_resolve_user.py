@@ -0,0 +1,23 @@
+"""Test the resolve_user function."""
+
+from unittest.mock import MagicMock
+
+from utils.resolve_user import resolve_user
+
+
+def test_resolve_user_from_interaction() -> None:
+    """Check that resolved users don't call the Discord API."""
+    discord_client = MagicMock()
+
+    assert resolve_user(discord_client, "1", {"1": "user#0"}) == "user#0"
+    discord_client.get_user.assert_not_called()
+
+
+def test_resolve_user_fallback() -> None:
+    """Check that missing users are looked up with the Discord client."""
+    discord_client = MagicMock()
+    discord_client.get_user.return_value = "other#1"
+
+    assert resolve_user(discord_client, "2", {"1": "user#0"}) == "other#1"
+    assert resolve_user(discord_client, "2", None) == "other#1"
+    discord_client.get_user.assert_called_with("2")
@@ -38,3 +38,46 @@ def test_send_sqs_message(sqs_client: SqsClient) -> None:
     with patch("botocore.client.BaseClient._make_api_call", new=mock_make_api_call):
         response = sqs_client.send_sqs_message("abcd", "abcd")
         assert response["MessageId"] == "swrgtsrgfvwr"
+
+
+def test_delete_message_batch(sqs_client: SqsClient) -> None:
+    """
+    Test that delete_message_batch deletes messages in chunks of 10.
+
+    :param sqs_client: An SqsClient instance.
+    """
+    with patch(
+        "botocore.client.BaseClient._make_api_call",
+        side_effect=mock_make_api_call,
+        autospec=True,
+    ) as mock_api_call:
+        failed = sqs_client.delete_message_batch(
+            "abcd",
+            [f"handle_{i}" for i in range(25)],
+        )
+
+        assert failed == []
+        assert mock_api_call.call_count == 3
+
+
+def test_delete_message_batch_failures(sqs_client: SqsClient) -> None:
+    """
+    Test that delete_message_batch returns the receipt handles that failed.
+
+    :param sqs_client: An SqsClient instance.
+    """
+    with patch(
+        "botocore.client.BaseClient._make_api_call",
+        return_value={
+            "Successful": [{"Id": "0"}],
+            "Failed": [
+                {
+                    "Id": "1",
+                    "SenderFault": True,
+                    "Code": "ReceiptHandleIsInvalid",
+                    "Message": "Bad handle",
+                },
+            ],
+        },
+    ):
+        assert sqs_client.delete_message_batch("abcd", ["good", "bad"]) == ["bad"]
@@ -0,0 +1,162 @@
+"""Test the tracer."""
+
+import json
+from typing import Iterator, Self
+
+import pytest
+
+from utils.tracing import Tracer
+
+
+def _make_tracer(sample_rate: float = 1.0) -> tuple[Tracer, list[dict]]:
+    """
+    Create a tracer that keeps the lines it emits.
+
+    :param sample_rate: Fraction of the invocations timed.
+    :return: The tracer and the lines it emitted.
+    """
+    lines: list[dict] = []
+    tracer = Tracer(
+        sample_rate=sample_rate,
+        namespace="Test",
+        emit=lambda line: lines.append(json.loads(line)),
+    )
+
+    return tracer, lines
+
+
+def test_invocation_emits_emf() -> None:
+    """Test that a sampled invocation emits its handler, spans and commands."""
+    tracer, lines = _make_tracer()
+
+    @tracer.handler("handler")
+    def handler(_: dict, __: dict) -> str:
+        """
+        Handle an invocation.
+
+        :param _: AWS event.
+        :param __: AWS context.
+        :return: A reply.
+        """
+        with tracer.span("DdbClient.get_item"):
+            pass
+
+        with tracer.span("DdbClient.get_item"):
+            pass
+
+        tracer.record("ping", 0.5, kind="Command")
+
+        return "done"
+
+    assert handler({}, {}) == "done"
+
+    by_kind = {
+        kind: next(line for line in lines if f"{kind}Duration" in line)
+        for kind in ("Handler", "Span", "Command")
+    }
+
+    assert by_kind["Handler"]["Handler"] == "handler"
+    assert by_kind["Handler"]["ColdStarts"] == 1
+    assert by_kind["Handler"]["_aws"]["CloudWatchMetrics"][0]["Namespace"] == "Test"
+    assert by_kind["Handler"]["_aws"]["CloudWatchMetrics"][0]["Dimensions"] == [
+        ["Handler"],
+    ]
+    assert by_kind["Span"]["Span"] == "DdbClient.get_item"
+    assert by_kind["Span"]["SpanCalls"] == 2
+    assert len(by_kind["Span"]["SpanDuration"]) == 2
+    assert by_kind["Command"]["CommandDuration"] == [500.0]
+    assert by_kind["Command"]["_aws"]["CloudWatchMetrics"][0]["Dimensions"] == [
+        ["Handler", "Command"],
+    ]
+
+
+def test_sampling() -> None:
+    """Test that only the cold start is timed when nothing else is sampled."""
+    tracer, lines = _make_tracer(sample_rate=0)
+
+    for _ in range(3):
+        with tracer.invocation("handler"):
+            with tracer.span("span"):
+                pass
+
+    assert sorted(line.get("Span", "") for line in lines) == ["", "span"]
+    assert all(line["ColdStart"] for line in lines)
+
+    with tracer.span("outside"):
+        pass
+
+    assert len(lines) == 2
+
+
+def test_handler_errors_are_counted() -> None:
+    """Test that a failed invocation is counted and its error raised."""
+    tracer, lines = _make_tracer()
+
+    with pytest.raises(RuntimeError):
+        with tracer.invocation("handler"):
+            raise RuntimeError("boom")
+
+    assert lines[0]["HandlerErrors"] == 1
+
+
+def test_counters_emit_their_increase() -> None:
+    """Test that counters are emitted as their increase and gauges as they are."""
+    tracer, lines = _make_tracer()
+
+    with tracer.invocation("handler"):
+        tracer.counters("Cache", {"hits": 3, "size": 2}, gauges=("size",))
+
+    tracer.counters("Cache", {"hits": 4, "size": 3}, gauges=("size",))
+
+    with tracer.invocation("handler"):
+        tracer.counters("Cache", {"hits": 5, "size": 3}, gauges=("size",))
+
+    counters = [line for line in lines if "Component" in line]
+
+    assert [(line["hits"], line["size"]) for line in counters] == [(3, 2), (2, 3)]
+    assert counters[0]["_aws"]["CloudWatchMetrics"][0]["Dimensions"] == [
+        ["Handler", "Component"],
+    ]
+
+
+def test_client_methods_are_spans() -> None:
+    """Test that the public methods of a client are timed, generators included."""
+    tracer, lines = _make_tracer()
+
+    @tracer.client()
+    class Client:
+        """A client."""
+
+        def get(self: Self) -> int:
+            """
+            Get a value.
+
+            :return: The value.
+            """
+            return self._private()
+
+        def _private(self: Self) -> int:
+            """
+            Get a value without a span.
+
+            :return: The value.
+            """
+            return 1
+
+        def pages(self: Self) -> Iterator[int]:
+            """
+            Get some pages.
+
+            :yield: The pages.
+            """
+            yield from (1, 2)
+
+    with tracer.invocation("handler"):
+        assert Client().get() == 1
+        assert list(Client().pages()) == [1, 2]
+
+    assert {line.get("Span") for line in lines} == {
+        None,
+        "Client.get",
+        "Client.pages",
+    }
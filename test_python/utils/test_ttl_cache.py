@@ -0,0 +1,57 @@
+"""Test the TtlLruCache class."""
+
+from utils.ttl_cache import TtlLruCache
+
+
+class FakeClock:
+    """Clock that is moved by hand."""
+
+    def __init__(self) -> None:
+        """Start the clock at 0."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """
+        Get the current time.
+
+        :return: The current time.
+        """
+        return self.now
+
+
+def test_hits_and_misses() -> None:
+    """Check that hits and misses are counted."""
+    cache = TtlLruCache()
+
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.metrics() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_expiration() -> None:
+    """Check that expired entries are misses and get evicted."""
+    clock = FakeClock()
+    cache = TtlLruCache(ttl_seconds=10, clock=clock)
+
+    cache.set("a", 1)
+    cache.set("b", 2, ttl_seconds=100)
+    clock.now = 50
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert len(cache) == 1
+
+
+def test_lru_eviction() -> None:
+    """Check that the least recently used entry is evicted when full."""
+    cache = TtlLruCache(max_size=2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
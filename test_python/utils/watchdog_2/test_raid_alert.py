@@ -3,10 +3,22 @@
 from unittest.mock import patch
 
 from test_python.test_utils.mock_api_call import mock_make_api_call
-from utils.watchdog_2.raid_alert import raid_alert
+from utils.watchdog_2.raid_alert import raid_alert, raid_alert_many
 
 
 def test_raid_alert() -> None:
     """Check that raid_alert sends both SMS and voice messages without error."""
     with patch("botocore.client.BaseClient._make_api_call", new=mock_make_api_call):
         assert raid_alert("app+id", "phone_number", "phone_number")
+
+
+def test_raid_alert_many() -> None:
+    """Check that raid_alert_many returns the delivery status of every number."""
+    with patch("botocore.client.BaseClient._make_api_call", new=mock_make_api_call):
+        results = raid_alert_many("app_id", "+12223334444", ["+1555", "+1666"])
+
+    assert set(results) == {"+1555", "+1666"}
+
+    for result in results.values():
+        assert result["sms"]["delivery_status"] == "SUCCESSFUL"
+        assert result["voice"]["delivery_status"] == "SUCCESSFUL"
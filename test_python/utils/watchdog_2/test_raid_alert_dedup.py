@@ -0,0 +1,52 @@
+"""Test the RaidAlertDedup class."""
+
+from unittest.mock import MagicMock
+
+from utils.watchdog_2.raid_alert_dedup import RaidAlertDedup
+
+
+def test_report_in_memory() -> None:
+    """Check that only the first report of a user opens the window."""
+    dedup = RaidAlertDedup()
+
+    assert dedup.report("user_1", "issuer_1") == (True, 1)
+    assert dedup.report("user_1", "issuer_2") == (False, 2)
+    assert dedup.report("user_1", "issuer_2") == (False, 2)
+    assert dedup.report("user_2", "issuer_1") == (True, 1)
+
+
+def test_release() -> None:
+    """Check that a released user is alerted again on the next report."""
+    dedup = RaidAlertDedup()
+    dedup.report("user_1", "issuer_1")
+    dedup.release("user_1")
+
+    assert dedup.report("user_1", "issuer_2") == (True, 1)
+
+
+def test_report_shared() -> None:
+    """Check that the shared store claims the window with a conditional write."""
+    ddb_client = MagicMock()
+    ddb_client.update_item.side_effect = [
+        {"discord_user": {"S": "user_1"}},
+        None,
+        {"reporters": {"SS": ["issuer_1", "issuer_2"]}},
+    ]
+    dedup = RaidAlertDedup(ddb_client=ddb_client, table_name="raid_alerts")
+
+    assert dedup.report("user_1", "issuer_1") == (True, 1)
+    assert dedup.report("user_1", "issuer_2") == (False, 2)
+
+    first_call = ddb_client.update_item.call_args_list[0]
+    assert first_call.args[0] == "raid_alerts"
+    assert "attribute_not_exists" in first_call.kwargs["condition_expression"]
+
+
+def test_report_shared_unavailable() -> None:
+    """Check that DDB errors fall back to the in-memory window."""
+    ddb_client = MagicMock()
+    ddb_client.update_item.side_effect = RuntimeError("DDB is down")
+    dedup = RaidAlertDedup(ddb_client=ddb_client, table_name="raid_alerts")
+
+    assert dedup.report("user_1", "issuer_1") == (True, 1)
+    assert dedup.report("user_1", "issuer_2") == (False, 2)